@@ -0,0 +1,133 @@
+# assigner.py
+import numpy as np
+from typing import Callable, Dict, Iterator, List, Tuple, Union
+
+JUDGES_PER_POSTER = 2
+MAX_POSTERS_PER_JUDGE = 6
+# A capacity is one number for every poster (judge), or an array with one per poster (judge); rematch.py
+# uses arrays to fill only the slots left open by the assignments it keeps
+Capacity = Union[int, np.ndarray]
+
+
+def _candidate_order(scores: np.ndarray, mask: np.ndarray, chunk_size: int = 4096) -> Iterator[np.ndarray]:
+    """Yields flat (row-major) indices of the allowed pairs, best score first, one chunk at a time.
+
+    Each chunk is cut with argpartition and only that chunk is sorted, so a caller that stops early
+    never pays for a full sort. Every pair tied with a chunk's last score goes into that chunk, and
+    chunks are sorted stably, so the overall order equals a stable argsort (ties keep poster/judge order).
+    """
+    candidates = np.flatnonzero(mask)
+    keys = -scores.ravel()[candidates]
+    while len(candidates):
+        if len(candidates) > chunk_size:
+            threshold = keys[np.argpartition(keys, chunk_size - 1)[chunk_size - 1]]
+            take = keys <= threshold
+        else:
+            take = np.ones(len(candidates), dtype=bool)
+        chunk, chunk_keys = candidates[take], keys[take]
+        yield chunk[np.argsort(chunk_keys, kind='stable')]
+        candidates, keys = candidates[~take], keys[~take]
+
+
+def assign_greedy(scores: np.ndarray, mask: np.ndarray, judges_per_poster: Capacity = JUDGES_PER_POSTER,
+                  max_posters_per_judge: Capacity = MAX_POSTERS_PER_JUDGE) -> List[Tuple[int, int]]:
+    """Takes allowed pairs in descending score order while both caps have room. Fast, but not optimal."""
+    poster_cap, judge_cap = np.broadcast_to(judges_per_poster, scores.shape[:1]), np.broadcast_to(max_posters_per_judge, scores.shape[1:])
+    poster_load, judge_load = np.zeros(scores.shape[0], dtype=int), np.zeros(scores.shape[1], dtype=int)
+    slots_left = min(int(poster_cap.sum()), int(judge_cap.sum()))
+    if slots_left == 0: return []
+    pairs = []
+    for chunk in _candidate_order(scores, mask):
+        for flat in chunk:
+            i, j = divmod(int(flat), scores.shape[1])
+            if poster_load[i] < poster_cap[i] and judge_load[j] < judge_cap[j]:
+                poster_load[i] += 1; judge_load[j] += 1
+                pairs.append((i, j))
+                slots_left -= 1
+        if slots_left == 0: break
+    return pairs
+
+
+def assign_optimal(scores: np.ndarray, mask: np.ndarray, judges_per_poster: Capacity = JUDGES_PER_POSTER,
+                   max_posters_per_judge: Capacity = MAX_POSTERS_PER_JUDGE) -> List[Tuple[int, int]]:
+    """Solves the capacitated assignment (a bipartite b-matching) as one linear program with HiGHS.
+
+    Every filled slot earns a bonus larger than any achievable score difference, so the solver
+    first fills as many judge slots as the constraints allow and then maximizes total score.
+    The constraint matrix is a network matrix, so the simplex vertex HiGHS returns is integral.
+    Pairs are returned best score first.
+    """
+    from scipy import sparse
+    from scipy.optimize import linprog  # imported here so the greedy engine and matrix-only runs skip SciPy
+    n_posters, n_judges = scores.shape
+    rows, cols = np.nonzero(mask)
+    n_vars = len(rows)
+    if n_vars == 0: return []
+    var_ids = np.arange(n_vars)
+    a_ub = sparse.vstack([
+        sparse.csr_matrix((np.ones(n_vars), (rows, var_ids)), shape=(n_posters, n_vars)),
+        sparse.csr_matrix((np.ones(n_vars), (cols, var_ids)), shape=(n_judges, n_vars)),
+    ]).tocsr()
+    poster_cap, judge_cap = np.broadcast_to(judges_per_poster, n_posters), np.broadcast_to(max_posters_per_judge, n_judges)
+    b_ub = np.concatenate([poster_cap, judge_cap]).astype(float)
+
+    pair_scores = scores[rows, cols].astype(float)
+    shifted = pair_scores - pair_scores.min()
+    max_slots = min(int(poster_cap.sum()), int(judge_cap.sum()), n_vars)
+    slot_bonus = max_slots * float(shifted.max()) + 1.0
+    result = linprog(-(shifted + slot_bonus), A_ub=a_ub, b_ub=b_ub, bounds=(0, 1), method='highs-ds')
+    if result.status != 0:
+        raise RuntimeError(f"assignment LP failed: {result.message}")
+    chosen = np.flatnonzero(result.x > 0.5)
+    chosen = chosen[np.argsort(-pair_scores[chosen], kind='stable')]
+    pairs = [(int(rows[k]), int(cols[k])) for k in chosen]
+    check_assignment(pairs, mask, judges_per_poster, max_posters_per_judge)
+    return pairs
+
+
+ASSIGNMENT_ENGINES: Dict[str, Callable[..., List[Tuple[int, int]]]] = {
+    'greedy': assign_greedy,
+    'optimal': assign_optimal,
+}
+
+
+def check_assignment(pairs: List[Tuple[int, int]], mask: np.ndarray, judges_per_poster: Capacity = JUDGES_PER_POSTER,
+                     max_posters_per_judge: Capacity = MAX_POSTERS_PER_JUDGE):
+    """Raises ValueError if the pairs break availability, duplicate or capacity constraints."""
+    if len(set(pairs)) != len(pairs): raise ValueError("Duplicate poster/judge pair in assignment")
+    if not pairs: return
+    rows, cols = np.array(pairs).T
+    if not mask[rows, cols].all(): raise ValueError("Assignment uses an unavailable poster/judge pair")
+    if (np.bincount(rows, minlength=mask.shape[0]) > judges_per_poster).any(): raise ValueError("Poster over judge capacity")
+    if (np.bincount(cols, minlength=mask.shape[1]) > max_posters_per_judge).any(): raise ValueError("Judge over poster capacity")
+
+
+def assignment_objective(scores: np.ndarray, pairs: List[Tuple[int, int]]) -> float:
+    return float(sum(scores[i, j] for i, j in pairs))
+
+
+def assign(scores: np.ndarray, mask: np.ndarray, engine: str = 'optimal', judges_per_poster: Capacity = JUDGES_PER_POSTER,
+           max_posters_per_judge: Capacity = MAX_POSTERS_PER_JUDGE) -> Tuple[List[Tuple[int, int]], Dict[str, Dict[str, float]]]:
+    """Runs the requested engine (falling back to greedy if it fails) and reports each engine's objective.
+
+    Returns (pairs, report) where pairs are (poster index, judge index) tuples and report maps an
+    engine name to its objective, filled slots and number of posters left short of judges.
+    """
+    if engine not in ASSIGNMENT_ENGINES:
+        raise ValueError(f"Unknown assignment engine '{engine}'. Choose from: {', '.join(ASSIGNMENT_ENGINES)}")
+
+    def summarize(pairs):
+        load = np.bincount([i for i, _ in pairs], minlength=scores.shape[0])
+        return {'objective': assignment_objective(scores, pairs), 'filled_slots': len(pairs),
+                'understaffed_posters': int((load < judges_per_poster).sum())}
+
+    greedy_pairs = assign_greedy(scores, mask, judges_per_poster, max_posters_per_judge)
+    report = {'greedy': summarize(greedy_pairs)}
+    pairs = greedy_pairs
+    if engine != 'greedy':
+        try:
+            pairs = ASSIGNMENT_ENGINES[engine](scores, mask, judges_per_poster, max_posters_per_judge)
+            report[engine] = summarize(pairs)
+        except Exception as e:
+            print(f"Warning: '{engine}' assignment failed, falling back to greedy: {e}")
+    return pairs, report
@@ -0,0 +1,131 @@
+# bench_profile_parser.py
+"""Checks parse_profile_html against parse_profile_html_legacy and times both.
+
+The output check always covers the pages in profile_fixtures/ (misnested, unclosed and stray tags,
+entities, comments, scripts, whitespace, WordPress-shaped profile pages) and a corpus of randomly
+damaged copies of them, besides the pages being timed.
+
+Usage:
+    python bench_profile_parser.py                 # synthetic corpus with long publication lists
+    python bench_profile_parser.py --pages saved/  # a directory of saved profile .html pages
+    python bench_profile_parser.py --check-only    # output check only; exit status 1 if the default parser differs
+"""
+import argparse
+import glob
+import os
+import random
+import re
+import sys
+import time
+from scraper import parse_profile_html, parse_profile_html_legacy
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profile_fixtures')
+
+WORDS = ("machine learning robotics control signal power quantum optics data networks security "
+         "structures materials sensing wireless energy imaging systems design analysis").split()
+
+
+def _sentence(rng, n):
+    return ' '.join(rng.choice(WORDS) for _ in range(n))
+
+
+def synthetic_corpus(n_pages=40, max_publications=400, seed=0):
+    """Profile pages shaped like the ECS site, including the quirks the extractor must reproduce."""
+    rng = random.Random(seed)
+    pages = []
+    for k in range(n_pages):
+        interest_label = rng.choice(["Areas of Expertise:", "Research Interests:"])
+        publication_label = rng.choice(["Selected Publications:", "Select Publications:", "Selected Presentations/Publications:"])
+        publications = ''.join(f"<li>{_sentence(rng, 12)}</li>" for _ in range(rng.randint(0, max_publications)))
+        pages.append(f"""<html><body><div class="entry-content">
+<p>{_sentence(rng, 4)}</p>
+<p><strong>{interest_label}</strong></p>
+<ul class="wp-block-list"><li>{_sentence(rng, 2)}</li><li>{_sentence(rng, 3)}<ul><li>{_sentence(rng, 2)}</li></ul></li></ul>
+<p>{_sentence(rng, 9)}</p><p>{_sentence(rng, 8)}</p><p>too short</p>
+<ul class="other-list"><li>{_sentence(rng, 3)}</li></ul>
+<p><strong>Current Research:</strong> {_sentence(rng, rng.choice([2, 8]))}</p>
+<p>{_sentence(rng, 14)}</p><p>{_sentence(rng, 11)}</p><p>end</p>
+<p><strong>{publication_label}</strong></p>
+<ul class="wp-block-list">{publications}</ul>
+<p>{_sentence(rng, 10)}</p><p>stop here</p><p>{_sentence(rng, 10)}</p>
+<div><p><strong>Areas of Expertise:</strong></p><ul class="wp-block-list"><li>{_sentence(rng, 2)}</li></ul></div>
+</div></body></html>""")
+    return pages
+
+
+def malformed_corpus(pages, n_pages=400, seed=0):
+    """Copies of the pages with tags dropped, duplicated, moved or cut off, the way hand-edited pages go wrong."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n_pages):
+        pieces = re.split(r'(<[^>]*>)', rng.choice(pages))
+        for _ in range(rng.randint(1, 6)):
+            tags = [i for i, piece in enumerate(pieces) if piece.startswith('<')]
+            if not tags: break
+            i = rng.choice(tags)
+            mutation = rng.randrange(5)
+            if mutation == 0: pieces[i] = ''                                   # drop a tag
+            elif mutation == 1: pieces[i] *= 2                                 # duplicate it
+            elif mutation == 2: pieces.insert(rng.randrange(len(pieces) + 1), pieces.pop(i))  # move it
+            elif mutation == 3: pieces[i] = re.sub(r'^<(\w+)[^>]*>$', r'</\1>', pieces[i])  # start tag becomes an end tag
+            else: pieces = pieces[:i]                                          # truncate the page
+        corpus.append(''.join(pieces))
+    return corpus
+
+
+def load_pages(directory):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.htm*'))):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            pages.append(f.read())
+    return pages
+
+
+def time_per_page(fn, pages, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages: fn(page)
+        best = min(best, time.perf_counter() - start)
+    return best / len(pages) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the profile page extractor.")
+    parser.add_argument('--pages', help="Directory of saved profile pages (default: synthetic corpus)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--check-only', action='store_true', help="Only check the output, without timing")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages) if args.pages else synthetic_corpus()
+    if not pages:
+        print("No pages to benchmark."); return
+    print(f"{len(pages)} pages, {sum(map(len, pages)) / len(pages) / 1024:.1f} KiB on average")
+
+    fixtures = load_pages(FIXTURES_DIR)
+    checked = {'pages': pages, 'fixtures': fixtures, 'damaged fixtures': malformed_corpus(fixtures)}
+    default_differs = False
+    builders = ['html.parser', 'lxml']  # lxml (if installed) repairs misnested markup differently, so it may differ
+    for builder in list(builders):
+        try:
+            mismatches = {name: sum(parse_profile_html(page, builder) != parse_profile_html_legacy(page) for page in corpus)
+                          for name, corpus in checked.items()}
+        except Exception as e:  # bs4.FeatureNotFound when lxml is missing
+            print(f"Output check ({builder}): skipped ({e})")
+            builders.remove(builder)
+            continue
+        print(f"Output check ({builder}): " + ', '.join(
+            f"{name} {'identical' if count == 0 else f'{count}/{len(checked[name])} differ'}" for name, count in mismatches.items()))
+        if builder == 'html.parser' and any(mismatches.values()): default_differs = True
+    if args.check_only: sys.exit(1 if default_differs else 0)
+
+    legacy_ms = time_per_page(parse_profile_html_legacy, pages, args.repeat)
+    print(f"{'legacy (html.parser)':<28}{legacy_ms:8.2f} ms/page")
+    for builder in builders:
+        fast_ms = time_per_page(lambda page: parse_profile_html(page, builder), pages, args.repeat)
+        print(f"{'single-pass (' + builder + ')':<28}{fast_ms:8.2f} ms/page  ({legacy_ms / fast_ms:.1f}x)")
+    if default_differs: sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
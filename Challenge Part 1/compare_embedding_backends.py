@@ -0,0 +1,136 @@
+# compare_embedding_backends.py
+"""Accuracy vs. speed of the embedding backends on a fixed dataset.
+
+Runs perform_matching once per configuration (backend + vector dtype), each in its own process so
+model load time and peak memory are its own, with no embedding cache. Every configuration is
+compared with the first one (the original float32 all-mpnet-base-v2 path by default):
+
+    model load / encode   seconds, from the run report (instrumentation.py)
+    peak RSS              of the whole run
+    pairs kept            share of the reference's (poster, judge) assignments that are unchanged
+    posters changed       posters whose pair of judges differs from the reference
+
+Usage:
+    python compare_embedding_backends.py
+    python compare_embedding_backends.py --configs mpnet:float32 minilm-int8:float16 --output backends.json
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import pandas as pd
+from embedding_backends import EMBEDDING_BACKENDS, EMBEDDING_DTYPES
+
+DEFAULT_CONFIGS = ['mpnet:float32', 'mpnet:float16', 'mpnet-int8:float32', 'minilm:float32', 'minilm-int8:float16']
+RESULT_PREFIX = 'BACKEND_RESULT '
+
+
+def parse_config(config):
+    backend, _, dtype = config.partition(':')
+    dtype = dtype or 'float32'
+    if backend not in EMBEDDING_BACKENDS or dtype not in EMBEDDING_DTYPES:
+        raise argparse.ArgumentTypeError(f"'{config}' is not BACKEND[:DTYPE] with BACKEND in {', '.join(EMBEDDING_BACKENDS)} "
+                                         f"and DTYPE in {', '.join(EMBEDDING_DTYPES)}")
+    return backend, dtype
+
+
+def peak_rss_mb():
+    """VmHWM of this process in MiB (Linux), or None where /proc is not available."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'): return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def run_config_in_this_process(args):
+    """Child side: one matching run; prints the run report's timings and the assignment file as the last line."""
+    import contextlib
+    import io
+    from matcher import perform_matching
+    backend, dtype = parse_config(args.run_config)
+    out_dir = tempfile.mkdtemp(prefix='backend-')
+    posters_out, report = os.path.join(out_dir, 'posters.xlsx'), os.path.join(out_dir, 'report.json')
+    with contextlib.redirect_stdout(io.StringIO()):
+        perform_matching(args.posters, args.judges, args.professors, posters_out, os.path.join(out_dir, 'judges.xlsx'),
+                         embedding_cache_dir=None, assignment_engine=args.engine, report_file=report,
+                         embedding_backend=backend, embedding_dtype=dtype)
+    with open(report) as f:
+        stages = json.load(f)['stages']
+    seconds = lambda name: stages.get(name, {}).get('seconds', 0.0)
+    print(RESULT_PREFIX + json.dumps({'model_load_seconds': seconds('model_load'), 'encode_seconds': seconds('embedding.encode'),
+                                      'total_seconds': round(sum(v['seconds'] for v in stages.values()), 4),
+                                      'peak_rss_mb': peak_rss_mb(), 'posters_file': posters_out}))
+
+
+def assignment_pairs(posters_file):
+    posters = pd.read_excel(posters_file)
+    judges = posters[['Assigned Judge 1 ID', 'Assigned Judge 2 ID']]
+    return {pid: frozenset(int(j) for j in row if pd.notna(j)) for pid, row in zip(posters['Poster #'], judges.itertuples(index=False))}
+
+
+def compare_assignments(reference, other):
+    """(share of the reference's pairs that are kept, number of posters whose judges changed)."""
+    total = sum(len(judges) for judges in reference.values())
+    kept = sum(len(judges & other.get(pid, frozenset())) for pid, judges in reference.items())
+    changed = sum(judges != other.get(pid, frozenset()) for pid, judges in reference.items())
+    return kept / max(total, 1), changed
+
+
+def run_config(config, args):
+    command = [sys.executable, os.path.abspath(__file__), '--run-config', config, '--posters', args.posters, '--judges', args.judges,
+               '--professors', args.professors, '--engine', args.engine]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    lines = [line for line in completed.stdout.splitlines() if line.startswith(RESULT_PREFIX)]
+    if completed.returncode != 0 or not lines:
+        return {'config': config, 'status': 'failed', 'error': (completed.stderr or completed.stdout).strip().splitlines()[-1:]}
+    return {'config': config, 'status': 'ok', **json.loads(lines[-1][len(RESULT_PREFIX):])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare embedding backends by speed, memory and change in the final assignments.")
+    parser.add_argument('--configs', nargs='+', default=DEFAULT_CONFIGS, help="BACKEND:DTYPE entries; the first is the reference")
+    parser.add_argument('--posters', default='Sample_input_abstracts.xlsx')
+    parser.add_argument('--judges', default='Example_list_judges.xlsx')
+    parser.add_argument('--professors', default='professors.xlsx')
+    parser.add_argument('--engine', default='optimal', help="Assignment engine (default: optimal)")
+    parser.add_argument('--output', help="Also write the results as JSON")
+    parser.add_argument('--run-config', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    for config in args.configs: parse_config(config)
+
+    if args.run_config:
+        run_config_in_this_process(args)
+        return
+
+    results, reference = [], None
+    print(f"{'backend:dtype':<22}{'model load':>11}{'encode':>9}{'total':>9}{'peak RSS':>11}{'pairs kept':>12}{'posters changed':>17}")
+    for config in args.configs:
+        result = run_config(config, args)
+        results.append(result)
+        if result['status'] != 'ok':
+            print(f"{config:<22}  failed: {' '.join(result['error'])}")
+            continue
+        posters_file = result.pop('posters_file')
+        pairs = assignment_pairs(posters_file)
+        shutil.rmtree(os.path.dirname(posters_file), ignore_errors=True)
+        if reference is None: reference = pairs
+        result['pairs_kept'], result['posters_changed'] = compare_assignments(reference, pairs)
+        rss = f"{result['peak_rss_mb']:.0f} MB" if result['peak_rss_mb'] is not None else 'n/a'
+        print(f"{config:<22}{result['model_load_seconds']:>10.2f}s{result['encode_seconds']:>8.2f}s{result['total_seconds']:>8.2f}s"
+              f"{rss:>11}{result['pairs_kept']:>12.1%}{result['posters_changed']:>17}")
+    if results and results[0]['status'] != 'ok':
+        print("Warning: The reference configuration failed; pairs are compared with the first one that succeeded")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'reference': args.configs[0], 'posters': args.posters, 'engine': args.engine, 'runs': results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
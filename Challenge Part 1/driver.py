@@ -1,47 +1,126 @@
 # driver.py
 
+import argparse
 import os
 import sys
-from scraper import scrape_and_save_professors  # Import the scraping function
+from scraper import scrape_and_save_professors, refresh_professors  # Import the scraping functions
 from matcher import perform_matching  # Import the matching function
-from matrix_creator import create_poster_judge_matrix  # Import matrix creation
+from rematch import rematch
+from model_server import DEFAULT_SOCKET
+from name_index import FUZZY_NAME_CUTOFF
+from embedding_backends import DEFAULT_BACKEND, EMBEDDING_BACKENDS, EMBEDDING_DTYPES
+from table_io import XLSX, handoff_path, read_table, write_table
+from matrix_creator import create_poster_judge_matrix, dense_assignment_frame, matrix_from_long_form  # Import matrix creation
+from stage_runner import Stage, StageRunner, module_files
 
 def main():
     """Main driver function."""
+    parser = argparse.ArgumentParser(description="Assign judges to research posters.")
+    parser.add_argument('--refresh', action='store_true',
+                        help="Incrementally refresh professors.xlsx (conditional requests, only changed pages re-parsed)")
+    parser.add_argument('--model-server', nargs='?', const=DEFAULT_SOCKET, metavar='SOCKET',
+                        help="Encode texts with a running model_server.py (default socket: %(const)s)")
+    parser.add_argument('--embedding-backend', default=DEFAULT_BACKEND, choices=list(EMBEDDING_BACKENDS),
+                        help="Sentence-embedding model and precision (default: %(default)s; see embedding_backends.py)")
+    parser.add_argument('--embedding-dtype', default='float32', choices=EMBEDDING_DTYPES,
+                        help="Precision the embeddings are kept and cached in (default: %(default)s)")
+    parser.add_argument('--no-xlsx', action='store_true',
+                        help="Skip the Excel copies of the outputs (the hand-off files for Part 2 are always written)")
+    parser.add_argument('--rematch', action='store_true',
+                        help="Update the last run's assignments for withdrawn/new judges and posters instead of matching from scratch "
+                             "(rescores only what changed and keeps the other assignments)")
+    parser.add_argument('--fuzzy-names', action='store_true',
+                        help="Match judges and advisors to faculty profiles by approximate name when no exact match exists "
+                             "(each fuzzy match is printed; off by default)")
+    parser.add_argument('--report', metavar='PATH', help="Write per-stage timings and counters of the matching run as JSON")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="Profile the matching run: PATH.html uses pyinstrument (if installed), anything else is a cProfile dump")
+    parser.add_argument('--force', nargs='*', metavar='STAGE',
+                        help="Rerun these stages (scrape, match, matrix, export_posters, export_judges, export_matrix) "
+                             "even if up to date; with no names, rerun all")
+    parser.add_argument('--jobs', type=int, default=4, help="Stages run at the same time when they do not depend on each other (default: 4)")
+    parser.add_argument('--dry-run', action='store_true', help="Only print which stages are out of date")
+    args = parser.parse_args()
+    if args.force == []: args.force = ['all']
 
     # --- File Paths ---
     professors_file = 'professors.xlsx'
     input_posters_file = 'Sample_input_abstracts.xlsx'
     input_judges_file = 'Example_list_judges.xlsx'
-    output_posters_file = 'processed_Sample_input_abstracts.xlsx'
-    output_judges_file = 'processed_Example_list_judges.xlsx'
-    output_matrix_file = 'judge_poster_assignment_matrix.xlsx'
-
-    # --- Step 1: Scrape if professors.xlsx is missing ---
-    if not os.path.exists(professors_file):
-        print("professors.xlsx not found. Starting web scraping...")
-        try:
+    # Stages hand tables to each other in a binary format (Parquet if pyarrow is installed, else CSV);
+    # the assignments go to Part 2 in sparse long form, one row per (poster, judge)
+    output_posters_file = handoff_path('processed_Sample_input_abstracts')
+    output_judges_file = handoff_path('processed_Example_list_judges')
+    output_assignments_file = handoff_path('judge_poster_assignments')
+    matrix_export_file = 'judge_poster_assignment_matrix' + XLSX
+    embedding_cache_dir = '.embedding_cache'
+    match_state_file = 'match_state.npz'  # scores and assignments of the last run, the starting point for --rematch
+    assignment_changes_file = 'assignment_changes.csv'
+    assignment_engine = 'optimal'  # or 'greedy' for the fast sort-and-fill fallback
+    fuzzy_name_cutoff = FUZZY_NAME_CUTOFF if args.fuzzy_names else None
+
+    # --- Stages: each runs only if its inputs (data and code) or parameters changed since its last run ---
+    # A stage's code is its module and every module from this folder that it imports
+    match_code = module_files('matcher.py', 'rematch.py')
+    matrix_code = module_files('matrix_creator.py')
+
+    def scrape():
+        if args.refresh and os.path.exists(professors_file):
+            try:
+                refresh_professors(professors_file)
+            except Exception as e:
+                print(f"Error during refresh, continuing with the existing professors.xlsx: {e}")
+        else:
             scrape_and_save_professors(professors_file)
-        except Exception as e:
-            print(f"Error during scraping: {e}")
-            sys.exit(1)  # Exit on scraping failure
-    else:
-        print("professors.xlsx found. Skipping scraping.")
 
-    # --- Step 2: Perform Matching ---
-    try:
-        perform_matching(input_posters_file, input_judges_file, professors_file, output_posters_file, output_judges_file)
-    except Exception as e:
-        print(f"Error during matching: {e}")
-        sys.exit(1)
+    def match():
+        if not args.rematch:
+            perform_matching(input_posters_file, input_judges_file, professors_file, output_posters_file, output_judges_file,
+                             embedding_cache_dir=embedding_cache_dir, assignment_engine=assignment_engine, report_file=args.report,
+                             profile_file=args.profile, model_server=args.model_server, embedding_backend=args.embedding_backend,
+                             embedding_dtype=args.embedding_dtype, state_file=match_state_file, fuzzy_name_cutoff=fuzzy_name_cutoff)
+            return
+        if not os.path.exists(match_state_file):
+            raise FileNotFoundError(f"{match_state_file} not found. Run driver.py without --rematch once first.")
+        rematch(match_state_file, input_posters_file, input_judges_file, professors_file, output_posters_file, output_judges_file,
+                diff_file=assignment_changes_file, assignment_engine=assignment_engine, embedding_cache_dir=embedding_cache_dir,
+                model_server=args.model_server, report_file=args.report, fuzzy_name_cutoff=fuzzy_name_cutoff)
 
-    # --- Step 3: Create Matrix ---
+    def export(path, load):
+        write_table(load(), path)
+        print(f"Exported {path}")
+
+    stages = [
+        # professors.xlsx is only scraped when missing; --refresh updates it in place
+        Stage('scrape', scrape, outputs=[professors_file], keep_outputs=True),
+        # Resolving, embedding, scoring and assigning share in-memory state, so they are one stage; the
+        # embedding cache and --rematch reuse work inside it.
+        Stage('match', match, inputs=[input_posters_file, input_judges_file, professors_file] + match_code,
+              outputs=[output_posters_file, output_judges_file, match_state_file],
+              params={'assignment_engine': assignment_engine, 'embedding_backend': args.embedding_backend,
+                      'embedding_dtype': args.embedding_dtype, 'rematch': args.rematch, 'fuzzy_name_cutoff': fuzzy_name_cutoff}),
+        Stage('matrix', lambda: create_poster_judge_matrix(output_posters_file, output_judges_file, long_output_path=output_assignments_file),
+              inputs=[output_posters_file, output_judges_file] + matrix_code, outputs=[output_assignments_file]),
+    ]
+    if not args.no_xlsx:  # Excel copies for people (nothing in the pipeline reads these)
+        for name, path in (('export_posters', output_posters_file), ('export_judges', output_judges_file)):
+            xlsx_path = os.path.splitext(path)[0] + XLSX
+            stages.append(Stage(name, lambda path=path, xlsx_path=xlsx_path: export(xlsx_path, lambda: read_table(path)),
+                                inputs=[path], outputs=[xlsx_path]))
+        stages.append(Stage('export_matrix',  # the only place the matrix is made dense
+                            lambda: export(matrix_export_file, lambda: dense_assignment_frame(*matrix_from_long_form(read_table(output_assignments_file)))),
+                            inputs=[output_assignments_file], outputs=[matrix_export_file]))
+
+    force = set(args.force or ())
+    if args.refresh: force.add('scrape')
+    if args.report or args.profile: force.add('match')  # a report or profile is of a run, so always run it
     try:
-        create_poster_judge_matrix(output_posters_file, output_judges_file, output_matrix_file)
-    except Exception as e:
-        print(f"Error during matrix creation: {e}")
+        status = StageRunner(stages, jobs=args.jobs).run(force, dry_run=args.dry_run)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if 'failed' in status.values() or 'skipped' in status.values():
         sys.exit(1)
-
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,47 @@
+# embedding_backends.py
+"""Sentence-embedding backends for the semantic score.
+
+'mpnet' (all-mpnet-base-v2 in float32) is the original model. The others trade some accuracy for
+CPU time and memory: all-MiniLM-L6-v2 is about 5x smaller, and the '-int8' variants apply PyTorch
+dynamic int8 quantization to the transformer's Linear layers. Storing the vectors in float16
+(ExpertiseScorer's embedding_dtype) is independent of the backend.
+compare_embedding_backends.py measures the effect of each option on the final assignments.
+"""
+from typing import Dict
+
+EMBEDDING_BACKENDS: Dict[str, Dict] = {
+    'mpnet': {'model': 'all-mpnet-base-v2', 'quantize': False},
+    'mpnet-int8': {'model': 'all-mpnet-base-v2', 'quantize': True},
+    'minilm': {'model': 'all-MiniLM-L6-v2', 'quantize': False},
+    'minilm-int8': {'model': 'all-MiniLM-L6-v2', 'quantize': True},
+}
+DEFAULT_BACKEND = 'mpnet'
+EMBEDDING_DTYPES = ('float32', 'float16')
+
+
+def check_backend(backend: str):
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}'. Choose from: {', '.join(EMBEDDING_BACKENDS)}")
+
+
+def backend_model_id(backend: str) -> str:
+    """Identifies the vectors a backend produces (embedding cache key, model server check).
+
+    The unquantized backends keep the bare model name, so existing caches stay valid.
+    """
+    check_backend(backend)
+    spec = EMBEDDING_BACKENDS[backend]
+    return spec['model'] + ('+int8' if spec['quantize'] else '')
+
+
+def load_embedding_model(backend: str):
+    """Loads the backend's SentenceTransformer; '-int8' backends are quantized in place on the CPU."""
+    check_backend(backend)
+    spec = EMBEDDING_BACKENDS[backend]
+    from sentence_transformers import SentenceTransformer
+    if not spec['quantize']:
+        return SentenceTransformer(spec['model'])
+    import torch
+    model = SentenceTransformer(spec['model'], device='cpu')  # dynamic quantization only has CPU kernels
+    quantization = torch.ao.quantization if hasattr(torch, 'ao') else torch.quantization
+    return quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
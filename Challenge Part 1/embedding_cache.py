@@ -0,0 +1,132 @@
+# embedding_cache.py
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+import numpy as np
+from typing import Dict, List, Optional
+
+INDEX_FILE = 'index.json'
+INDEX_VERSION = 1
+
+
+def normalize_text(text: str) -> str:
+    return ' '.join(str(text).split())
+
+
+def _fsync_replace(tmp_path: str, final_path: str):
+    os.replace(tmp_path, final_path)
+    try:
+        dir_fd = os.open(os.path.dirname(final_path) or '.', os.O_RDONLY)
+        try: os.fsync(dir_fd)
+        finally: os.close(dir_fd)
+    except OSError:
+        pass  # Directory fsync is not supported everywhere (e.g. Windows)
+
+
+class EmbeddingCache:
+    """Content-addressed on-disk embedding store for one model.
+
+    Vectors live in a single .npy file opened as a read-only memory map; index.json maps
+    sha256(model id + normalized text) to a row and a last-used timestamp. Saving writes a new
+    vectors file and then atomically swaps the index, so an interrupted run leaves the previous
+    cache intact.
+    """
+
+    def __init__(self, cache_dir: str, model_name: str, dtype: str = 'float32', max_bytes: int = 256 * 1024 * 1024):
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        self.max_bytes = int(max_bytes)
+        self.dir = os.path.join(cache_dir, re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name))
+        self.index_path = os.path.join(self.dir, INDEX_FILE)
+        self.rows: Dict[str, list] = {}  # key -> [row, last_used]
+        self.vectors: Optional[np.ndarray] = None
+        self.vectors_file: Optional[str] = None
+        self.pending: Dict[str, np.ndarray] = {}
+        self.hits, self.misses = 0, 0
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.index_path): return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('version') != INDEX_VERSION or index.get('model') != self.model_name or index.get('dtype') != self.dtype.name:
+                print(f"Warning: Ignoring embedding cache at {self.dir} (format, model or dtype changed)")
+                return
+            vectors = np.load(os.path.join(self.dir, index['vectors_file']), mmap_mode='r')
+            if vectors.shape[0] != len(index['rows']):
+                raise ValueError("index and vectors file disagree")
+            self.vectors, self.vectors_file, self.rows = vectors, index['vectors_file'], index['rows']
+        except Exception as e:
+            print(f"Warning: Could not load embedding cache at {self.dir}, starting empty: {e}")
+            self.vectors, self.vectors_file, self.rows = None, None, {}
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+    def get_many(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """Returns {text: vector} for the texts already cached (pending, unsaved entries included)."""
+        found, now = {}, time.time()
+        for text in texts:
+            key = self.key(text)
+            if key in self.pending:
+                found[text] = self.pending[key]
+            elif key in self.rows and self.vectors is not None:
+                found[text] = np.asarray(self.vectors[self.rows[key][0]])
+                self.rows[key][1] = now
+        self.hits += len(found)
+        self.misses += len(texts) - len(found)
+        return found
+
+    def put_many(self, texts: List[str], vectors: np.ndarray) -> np.ndarray:
+        """Stages new vectors for saving and returns them cast to the cache dtype, exactly as they will be read back."""
+        vectors = np.asarray(vectors).astype(self.dtype)
+        for text, vector in zip(texts, vectors):
+            self.pending[self.key(text)] = vector
+        return vectors
+
+    def save(self):
+        """Merges pending vectors, evicts least recently used rows over max_bytes and swaps the files atomically."""
+        os.makedirs(self.dir, exist_ok=True)
+        now = time.time()
+        entries = [(key, row, last_used) for key, (row, last_used) in self.rows.items() if key not in self.pending]
+        entries += [(key, None, now) for key in self.pending]
+        if not entries: return
+        dim = len(next(iter(self.pending.values()))) if self.pending else self.vectors.shape[1]
+        max_rows = max(1, self.max_bytes // max(1, dim * self.dtype.itemsize))
+        if len(entries) > max_rows:
+            entries.sort(key=lambda e: e[2], reverse=True)
+            print(f"Embedding cache over {self.max_bytes} bytes, evicting {len(entries) - max_rows} least recently used entries.")
+            entries = entries[:max_rows]
+
+        if self.pending or len(entries) != len(self.rows):
+            merged = np.empty((len(entries), dim), dtype=self.dtype)
+            for i, (key, row, _) in enumerate(entries):
+                merged[i] = self.pending[key] if row is None else self.vectors[row]
+            vectors_file = f"vectors-{uuid.uuid4().hex}.npy"
+            tmp_path = os.path.join(self.dir, vectors_file + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                np.save(f, merged)
+                f.flush(); os.fsync(f.fileno())
+            _fsync_replace(tmp_path, os.path.join(self.dir, vectors_file))
+        else:
+            vectors_file = self.vectors_file
+        rows = {key: [i, last_used] for i, (key, _, last_used) in enumerate(entries)}
+
+        index = {'version': INDEX_VERSION, 'model': self.model_name, 'dtype': self.dtype.name,
+                 'dim': int(dim), 'vectors_file': vectors_file, 'rows': rows}
+        tmp_path = self.index_path + f".{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+            f.flush(); os.fsync(f.fileno())
+        _fsync_replace(tmp_path, self.index_path)
+
+        old_file = self.vectors_file
+        self.vectors = np.load(os.path.join(self.dir, vectors_file), mmap_mode='r')
+        self.vectors_file, self.rows, self.pending = vectors_file, rows, {}
+        if old_file and old_file != vectors_file:
+            try: os.remove(os.path.join(self.dir, old_file))
+            except OSError: pass
@@ -0,0 +1,105 @@
+# instrumentation.py
+import contextlib
+import cProfile
+import json
+import os
+import time
+from typing import Dict, Optional
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+class _StageTimer:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics: 'Instrumentation', name: str):
+        self.metrics, self.name = metrics, name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Instrumentation:
+    """Stage timers, counters and values for one matching run, written out as a JSON report.
+
+    Disabled (the default) every hook is a flag check: stage() hands back one shared no-op
+    context manager and count()/set() return immediately, so the hooks can stay in the code.
+    Per-pair hooks in hot loops should still test `enabled` first and skip the timing entirely.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        self.started = time.time()
+        self.stages: Dict[str, Dict[str, float]] = {}  # name -> {'seconds', 'calls'}, in first-seen order
+        self.counters: Dict[str, int] = {}
+        self.values: Dict[str, object] = {}
+
+    def stage(self, name: str):
+        """Context manager that adds its wall time to the named stage."""
+        return _StageTimer(self, name) if self.enabled else _NULL_CONTEXT
+
+    def add_time(self, name: str, seconds: float, calls: int = 1):
+        entry = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+        entry['seconds'] += seconds
+        entry['calls'] += calls
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled: self.counters[name] = self.counters.get(name, 0) + int(n)
+
+    def set(self, name: str, value):
+        if self.enabled: self.values[name] = value
+
+    def report(self) -> Dict:
+        return {'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+                'total_seconds': round(time.time() - self.started, 4),
+                'stages': {name: {'seconds': round(entry['seconds'], 4), 'calls': entry['calls']} for name, entry in self.stages.items()},
+                'counters': dict(self.counters), 'values': dict(self.values)}
+
+    def write_report(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2, default=str)
+
+
+# The instance the pipeline reports to; perform_matching enables it when a report or profile is requested
+metrics = Instrumentation()
+
+
+@contextlib.contextmanager
+def profiling(path: Optional[str]):
+    """Profiles the enclosed block into path: pyinstrument's HTML for a .html path (if installed), else a cProfile dump."""
+    if not path:
+        yield
+        return
+    if path.lower().endswith('.html'):
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("Warning: pyinstrument is not installed, writing a cProfile dump instead")
+            path = os.path.splitext(path)[0] + '.prof'
+        else:
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                with open(path, 'w') as f:
+                    f.write(profiler.output_html())
+                print(f"Profile written to {path}")
+            return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        print(f"Profile written to {path} (view with: python -m pstats {path})")
@@ -0,0 +1,64 @@
+# match_state.py
+"""What a matching run keeps for rematch.py, saved as one .npz file (numpy only, no pickles).
+
+    poster_ids / judge_ids                   rows and columns of everything below
+    poster_fingerprints / judge_fingerprints hash of each input row (a judge's includes its faculty profile),
+                                             so a re-match can tell unchanged rows from edited ones
+    scored, scores                           which pairs were scored, and their final scores (float32)
+    poster_embeddings / judge_embeddings     the vectors behind the semantic score
+    tfidf_terms / tfidf_idf                  the fitted keyword-overlap vectorizer
+    pairs                                    the assignment, as (poster row, judge row)
+
+plus the embedding backend and dtype and the score weights, which a re-match must share.
+"""
+import hashlib
+import json
+import os
+from typing import Dict, List
+import numpy as np
+
+STATE_VERSION = 1
+ARRAY_FIELDS = ('poster_ids', 'judge_ids', 'poster_fingerprints', 'judge_fingerprints', 'scored', 'scores',
+                'poster_embeddings', 'judge_embeddings', 'tfidf_terms', 'tfidf_idf', 'pairs', 'weights')
+SETTING_FIELDS = ('embedding_backend', 'embedding_dtype')
+
+
+def row_fingerprints(records: List[Dict]) -> np.ndarray:
+    """sha1 of each record's values (keys sorted, missing values alike); equal records give equal fingerprints."""
+    def canonical(value):
+        if value is None or (isinstance(value, float) and value != value): return None
+        return value.item() if isinstance(value, np.generic) else value
+    return np.array([hashlib.sha1(json.dumps({k: canonical(v) for k, v in record.items()}, sort_keys=True, default=str).encode()).hexdigest()
+                     for record in records], dtype=str)
+
+
+class MatchState:
+    """The arrays listed in the module docstring plus the run's settings; see save and load."""
+
+    def __init__(self, **fields):
+        missing = [name for name in ARRAY_FIELDS + SETTING_FIELDS if name not in fields]
+        if missing: raise ValueError(f"Match state is missing: {', '.join(missing)}")
+        for name in ARRAY_FIELDS: setattr(self, name, np.asarray(fields[name]))
+        for name in SETTING_FIELDS: setattr(self, name, str(fields[name]))
+
+    def score_matrix(self) -> np.ndarray:
+        """(posters x judges) float32 scores, zero where a pair was not scored."""
+        matrix = np.zeros(self.scored.shape, dtype=np.float32)
+        matrix[self.scored] = self.scores
+        return matrix
+
+    def save(self, path: str):
+        """Writes to a temporary file and renames it into place, so a failed save keeps the previous state."""
+        tmp_path = f"{path}.tmp{os.getpid()}.npz"
+        try:
+            np.savez(tmp_path, version=STATE_VERSION, **{name: getattr(self, name) for name in ARRAY_FIELDS + SETTING_FIELDS})
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path): os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, path: str) -> 'MatchState':
+        with np.load(path, allow_pickle=False) as data:
+            if 'version' not in data.files or int(data['version']) != STATE_VERSION:
+                raise ValueError(f"{path} was written by another version of the matcher; run a full match first")
+            return cls(**{name: data[name] for name in data.files if name != 'version'})
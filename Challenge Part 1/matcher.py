@@ -1,23 +1,47 @@
 import pandas as pd
 import numpy as np
 import re
-from sentence_transformers import SentenceTransformer
-from sklearn.feature_extraction.text import TfidfVectorizer
-from nltk.corpus import stopwords
-import nltk
 from typing import Dict, List, Tuple, Optional
-import time
-import sys
+from embedding_cache import EmbeddingCache
+from embedding_backends import DEFAULT_BACKEND, EMBEDDING_DTYPES, backend_model_id, load_embedding_model
+from model_server import connect_model_server
+from name_index import ProfessorNameIndex, advisor_conflict_mask
+from assigner import assign, JUDGES_PER_POSTER, MAX_POSTERS_PER_JUDGE
+from instrumentation import metrics, profiling
+from table_io import read_table, write_table
+from match_state import MatchState, row_fingerprints
+
+# Component order of the score tensor's last axis, and each component's weight in the final score
+SCORE_WEIGHTS = {'semantic_similarity': 0.35, 'keyword_overlap': 0.25, 'field_relevance': 0.0, 'expertise_level': 0.40}
+COMPONENT_NAMES = tuple(SCORE_WEIGHTS)
+
+
+class ModelLoadError(RuntimeError):
+    """The embedding model could not be loaded; unlike per-text encoding failures this stops the run."""
+
 
 class ExpertiseScorer:
-    def __init__(self):
-        nltk.download('stopwords', quiet=True)
-        self.model = SentenceTransformer('all-mpnet-base-v2')
-        self.tfidf = TfidfVectorizer(
-            stop_words='english',
-            ngram_range=(1, 2),
-            max_features=5000
-        )
+    """Scores poster/judge pairs. The sentence-transformers model and the TF-IDF vectorizer (and their
+    imports) are only loaded on first use, so runs served from the embedding cache never load the model.
+
+    embedding_backend picks the model and its precision (see embedding_backends.py); embedding_dtype
+    is the precision the vectors are kept and cached in ('float16' halves their memory).
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, cache_dtype: Optional[str] = None, cache_max_bytes: int = 256 * 1024 * 1024,
+                 model_server: Optional[str] = None, embedding_backend: str = DEFAULT_BACKEND,
+                 embedding_dtype: str = 'float32'):
+        if embedding_dtype not in EMBEDDING_DTYPES:
+            raise ValueError(f"Unknown embedding dtype '{embedding_dtype}'. Choose from: {', '.join(EMBEDDING_DTYPES)}")
+        self.embedding_backend = embedding_backend
+        self.model_name = backend_model_id(embedding_backend)
+        self.embedding_dtype = np.dtype(embedding_dtype)
+        self.model_server = model_server  # Unix socket of a running model_server.py, used instead of a local model
+        self._model = None
+        self._tfidf = None
+        self.embedded: Dict[str, np.ndarray] = {}  # text -> vector for every text embedded by this scorer
+        self.embedding_cache = EmbeddingCache(cache_dir, self.model_name, dtype=cache_dtype or embedding_dtype,
+                                              max_bytes=cache_max_bytes) if cache_dir else None
         self.field_relations = {
             'computer': ['software', 'programming', 'algorithms', 'data', 'ai', 'machine learning'],
             'electrical': ['circuits', 'electronics', 'signals', 'power', 'communications'],
@@ -29,6 +53,44 @@ class ExpertiseScorer:
             'mathematics': ['statistics', 'analysis', 'algorithms', 'computation']
         }
 
+    @property
+    def model(self):
+        if self._model is None:
+            if self.model_server:
+                self._model = connect_model_server(self.model_server, self.model_name)
+            if self._model is None:
+                with metrics.stage('model_load'):
+                    try:
+                        self._model = load_embedding_model(self.embedding_backend)
+                    except Exception as e:
+                        raise ModelLoadError(f"Could not load the {self.embedding_backend} embedding model: {e}") from e
+        return self._model
+
+    @property
+    def tfidf(self):
+        if self._tfidf is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            self._tfidf = TfidfVectorizer(
+                stop_words='english',
+                ngram_range=(1, 2),
+                max_features=5000
+            )
+        return self._tfidf
+
+    def tfidf_state(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(terms in column order, idf) of the fitted vectorizer; empty arrays if it was never fitted."""
+        vocabulary = getattr(self._tfidf, 'vocabulary_', None)
+        if not vocabulary: return np.array([], dtype=str), np.array([])
+        terms = sorted(vocabulary, key=vocabulary.get)
+        return np.array(terms, dtype=str), np.asarray(self._tfidf.idf_)
+
+    def restore_tfidf(self, terms: np.ndarray, idf: np.ndarray):
+        """Puts back a vectorizer saved with tfidf_state, so new texts are weighted exactly as in that run."""
+        self._tfidf = None
+        if not len(terms): return
+        self.tfidf.set_params(vocabulary={term: k for k, term in enumerate(terms.tolist())})
+        self._tfidf.idf_ = np.asarray(idf, dtype=np.float64)
+
     def preprocess_text(self, text: str) -> str:
         if pd.isna(text): return ""
         text = re.sub(r'[^a-zA-Z\s]', ' ', str(text).lower())
@@ -49,6 +111,19 @@ class ExpertiseScorer:
         except Exception as e:
             print(f"Warning: TF-IDF calculation failed: {e}"); return 0.0
 
+    def keyword_overlap_matrix(self, poster_texts: List[str], judge_texts: List[str]) -> np.ndarray:
+        """Fits TF-IDF once over all abstracts and judge texts and returns the (posters x judges) cosine matrix."""
+        result = np.zeros((len(poster_texts), len(judge_texts)))
+        corpus = list(dict.fromkeys(t for t in list(poster_texts) + list(judge_texts) if t.strip()))
+        if not corpus or not poster_texts or not judge_texts: return result
+        try:
+            self.tfidf.fit(corpus)
+            poster_matrix = self.tfidf.transform(poster_texts).tocsr()  # rows are L2-normalized, so dot products are cosines
+            judge_matrix = self.tfidf.transform(judge_texts).tocsr()
+            return (poster_matrix @ judge_matrix.T).toarray()
+        except Exception as e:
+            print(f"Warning: Corpus TF-IDF calculation failed: {e}"); return result
+
     def calculate_field_similarity(self, field1: str, field2: str) -> float:
         try:
             field1, field2 = str(field1).lower(), str(field2).lower()
@@ -59,6 +134,22 @@ class ExpertiseScorer:
         except Exception as e:
             print(f"Warning: Field similarity calculation failed: {e}"); return 0.0
 
+    def field_similarity_table(self, programs: List, departments: List) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Field relevance of every distinct (program, department) pair, compared case-insensitively.
+
+        Returns (table, program_codes, department_codes): table[program_codes[p], department_codes[j]]
+        is calculate_field_similarity(programs[p], departments[j]), evaluated once per distinct pair.
+        """
+        program_codes, program_keys = pd.factorize(pd.Series([str(v).lower() for v in programs], dtype=object))
+        department_codes, department_keys = pd.factorize(pd.Series([str(v).lower() for v in departments], dtype=object))
+        table = np.array([[self.calculate_field_similarity(program, department) for department in department_keys]
+                          for program in program_keys], dtype=np.float32).reshape(len(program_keys), len(department_keys))
+        return table, program_codes, department_codes
+
+    def expertise_vector(self, judge_texts: List[str]) -> np.ndarray:
+        """Expertise level of each judge text; it does not depend on the poster, so it is computed once per judge."""
+        return np.array([self.calculate_expertise_score(text) for text in judge_texts], dtype=np.float32)
+
     def calculate_expertise_score(self, text: str) -> float:
         try:
             if pd.isna(text) or not str(text).strip(): return 0.0
@@ -72,36 +163,105 @@ class ExpertiseScorer:
         except Exception as e:
             print(f"Warning: Expertise score calculation failed: {e}"); return 0.0
 
-    def calculate_match_score(self, poster_data: Dict, judge_data: Dict, professor_data: Optional[Dict]) -> Tuple[float, Dict[str, float]]:
+    def build_poster_text(self, poster_data: Dict) -> str:
+        return self.preprocess_text(str(poster_data.get('Abstract', '')))
+
+    def build_judge_text(self, professor_data: Optional[Dict]) -> str:
+        if not professor_data: return ""
+        return self.preprocess_text(' '.join([
+            str(professor_data.get('Current Research', '')),
+            str(professor_data.get('Areas of Interest / Research Interests', '')),
+            str(professor_data.get('Description', ''))
+        ]))
+
+    def encode_texts(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """Encodes each unique non-empty text once, in batches. Returns L2-normalized rows (zeros for empty texts).
+
+        With an embedding cache only texts never seen before are sent to the model.
+        """
+        unique_texts = list(dict.fromkeys(t for t in texts if t))
+        if not unique_texts: return np.zeros((len(texts), 0), dtype=np.float32)
+        known = {t: self.embedded[t] for t in unique_texts if t in self.embedded}
+        if self.embedding_cache and len(known) < len(unique_texts):
+            known.update(self.embedding_cache.get_many([t for t in unique_texts if t not in known]))
+        missing = [t for t in unique_texts if t not in known]
+        metrics.count('embedding.texts_cached', len(known))
+        metrics.count('embedding.texts_encoded', len(missing))
+        if missing:
+            with metrics.stage('embedding.encode'):
+                embeddings = np.asarray(self.model.encode(missing, batch_size=batch_size, show_progress_bar=False), dtype=np.float32)
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = (embeddings / np.where(norms > 0, norms, 1.0)).astype(self.embedding_dtype)
+            if self.embedding_cache:
+                embeddings = self.embedding_cache.put_many(missing, embeddings)
+                try:
+                    self.embedding_cache.save()
+                except Exception as e:
+                    print(f"Warning: Could not save embedding cache: {e}")
+            known.update(zip(missing, embeddings))
+        self.embedded.update(known)
+        dim = len(next(iter(known.values())))
+        result = np.zeros((len(texts), dim), dtype=self.embedding_dtype)
+        for i, t in enumerate(texts):
+            if t: result[i] = known[t]
+        return result
+
+    def embedded_vectors(self, texts: List[str]) -> np.ndarray:
+        """Vectors of texts this scorer has already embedded, without encoding anything; zero rows for the rest."""
+        dim = len(next(iter(self.embedded.values()))) if self.embedded else 0
+        result = np.zeros((len(texts), dim), dtype=self.embedding_dtype)
+        for i, t in enumerate(texts):
+            if t in self.embedded: result[i] = self.embedded[t]
+        return result
+
+    def semantic_similarity_matrix(self, poster_texts: List[str], judge_texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """Cosine similarity of every poster text against every judge text as a (posters x judges) matrix."""
+        if not poster_texts or not judge_texts: return np.zeros((len(poster_texts), len(judge_texts)))
+        try:
+            embeddings = self.encode_texts(list(poster_texts) + list(judge_texts), batch_size=batch_size)
+            if embeddings.shape[1] == 0: return np.zeros((len(poster_texts), len(judge_texts)))
+            poster_embeddings, judge_embeddings = embeddings[:len(poster_texts)], embeddings[len(poster_texts):]
+            return poster_embeddings.astype(np.float64) @ judge_embeddings.astype(np.float64).T
+        except ModelLoadError:
+            raise
+        except Exception as e:
+            print(f"Warning: Batched semantic similarity calculation failed: {e}")
+            return np.zeros((len(poster_texts), len(judge_texts)))
+
+    def calculate_match_score(self, poster_data: Dict, judge_data: Dict, professor_data: Optional[Dict],
+                              semantic_score: Optional[float] = None, keyword_score: Optional[float] = None) -> Tuple[float, Dict[str, float]]:
+        """Scores one poster/judge pair.
+
+        Precomputed semantic_score / keyword_score values (see semantic_similarity_matrix and
+        keyword_overlap_matrix) skip the per-pair encoding and TF-IDF fit.
+        """
         try:
             if not professor_data:
                 return 0.0, {'semantic_similarity': 0.0, 'keyword_overlap': 0.0, 'field_relevance': 0.0, 'expertise_level': 0.0}
 
-            poster_abstract = self.preprocess_text(str(poster_data.get('Abstract', '')))
-            judge_text = self.preprocess_text(' '.join([
-                str(professor_data.get('Current Research', '')),
-                str(professor_data.get('Areas of Interest / Research Interests', '')),
-                str(professor_data.get('Description', ''))
-            ]))
+            poster_abstract = self.build_poster_text(poster_data)
+            judge_text = self.build_judge_text(professor_data)
 
-            semantic_score = 0.0
-            if poster_abstract and judge_text:
-                try:
-                    poster_embedding = self.model.encode([poster_abstract])[0]
-                    judge_embedding = self.model.encode([judge_text])[0]
-                    semantic_score = float(np.dot(poster_embedding, judge_embedding) /
-                                        (np.linalg.norm(poster_embedding) * np.linalg.norm(judge_embedding)))
-                except Exception as e:
-                    print(f"Warning: Semantic similarity calculation failed: {e}")
+            if semantic_score is not None:
+                semantic_score = float(semantic_score)
+            else:
+                semantic_score = 0.0
+                if poster_abstract and judge_text:
+                    try:
+                        poster_embedding = self.model.encode([poster_abstract])[0]
+                        judge_embedding = self.model.encode([judge_text])[0]
+                        semantic_score = float(np.dot(poster_embedding, judge_embedding) /
+                                            (np.linalg.norm(poster_embedding) * np.linalg.norm(judge_embedding)))
+                    except Exception as e:
+                        print(f"Warning: Semantic similarity calculation failed: {e}")
 
-            keyword_score = float(self.calculate_keyword_overlap(poster_abstract, judge_text))
+            if keyword_score is None: keyword_score = self.calculate_keyword_overlap(poster_abstract, judge_text)
+            keyword_score = float(keyword_score)
             field_score = float(self.calculate_field_similarity(poster_data.get('Program', ''), judge_data.get('Department', '')))
             expertise_score = float(self.calculate_expertise_score(judge_text))
-            weights = {'semantic': 0.35, 'keyword': 0.25, 'field': 0.0, 'expertise': 0.40}
-            final_score = (semantic_score * weights['semantic'] + keyword_score * weights['keyword'] +
-                           field_score * weights['field'] + expertise_score * weights['expertise'])
             component_scores = {'semantic_similarity': semantic_score, 'keyword_overlap': keyword_score,
                                 'field_relevance': field_score, 'expertise_level': expertise_score}
+            final_score = sum(component_scores[name] * weight for name, weight in SCORE_WEIGHTS.items())
             return float(final_score), component_scores
 
         except Exception as e:
@@ -109,64 +269,59 @@ class ExpertiseScorer:
             return 0.0, {'semantic_similarity': 0.0, 'keyword_overlap': 0.0, 'field_relevance': 0.0, 'expertise_level': 0.0}
 
 
-def perform_matching(posters_file, judges_file, professors_file, output_posters_file, output_judges_file):
-    """Performs the judge-poster matching and saves the results."""
-    try:
-        print("Loading data files... ", end="", flush=True)
-        posters = pd.read_excel(posters_file, engine='openpyxl')
-        judges = pd.read_excel(judges_file, engine='openpyxl')
-        professors = pd.read_excel(professors_file, engine='openpyxl')
-        print("Data files loaded successfully!")
-
-        scorer = ExpertiseScorer()
-        judge_professor_matches = {}
-
-        print("Matching judges with professors... ", end="", flush=True)
-        for _, judge in judges.iterrows():
-            for _, prof in professors.iterrows():
-                prof_name = str(prof['Professor Name']).lower()
-                if (str(judge['Judge FirstName']).lower() in prof_name and
-                    str(judge['Judge LastName']).lower() in prof_name):
-                    judge_professor_matches[judge['Judge']] = prof.to_dict()
-                    break
-        print("Judge-professor matching complete.")
-
-        assignments = []
-        print("Calculating match scores... This might take a while, brewing some coffee... ☕", end="", flush=True)
-        start_time = time.time()
-        dot_count = 0
-        for i, poster in posters.iterrows():
-            pid = poster['Poster #']
-            time_slot = 1 if pid % 2 == 1 else 2
-            for j, judge in judges.iterrows():
-                jid = judge['Judge']
-                if str(judge['Hour available']).lower() == 'both' or int(judge['Hour available']) == time_slot:
-                    try:
-                        score, components = scorer.calculate_match_score(poster.to_dict(), judge.to_dict(), judge_professor_matches.get(jid))
-                        assignments.append({'poster_id': pid, 'judge_id': jid, 'score': score, 'components': components, 'time_slot': time_slot})
-                    except Exception as e:
-                        print(f"Warning: Assignment calculation failed for poster {pid} and judge {jid}: {e}")
-
-                    # Fun progress indicator
-                    if time.time() - start_time > 1:  # Print a dot every second
-                        print("." * (dot_count % 4), end="\r", flush=True)  # Cycle through 0-3 dots
-                        dot_count += 1
-                        start_time = time.time()
-        print("\nMatch scores calculated!  Phew, that was intense!")
-
-        assignments.sort(key=lambda x: float(x['score']), reverse=True)
-        poster_assignments, judge_assignments = {pid: [] for pid in posters['Poster #']}, {jid: [] for jid in judges['Judge']}
-        MAX_POSTERS_PER_JUDGE = 6
-
-        print("Assigning judges to posters... ", end="", flush=True)
-        for assignment in assignments:
-            pid, jid = assignment['poster_id'], assignment['judge_id']
-            if len(poster_assignments[pid]) < 2 and len(judge_assignments[jid]) < MAX_POSTERS_PER_JUDGE:
-                poster_assignments[pid].append(jid)
-                judge_assignments[jid].append(pid)
-        print("Assignments complete.")
-
-        print("Preparing output data... ", end="", flush=True)
+def poster_time_slot(pid) -> int:
+    return 1 if pid % 2 == 1 else 2
+
+
+def availability_mask(posters: pd.DataFrame, judges: pd.DataFrame, conflicts: np.ndarray) -> np.ndarray:
+    """(posters x judges) mask of pairs in the same time slot that are not advisor conflicts."""
+    slots = np.array([poster_time_slot(pid) for pid in posters['Poster #']])
+    hours = judges['Hour available'].astype(str).str.strip().str.lower()
+    both = (hours == 'both').to_numpy()
+    hour_numbers = pd.to_numeric(hours, errors='coerce').to_numpy()
+    return (both[None, :] | (hour_numbers[None, :] == slots[:, None])) & ~conflicts
+
+
+def resolve_judge_profiles(professors: pd.DataFrame, judges: pd.DataFrame,
+                           fuzzy_cutoff: Optional[float] = None) -> Tuple[ProfessorNameIndex, Dict]:
+    """Finds each judge's faculty profile by name; returns the name index and {judge id: professor record}.
+
+    fuzzy_cutoff switches on the name index's fuzzy fallback (off by default); each fuzzy match is printed.
+    """
+    print("Matching judges with professors... ", end="", flush=True)
+    with metrics.stage('name_resolution'):
+        name_index = ProfessorNameIndex(professors, fuzzy_cutoff=fuzzy_cutoff)
+        resolution = name_index.resolve(judges, 'Judge', 'Judge FirstName', 'Judge LastName')
+        judge_professor_matches = {jid: name_index.record(row) for jid, row in resolution.matches.items()}
+    print(f"Judge-professor matching complete: {resolution.report()}.")
+    if resolution.unmatched:
+        print(f"  No faculty profile found for judges: {', '.join(map(str, resolution.unmatched))}")
+    for jid, rows in resolution.ambiguous.items():
+        print(f"  Judge {jid} matches several profiles ({', '.join(name_index.names[r] for r in rows)}); using the first.")
+    if resolution.fuzzy:
+        full_names = judges['Judge FirstName'].fillna('').astype(str) + ' ' + judges['Judge LastName'].fillna('').astype(str)
+        judge_names = dict(zip(judges['Judge'], full_names.str.strip()))
+        for jid, row in resolution.fuzzy.items():
+            print(f"  Judge {jid} ('{judge_names[jid]}') matched by fuzzy name to '{name_index.names[row]}'.")
+    metrics.set('judges_matched', len(resolution.matches)); metrics.set('judges_unmatched', len(resolution.unmatched))
+    return name_index, judge_professor_matches
+
+
+def judge_fingerprints(judge_records: List[Dict], judge_professor_matches: Dict) -> np.ndarray:
+    """Fingerprints of the judges' rows together with their faculty profiles (see match_state.row_fingerprints)."""
+    return row_fingerprints([{**judge, 'Profile': judge_professor_matches.get(judge['Judge'])} for judge in judge_records])
+
+
+def write_match_outputs(posters: pd.DataFrame, judges: pd.DataFrame, pairs: List[Tuple[int, int]], output_posters_file, output_judges_file):
+    """Writes the posters with their assigned judges and the judges with their assigned posters."""
+    poster_ids, judge_ids = posters['Poster #'].tolist(), judges['Judge'].tolist()
+    poster_assignments, judge_assignments = {pid: [] for pid in posters['Poster #']}, {jid: [] for jid in judges['Judge']}
+    for i, j in pairs:
+        poster_assignments[poster_ids[i]].append(judge_ids[j])
+        judge_assignments[judge_ids[j]].append(poster_ids[i])
+
+    print("Preparing output data... ", end="", flush=True)
+    with metrics.stage('prepare_output'):
         output_posters = [{**poster.to_dict(), 'Assigned Judge 1 ID': assigned[0] if len(assigned) > 0 else None,
                            'Assigned Judge 2 ID': assigned[1] if len(assigned) > 1 else None}
                           for _, poster in posters.iterrows() for assigned in [poster_assignments[poster['Poster #']]]]
@@ -178,16 +333,160 @@ def perform_matching(posters_file, judges_file, professors_file, output_posters_
             for i in range(len(judge_data)-5,MAX_POSTERS_PER_JUDGE+1):
                 if f'Assigned Poster {i} ID' not in judge_data:
                    judge_data[f'Assigned Poster {i} ID']=None
-        print("Output data prepared.")
+    print("Output data prepared.")
+
+    print("Saving results... ", end="", flush=True)
+    with metrics.stage('write_output'):
+        write_table(pd.DataFrame(output_posters), output_posters_file)
+        write_table(pd.DataFrame(output_judges), output_judges_file)
+    print(f"\nMatching completed! Output files saved to {output_posters_file} and {output_judges_file}")
+
 
-        print("Saving results to Excel files... ", end="", flush=True)
-        pd.DataFrame(output_posters).to_excel(output_posters_file, index=False, engine='openpyxl')
-        pd.DataFrame(output_judges).to_excel(output_judges_file, index=False, engine='openpyxl')
-        print(f"\nMatching completed! Output files saved to {output_posters_file} and {output_judges_file}")
+def perform_matching(posters_file, judges_file, professors_file, output_posters_file, output_judges_file, embedding_batch_size=64,
+                     embedding_cache_dir=None, assignment_engine='optimal', report_file=None, profile_file=None,
+                     model_server=None, embedding_backend=DEFAULT_BACKEND, embedding_dtype='float32', state_file=None,
+                     fuzzy_name_cutoff=None):
+    """Performs the judge-poster matching and saves the results.
 
+    If embedding_cache_dir is given, embeddings are reused across runs and only new or edited texts are encoded.
+    assignment_engine picks the solver from assigner.ASSIGNMENT_ENGINES ('optimal' or the faster 'greedy').
+    Scores are kept as a (posters x judges x components) float32 tensor with an availability mask and
+    reduced to one score matrix with SCORE_WEIGHTS. Every component is computed per poster, per judge or
+    per distinct (Program, Department) pair and broadcast into the tensor; nothing is evaluated per pair.
+    model_server is the socket of a running model_server.py that encodes texts with an already loaded model.
+    embedding_backend and embedding_dtype select a smaller or quantized model and float16 vectors (see embedding_backends.py).
+    report_file writes per-stage timings and counters as JSON (see instrumentation.py); profile_file
+    profiles the whole run (.html for pyinstrument, anything else is a cProfile dump).
+    state_file saves the scores, embeddings and assignment (match_state.py) for a later rematch.py run.
+    fuzzy_name_cutoff opts in to fuzzy judge/advisor name matching (name_index.FUZZY_NAME_CUTOFF); off by default.
+    """
+    run_instrumented(lambda: _run_matching(posters_file, judges_file, professors_file, output_posters_file, output_judges_file,
+                                           embedding_batch_size, embedding_cache_dir, assignment_engine,
+                                           model_server, embedding_backend, embedding_dtype, state_file, fuzzy_name_cutoff),
+                     report_file, profile_file)
+
+
+def run_instrumented(run, report_file=None, profile_file=None, label='matching/assignment'):
+    """Calls run() with the run report and profiler switched on as requested (see perform_matching)."""
+    was_enabled = metrics.enabled
+    if report_file or profile_file:
+        metrics.enabled = True
+        metrics.reset()
+    try:
+        with profiling(profile_file):
+            run()
+        metrics.set('status', 'ok')
     except Exception as e:
-        print(f"Error in matching/assignment: {e}")
+        print(f"Error in {label}: {e}")
+        metrics.set('status', f"failed: {e}")
         raise
+    finally:
+        if report_file:
+            try:
+                metrics.write_report(report_file)
+                print(f"Run report written to {report_file}")
+            except OSError as e:
+                print(f"Warning: Could not write run report: {e}")
+        metrics.enabled = was_enabled
+
+
+def _run_matching(posters_file, judges_file, professors_file, output_posters_file, output_judges_file, embedding_batch_size,
+                  embedding_cache_dir, assignment_engine, model_server, embedding_backend, embedding_dtype,
+                  state_file=None, fuzzy_name_cutoff=None):
+    print("Loading data files... ", end="", flush=True)
+    with metrics.stage('load_data'):
+        posters = read_table(posters_file)
+        judges = read_table(judges_file)
+        professors = read_table(professors_file)
+    print("Data files loaded successfully!")
+    metrics.set('posters', len(posters)); metrics.set('judges', len(judges)); metrics.set('professors', len(professors))
+    metrics.set('assignment_engine', assignment_engine)
+    metrics.set('embedding_backend', embedding_backend); metrics.set('embedding_dtype', embedding_dtype)
+
+    with metrics.stage('scorer_init'):
+        scorer = ExpertiseScorer(cache_dir=embedding_cache_dir, model_server=model_server,
+                                 embedding_backend=embedding_backend, embedding_dtype=embedding_dtype)
+
+    name_index, judge_professor_matches = resolve_judge_profiles(professors, judges, fuzzy_name_cutoff)
+
+    with metrics.stage('advisor_conflicts'):
+        conflicts = advisor_conflict_mask(name_index, posters, judges)
+    print(f"Advisor conflicts excluded: {int(conflicts.sum())} poster/judge pairs.")
+    metrics.set('advisor_conflicts', int(conflicts.sum()))
+
+    print("Embedding abstracts and judge profiles in batches... ", end="", flush=True)
+    with metrics.stage('build_texts'):
+        poster_texts = [scorer.build_poster_text(poster.to_dict()) for _, poster in posters.iterrows()]
+        judge_texts = [scorer.build_judge_text(judge_professor_matches.get(jid)) for jid in judges['Judge']]
+    with metrics.stage('component.semantic_similarity'):
+        semantic_matrix = scorer.semantic_similarity_matrix(poster_texts, judge_texts, batch_size=embedding_batch_size)
+    print(f"Semantic similarity matrix ready ({semantic_matrix.shape[0]} x {semantic_matrix.shape[1]}).")
+    if scorer.embedding_cache:
+        print(f"Embedding cache: {scorer.embedding_cache.hits} hits, {scorer.embedding_cache.misses} misses.")
+        metrics.set('embedding_cache', {'hits': scorer.embedding_cache.hits, 'misses': scorer.embedding_cache.misses})
+
+    print("Fitting TF-IDF over all abstracts and judge profiles... ", end="", flush=True)
+    with metrics.stage('component.keyword_overlap'):
+        keyword_matrix = scorer.keyword_overlap_matrix(poster_texts, judge_texts)
+    tfidf_terms = len(scorer.tfidf.vocabulary_) if hasattr(scorer.tfidf, 'vocabulary_') else 0
+    print(f"Keyword overlap matrix ready ({tfidf_terms} terms).")
+    metrics.set('tfidf_terms', tfidf_terms)
+
+    print("Computing field relevance and expertise features... ", end="", flush=True)
+    with metrics.stage('component.field_relevance'):
+        poster_records, judge_records = posters.to_dict('records'), judges.to_dict('records')
+        field_table, program_codes, department_codes = scorer.field_similarity_table(
+            [poster.get('Program', '') for poster in poster_records], [judge.get('Department', '') for judge in judge_records])
+    with metrics.stage('component.expertise_level'):
+        expertise = scorer.expertise_vector(judge_texts)
+    print(f"Field relevance table ready ({field_table.shape[0]} programs x {field_table.shape[1]} departments).")
+
+    print("Calculating match scores... ", end="", flush=True)
+    with metrics.stage('pair_scoring'):
+        available = availability_mask(posters, judges, conflicts)
+        has_profile = np.array([jid in judge_professor_matches for jid in judges['Judge']])
+        scored = available & has_profile[None, :]  # Pairs whose judge has no profile keep all-zero components
+        score_tensor = np.zeros((len(posters), len(judges), len(COMPONENT_NAMES)), dtype=np.float32)
+        components = {'semantic_similarity': semantic_matrix, 'keyword_overlap': keyword_matrix,
+                      'field_relevance': field_table[np.ix_(program_codes, department_codes)], 'expertise_level': expertise[None, :]}
+        for c, name in enumerate(COMPONENT_NAMES):
+            score_tensor[..., c] = np.where(scored, components[name], 0.0)
+    # Field relevance and expertise used to be evaluated for each scored pair; now once per distinct input
+    pairs_scored = int(scored.sum())
+    feature_work = {'field_relevance': int(field_table.size), 'expertise_level': len(expertise), 'per_pair_before': 2 * pairs_scored}
+    metrics.set('feature_evaluations', feature_work)
+    with metrics.stage('score_reduction'):
+        weights = np.array([SCORE_WEIGHTS[name] for name in COMPONENT_NAMES])
+        score_matrix = np.einsum('pjc,c->pj', score_tensor, weights)  # One weighted reduction over the component axis
+    print(f"Match scores calculated for {int(available.sum())} pairs!  Phew, that was intense!")
+    print(f"Field and expertise features: {feature_work['field_relevance'] + feature_work['expertise_level']} evaluations "
+          f"instead of {feature_work['per_pair_before']} per pair ({pairs_scored} pairs scored).")
+    metrics.set('pairs_available', int(available.sum())); metrics.set('pairs_scored', pairs_scored)
+    poster_ids, judge_ids = posters['Poster #'].tolist(), judges['Judge'].tolist()
+
+    print(f"Assigning judges to posters ({assignment_engine})... ", end="", flush=True)
+    with metrics.stage('assignment'):
+        pairs, engine_report = assign(score_matrix, available, engine=assignment_engine,
+                                      judges_per_poster=JUDGES_PER_POSTER, max_posters_per_judge=MAX_POSTERS_PER_JUDGE)
+    print("Assignments complete.")
+    for engine, stats in engine_report.items():
+        print(f"  {engine:>8}: objective {stats['objective']:.4f}, {stats['filled_slots']} slots filled, "
+              f"{stats['understaffed_posters']} posters with fewer than {JUDGES_PER_POSTER} judges")
+    metrics.set('assignment', engine_report)
+
+    write_match_outputs(posters, judges, pairs, output_posters_file, output_judges_file)
+
+    if state_file:
+        with metrics.stage('save_state'):
+            tfidf_terms, tfidf_idf = scorer.tfidf_state()
+            MatchState(poster_ids=np.array(poster_ids, dtype=str), judge_ids=np.array(judge_ids, dtype=str),
+                       poster_fingerprints=row_fingerprints(poster_records), judge_fingerprints=judge_fingerprints(judge_records, judge_professor_matches),
+                       scored=scored, scores=score_matrix[scored].astype(np.float32),
+                       poster_embeddings=scorer.embedded_vectors(poster_texts), judge_embeddings=scorer.embedded_vectors(judge_texts),
+                       tfidf_terms=tfidf_terms, tfidf_idf=tfidf_idf, pairs=np.array(pairs, dtype=np.int64).reshape(-1, 2),
+                       weights=weights, embedding_backend=embedding_backend, embedding_dtype=embedding_dtype).save(state_file)
+        print(f"Match state saved to {state_file} (for driver.py --rematch)")
+
 
 if __name__ == '__main__':
     print("Starting the matching process... ✨")
@@ -1,35 +1,108 @@
 # matrix_creator.py
+import numpy as np
 import pandas as pd
-import sys
+from scipy import sparse
+from table_io import read_table, write_table
 
-def create_poster_judge_matrix(posters_excel_path, judges_excel_path, output_excel_path):
-    """Creates a binary matrix of poster-judge assignments."""
+ASSIGNED_JUDGE_COLUMNS = ['Assigned Judge 1 ID', 'Assigned Judge 2 ID']
+
+
+def _id_strings(values) -> np.ndarray:
+    """IDs as strings, the way the matrix columns are labelled (missing values become 'nan')."""
+    return np.asarray(values, dtype=object).astype(str)
+
+
+def sorted_judge_ids(judge_ids) -> np.ndarray:
+    """Unique judge IDs in first-seen order, then stably sorted as if zero-padded to 4 characters (numeric order for short IDs)."""
+    unique = pd.unique(_id_strings(judge_ids))
+    return unique[np.argsort(np.char.zfill(unique.astype(str), 4), kind='stable')]
+
+
+def build_assignment_matrix(posters_df: pd.DataFrame, judges_df: pd.DataFrame):
+    """Builds the poster x judge assignment matrix as a SciPy CSR matrix in one vectorized step.
+
+    Returns (matrix, poster_ids, judge_ids, unknown), where unknown lists (poster, judge ID) pairs whose
+    judge is not in the judges file, in file order; those pairs are left out of the matrix.
+    """
+    judge_ids = sorted_judge_ids(judges_df['Judge No. #'])
+    poster_ids = np.unique(posters_df['Poster #'].to_numpy())
+    assigned = np.char.strip(_id_strings(posters_df[ASSIGNED_JUDGE_COLUMNS].to_numpy().ravel()))  # row-major: judge 1, judge 2 of each poster
+    poster_of = np.repeat(posters_df['Poster #'].to_numpy(), len(ASSIGNED_JUDGE_COLUMNS))
+
+    unknown_ids = set(assigned) - set(judge_ids)
+    known = ~np.isin(assigned, list(unknown_ids)) if unknown_ids else np.ones(len(assigned), dtype=bool)
+    unknown = [(p, j) for p, j in zip(poster_of[~known], assigned[~known])]
+
+    rows = np.searchsorted(poster_ids, poster_of[known])
+    cols = pd.Index(judge_ids).get_indexer(assigned[known])
+    matrix = sparse.coo_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(len(poster_ids), len(judge_ids))).tocsr()
+    matrix.data[:] = 1  # a judge listed twice for the same poster is still one assignment
+    return matrix, poster_ids, judge_ids, unknown
+
+
+def assignment_long_form(matrix, poster_ids, judge_ids) -> pd.DataFrame:
+    """One row per assigned (Poster #, Judge #), poster-major. Posters and judges with no assignment get one
+    row with the other column empty, so the matrix can be rebuilt exactly (matrix_from_long_form).
+    """
+    coo = matrix.tocoo()
+    order = np.lexsort((coo.col, coo.row))
+    rows, cols = coo.row[order], coo.col[order]
+    idle_posters = np.setdiff1d(np.arange(len(poster_ids)), rows)
+    idle_judges = np.setdiff1d(np.arange(len(judge_ids)), cols)
+    posters = pd.array(np.concatenate([poster_ids[rows], poster_ids[idle_posters]]).tolist() + [None] * len(idle_judges), dtype='Int64')
+    judges = list(judge_ids[cols]) + [None] * len(idle_posters) + list(judge_ids[idle_judges])
+    return pd.DataFrame({'Poster #': posters, 'Judge #': pd.array(judges, dtype=object)})
+
+
+def matrix_from_long_form(long_df: pd.DataFrame):
+    """(matrix, poster_ids, judge_ids) from assignment_long_form's table; judge IDs are ordered as in sorted_judge_ids."""
+    posters = long_df['Poster #']
+    judges = long_df['Judge #'].map(lambda v: v if pd.isna(v) else str(int(v)) if isinstance(v, float) else str(v).strip())
+    poster_ids = np.unique(posters.dropna().to_numpy(dtype=np.int64))
+    judge_ids = sorted_judge_ids(judges.dropna())
+    pairs = posters.notna().to_numpy() & judges.notna().to_numpy()
+    rows = np.searchsorted(poster_ids, posters[pairs].to_numpy(dtype=np.int64))
+    cols = pd.Index(judge_ids).get_indexer(judges[pairs].to_numpy())
+    matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(len(poster_ids), len(judge_ids)))
+    return matrix, poster_ids, judge_ids
+
+
+def dense_assignment_frame(matrix, poster_ids, judge_ids) -> pd.DataFrame:
+    """The wide sheet for people: 'Poster #' then one 0/1 column per judge."""
+    dense = pd.DataFrame(matrix.toarray().astype(np.int64), columns=list(judge_ids))
+    dense.insert(0, 'Poster #', poster_ids)
+    return dense
+
+
+def create_poster_judge_matrix(posters_excel_path, judges_excel_path, output_excel_path=None, long_output_path=None):
+    """Creates a binary matrix of poster-judge assignments.
+
+    output_excel_path receives the dense wide sheet (poster rows, judge columns) and long_output_path
+    the sparse long form that Part 2 reads (see assignment_long_form); either may be None. Each path
+    can be any table_io format (.parquet, .csv, .xlsx, ...), chosen by its extension.
+    """
     try:
-        posters_df = pd.read_excel(posters_excel_path, dtype={'Poster #': int, 'Assigned Judge 1 ID': str, 'Assigned Judge 2 ID': str}, engine='openpyxl')
-        judges_df = pd.read_excel(judges_excel_path, dtype={'Judge No. #': str}, engine='openpyxl')
+        posters_df = read_table(posters_excel_path, dtype={'Poster #': int, 'Assigned Judge 1 ID': str, 'Assigned Judge 2 ID': str})
+        judges_df = read_table(judges_excel_path, dtype={'Judge No. #': str})
 
-        required_poster_columns = ['Poster #', 'Assigned Judge 1 ID', 'Assigned Judge 2 ID']
+        required_poster_columns = ['Poster #'] + ASSIGNED_JUDGE_COLUMNS
         required_judge_columns = ['Judge No. #']
         for col in required_poster_columns:
             if col not in posters_df.columns: raise ValueError(f"Missing required column in posters file: {col}")
         for col in required_judge_columns:
             if col not in judges_df.columns: raise ValueError(f"Missing required column in judges file: {col}")
 
-        judge_ids = sorted(judges_df['Judge No. #'].astype(str).unique(), key=lambda x: x.zfill(4))
-        poster_ids = sorted(posters_df['Poster #'].unique())
-        matrix = pd.DataFrame(0, index=poster_ids, columns=judge_ids, dtype=int)
-
-        for _, row in posters_df.iterrows():
-            poster_id = row['Poster #']
-            judges = [str(row['Assigned Judge 1 ID']).strip(), str(row['Assigned Judge 2 ID']).strip()]
-            for judge in judges:
-                if judge in matrix.columns:
-                    matrix.at[poster_id, judge] = 1
-                else:
-                    print(f"Warning: Judge {judge} not found in judges list (Poster {poster_id})")
+        matrix, poster_ids, judge_ids, unknown = build_assignment_matrix(posters_df, judges_df)
+        for poster_id, judge in unknown:
+            print(f"Warning: Judge {judge} not found in judges list (Poster {poster_id})")
 
-        matrix.to_excel(output_excel_path, index_label='Poster #', engine='openpyxl')
-        print(f"Successfully created matrix at {output_excel_path}")
+        if long_output_path:
+            write_table(assignment_long_form(matrix, poster_ids, judge_ids), long_output_path)
+            print(f"Successfully created assignment list at {long_output_path}")
+        if output_excel_path:
+            write_table(dense_assignment_frame(matrix, poster_ids, judge_ids), output_excel_path)
+            print(f"Successfully created matrix at {output_excel_path}")
+        return matrix, poster_ids, judge_ids
 
     except Exception as e:
         print(f"Error creating matrix: {e}")
@@ -40,4 +113,4 @@ if __name__ == '__main__':
     # Replace these with your actual file paths if you want to test this script independently
     create_poster_judge_matrix("new_sample_input_abstracts.xlsx",
                              "new_example_list_judges.xlsx",
-                             "judge_poster_assignment_matrix.xlsx")
\ No newline at end of file
+                             "judge_poster_assignment_matrix.xlsx")
@@ -0,0 +1,239 @@
+# model_server.py
+"""Long-lived local server that keeps the sentence-transformers model loaded between matching runs.
+
+Loading the model takes several seconds; with the server running, perform_matching (and
+driver.py --model-server) sends the texts it needs encoded over a Unix socket instead of loading
+the model itself. The server also remembers every text it has encoded, so re-matches after small
+edits to the abstracts or judge list only encode what changed.
+
+Requests and replies are pickled, so only this user may talk to the server: the default socket lives
+in a private directory ($XDG_RUNTIME_DIR, else ~/.cache, under ecs-matcher/, mode 0700), clients
+check that the socket belongs to them before connecting, and both sides prove they know the key in
+~/.cache/ecs-matcher/model-server.key (mode 0600, created by the server) before anything is unpickled.
+
+Usage:
+    python model_server.py                 # serve on the default socket
+    python driver.py --model-server        # use it (falls back to a local model if it is not running)
+    python model_server.py --stop
+"""
+import argparse
+import os
+import secrets
+import sys
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import Dict, List, Optional
+import numpy as np
+from embedding_backends import DEFAULT_BACKEND, EMBEDDING_BACKENDS, backend_model_id, load_embedding_model
+
+PRIVATE_DIR = os.path.join(os.environ.get('XDG_RUNTIME_DIR') or os.path.join(os.path.expanduser('~'), '.cache'), 'ecs-matcher')
+DEFAULT_SOCKET = os.path.join(PRIVATE_DIR, 'model-server.sock')
+AUTHKEY_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'ecs-matcher', 'model-server.key')
+
+
+def _check_owner(path: str, st: os.stat_result):
+    if hasattr(os, 'getuid') and st.st_uid != os.getuid():
+        raise PermissionError(f"{path} belongs to another user")
+
+
+def load_authkey(create: bool = False) -> bytes:
+    """The key shared by server and clients; the server creates it (mode 0600) if it does not exist yet."""
+    if create and not os.path.exists(AUTHKEY_FILE):
+        os.makedirs(os.path.dirname(AUTHKEY_FILE), mode=0o700, exist_ok=True)
+        try:
+            fd = os.open(AUTHKEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(secrets.token_bytes(32))
+        except FileExistsError:
+            pass  # another server created it first
+    with open(AUTHKEY_FILE, 'rb') as f:
+        st = os.fstat(f.fileno())
+        _check_owner(AUTHKEY_FILE, st)
+        if st.st_mode & 0o077: raise PermissionError(f"{AUTHKEY_FILE} is readable by other users (chmod 600 it)")
+        return f.read()
+
+
+def connect(socket_path: str):
+    """An authenticated connection to the server on socket_path, after checking the socket is this user's."""
+    _check_owner(socket_path, os.stat(socket_path))
+    return Client(socket_path, family='AF_UNIX', authkey=load_authkey())
+
+
+class ModelServer:
+    """Serves encode requests for one embedding backend over a Unix socket, one thread per client connection."""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, backend: str = DEFAULT_BACKEND, max_memo_texts: int = 200_000):
+        self.socket_path, self.backend, self.max_memo_texts = socket_path, backend, max_memo_texts
+        self.model_name = backend_model_id(backend)
+        self.model = None
+        self.memo: Dict[str, np.ndarray] = {}  # text -> raw model output
+        self.lock = threading.Lock()  # one encode at a time; the model is not shared across threads
+        self.listener = None
+        self.stopping = False
+
+    def load(self):
+        start = time.perf_counter()
+        self.model = load_embedding_model(self.backend)
+        print(f"Model {self.model_name} loaded in {time.perf_counter() - start:.1f} s")
+
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        with self.lock:
+            missing = [t for t in dict.fromkeys(texts) if t not in self.memo]
+            if missing:
+                if len(self.memo) + len(missing) > self.max_memo_texts: self.memo.clear()
+                embeddings = np.asarray(self.model.encode(missing, batch_size=batch_size, show_progress_bar=False), dtype=np.float32)
+                self.memo.update(zip(missing, embeddings))
+            return np.stack([self.memo[t] for t in texts]) if texts else np.zeros((0, 0), dtype=np.float32)
+
+    def handle(self, request: Dict) -> Dict:
+        op = request.get('op')
+        if op == 'ping': return {'model': self.model_name, 'pid': os.getpid(), 'memo_texts': len(self.memo)}
+        if op == 'encode': return {'embeddings': self.encode(list(request['texts']), request.get('batch_size', 64))}
+        if op == 'shutdown': return {'stopped': True}  # the connection handler stops the server once this is sent
+        return {'error': f"unknown request '{op}'"}
+
+    def _serve_connection(self, conn):
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    reply = self.handle(request)
+                except Exception as e:
+                    reply = {'error': str(e)}
+                try:
+                    conn.send(reply)
+                except OSError:
+                    return
+                if reply.get('stopped'):
+                    self.stop()
+                    return
+
+    def serve_forever(self):
+        if os.path.exists(self.socket_path):
+            if server_info(self.socket_path):
+                raise RuntimeError(f"a model server is already running on {self.socket_path}")
+            os.remove(self.socket_path)  # left behind by a server that did not shut down cleanly
+        if self.model is None: self.load()
+        authkey = load_authkey(create=True)
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), mode=0o700, exist_ok=True)
+        old_umask = os.umask(0o177)  # only this user may connect: requests are pickled
+        try:
+            self.listener = Listener(self.socket_path, family='AF_UNIX', authkey=authkey)
+        finally:
+            os.umask(old_umask)
+        print(f"Model server listening on {self.socket_path} (stop with: python model_server.py --stop)")
+        try:
+            while True:
+                try:
+                    conn = self.listener.accept()
+                except (AuthenticationError, EOFError, OSError) as e:  # a client without the key, or one that hung up
+                    if self.stopping: break
+                    print(f"Warning: Rejected a connection: {e}")
+                    continue
+                if self.stopping:
+                    conn.close()
+                    break
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+        finally:
+            self.listener.close()  # also removes the socket file
+            print("Model server stopped.")
+
+    def stop(self):
+        """Makes the accept loop exit; a throwaway connection wakes it up."""
+        if self.stopping: return
+        self.stopping = True
+        try:
+            connect(self.socket_path).close()
+        except (OSError, EOFError, AuthenticationError):
+            pass
+
+
+class ModelServerClient:
+    """Stands in for a SentenceTransformer: encode() is answered by a running ModelServer."""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET):
+        self.socket_path = socket_path
+        self.conn = connect(socket_path)
+        self.lock = threading.Lock()
+
+    def request(self, **request) -> Dict:
+        with self.lock:
+            self.conn.send(request)
+            reply = self.conn.recv()
+        if 'error' in reply: raise RuntimeError(f"model server: {reply['error']}")
+        return reply
+
+    def encode(self, texts, batch_size: int = 64, show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+        return self.request(op='encode', texts=list(texts), batch_size=batch_size)['embeddings']
+
+    def close(self):
+        self.conn.close()
+
+
+def server_info(socket_path: str = DEFAULT_SOCKET) -> Optional[Dict]:
+    """The running server's ping reply, or None if nothing answers on socket_path."""
+    try:
+        client = ModelServerClient(socket_path)
+    except (OSError, EOFError, AuthenticationError):
+        return None
+    try:
+        return client.request(op='ping')
+    except (OSError, EOFError, RuntimeError):
+        return None
+    finally:
+        client.close()
+
+
+def connect_model_server(socket_path: str, model_name: str) -> Optional[ModelServerClient]:
+    """A client for the server on socket_path, or None (with a warning) if it is not running or serves another model."""
+    try:
+        client = ModelServerClient(socket_path)
+        info = client.request(op='ping')
+    except (OSError, EOFError, RuntimeError, AuthenticationError) as e:
+        print(f"Warning: No model server on {socket_path} ({e}); loading the model locally")
+        return None
+    if info['model'] != model_name:
+        print(f"Warning: The model server on {socket_path} serves {info['model']}, not {model_name}; loading the model locally")
+        client.close()
+        return None
+    print(f"Using the model server on {socket_path} (pid {info['pid']}, {info['memo_texts']} texts already encoded)")
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep the sentence-transformers model loaded for repeated matching runs.")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help=f"Unix socket path (default: {DEFAULT_SOCKET})")
+    parser.add_argument('--backend', default=DEFAULT_BACKEND, choices=list(EMBEDDING_BACKENDS),
+                        help=f"Embedding backend to serve (default: {DEFAULT_BACKEND})")
+    parser.add_argument('--stop', action='store_true', help="Stop the server running on --socket")
+    parser.add_argument('--status', action='store_true', help="Show whether a server is running on --socket")
+    args = parser.parse_args()
+
+    if args.stop or args.status:
+        info = server_info(args.socket)
+        if info is None:
+            print(f"No model server on {args.socket}")
+        elif args.stop:
+            client = ModelServerClient(args.socket)
+            client.request(op='shutdown')
+            client.close()
+            print(f"Stopped the model server (pid {info['pid']})")
+        else:
+            print(f"Model server on {args.socket}: pid {info['pid']}, model {info['model']}, {info['memo_texts']} texts encoded")
+        return
+    try:
+        ModelServer(args.socket, args.backend).serve_forever()
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
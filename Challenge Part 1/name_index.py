@@ -0,0 +1,110 @@
+# name_index.py
+import difflib
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+FUZZY_NAME_CUTOFF = 0.85  # difflib ratio used when the fuzzy fallback is switched on (driver.py --fuzzy-names)
+
+
+def normalize_names(names: pd.Series) -> pd.Series:
+    """Lowercases names and reduces them to space-separated letter tokens ("C.Y. Roger" -> "c y roger")."""
+    return names.fillna('').astype(str).str.lower().str.replace(r'[^a-z\s]', ' ', regex=True).str.split().str.join(' ')
+
+
+class NameResolution:
+    """Result of resolving a table of people against the professor directory."""
+
+    def __init__(self):
+        self.matches: Dict[object, int] = {}  # person id -> professor row
+        self.unmatched: List[object] = []
+        self.ambiguous: Dict[object, List[int]] = {}  # person id -> all candidate rows (first one is used)
+        self.fuzzy: Dict[object, int] = {}  # person id -> row matched only by the fuzzy fallback
+
+    def report(self, label: str = 'judges') -> str:
+        return (f"{len(self.matches)} {label} resolved ({len(self.fuzzy)} by fuzzy match), "
+                f"{len(self.ambiguous)} ambiguous, {len(self.unmatched)} unmatched")
+
+
+class ProfessorNameIndex:
+    """Name lookup over professors.xlsx, built once per run.
+
+    Every token of a professor's normalized name is a bucket key, so a judge is resolved by
+    looking up the bucket for their last name and checking the few rows in it instead of
+    scanning the whole directory. Names with no exact token match stay unmatched unless fuzzy_cutoff
+    is given, which switches on a difflib fallback (e.g. FUZZY_NAME_CUTOFF); it can attach a judge to
+    the wrong profile, so it is opt-in and every fuzzy match is printed.
+    """
+
+    def __init__(self, professors: pd.DataFrame, name_column: str = 'Professor Name', fuzzy_cutoff: Optional[float] = None):
+        self.professors = professors.reset_index(drop=True)
+        self.names = normalize_names(self.professors[name_column]).tolist()
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.by_token: Dict[str, List[int]] = {}
+        for row, name in enumerate(self.names):
+            for token in dict.fromkeys(name.split()):
+                self.by_token.setdefault(token, []).append(row)
+
+    def candidates(self, first: str, last: str) -> List[int]:
+        """Rows whose name contains both the first- and last-name tokens (already normalized)."""
+        last_tokens = last.split()
+        if not last_tokens: return []
+        bucket = min((self.by_token.get(t, []) for t in last_tokens), key=len)
+        padded_first, padded_last = f" {first} ", f" {last} "
+        return [row for row in bucket
+                if padded_last in f" {self.names[row]} " and (not first or padded_first in f" {self.names[row]} ")]
+
+    def resolve_one(self, first: str, last: str) -> Tuple[Optional[int], str, List[int]]:
+        """Returns (row, status, candidates) where status is 'matched', 'ambiguous', 'fuzzy' or 'unmatched'."""
+        rows = self.candidates(first, last)
+        if len(rows) == 1: return rows[0], 'matched', rows
+        if len(rows) > 1: return rows[0], 'ambiguous', rows
+        if self.fuzzy_cutoff is not None and last:
+            close = difflib.get_close_matches(f"{first} {last}".strip(), self.names, n=1, cutoff=self.fuzzy_cutoff)
+            if close:
+                row = self.names.index(close[0])
+                return row, 'fuzzy', [row]
+        return None, 'unmatched', []
+
+    def resolve(self, people: pd.DataFrame, id_column: str, first_column: str, last_column: str) -> NameResolution:
+        """Resolves every row of a people table (judges, advisors) in one pass over normalized name columns."""
+        resolution = NameResolution()
+        firsts, lasts = normalize_names(people[first_column]), normalize_names(people[last_column])
+        for person_id, first, last in zip(people[id_column], firsts, lasts):
+            row, status, rows = self.resolve_one(first, last)
+            if row is None:
+                resolution.unmatched.append(person_id)
+                continue
+            resolution.matches[person_id] = row
+            if status == 'ambiguous': resolution.ambiguous[person_id] = rows
+            elif status == 'fuzzy': resolution.fuzzy[person_id] = row
+        return resolution
+
+    def record(self, row: int) -> Dict:
+        return self.professors.iloc[row].to_dict()
+
+    def identity_codes(self, people: pd.DataFrame, first_column: str, last_column: str, label: Optional[str] = None) -> np.ndarray:
+        """One code per person: the directory row when resolvable, else the normalized full name.
+
+        With a label, each distinct name resolved by the fuzzy fallback is printed once.
+        """
+        keys, reported = [], set()
+        for first, last in zip(normalize_names(people[first_column]), normalize_names(people[last_column])):
+            row, status, _ = self.resolve_one(first, last)
+            if status == 'fuzzy' and label and (first, last) not in reported:
+                reported.add((first, last))
+                print(f"  {label} '{first} {last}' matched by fuzzy name to '{self.names[row]}'.")
+            keys.append(f"row:{row}" if row is not None else f"name:{first} {last}")
+        return np.array(keys, dtype=object)
+
+
+def advisor_conflict_mask(index: ProfessorNameIndex, posters: pd.DataFrame, judges: pd.DataFrame) -> np.ndarray:
+    """(posters x judges) boolean mask, True where the judge is the poster's advisor."""
+    if not {'Advisor FirstName', 'Advisor LastName'}.issubset(posters.columns):
+        return np.zeros((len(posters), len(judges)), dtype=bool)
+    advisor_keys = index.identity_codes(posters, 'Advisor FirstName', 'Advisor LastName', label='Advisor')
+    judge_keys = index.identity_codes(judges, 'Judge FirstName', 'Judge LastName')
+    codes, _ = pd.factorize(np.concatenate([advisor_keys, judge_keys]))
+    advisor_codes, judge_codes = codes[:len(posters)], codes[len(posters):]
+    has_advisor = advisor_keys != 'name: '
+    return (advisor_codes[:, None] == judge_codes[None, :]) & has_advisor[:, None]
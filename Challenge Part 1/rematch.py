@@ -0,0 +1,286 @@
+# rematch.py
+"""Incremental re-match for event day, when judges withdraw, late posters arrive or details get corrected.
+
+Starts from the match state a full run saved (match_state.py, written by driver.py) instead of from scratch:
+
+1. Posters and judges are matched to the saved ones by ID and compared by fingerprint. Pairs whose
+   poster and judge are both unchanged keep their saved score; only pairs with a new or edited
+   poster or judge, or whose availability changed, are scored, using the saved embeddings and
+   TF-IDF vocabulary so only new texts are encoded.
+2. Saved assignments whose poster and judge are still present and still available are kept,
+   also when the poster's or judge's details were edited.
+3. The open slots are filled by solving the assignment over only the posters and judges with room
+   left. A poster still short of judges can then take a judge from another poster if that poster
+   can move to a judge with spare capacity; each such move changes one existing assignment.
+4. The changes against the saved assignment are printed and written as a table, and the state
+   is updated so the next re-match starts from this one.
+
+Keyword scores of new texts use the saved vectorizer, so they can differ slightly from a full run,
+which refits it on the new set of texts.
+"""
+import time
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+from assigner import assign, JUDGES_PER_POSTER, MAX_POSTERS_PER_JUDGE
+from instrumentation import metrics
+from match_state import MatchState, row_fingerprints
+from matcher import (COMPONENT_NAMES, SCORE_WEIGHTS, ExpertiseScorer, ModelLoadError, availability_mask, judge_fingerprints,
+                     resolve_judge_profiles, run_instrumented, write_match_outputs)
+from name_index import advisor_conflict_mask
+from table_io import read_table, write_table
+
+DIFF_COLUMNS = ['Poster #', 'Change', 'Judge', 'Reason']
+PAIR_CHUNK = 65536  # pairs per vectorized block when scoring
+
+
+def match_rows(old_ids: np.ndarray, old_fingerprints: np.ndarray, ids: np.ndarray, fingerprints: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(row of each ID in the saved state or -1 if it is new, whether that row is unchanged)."""
+    old_row = {old_id: k for k, old_id in enumerate(old_ids.tolist())}
+    rows = np.array([old_row.get(i, -1) for i in ids.tolist()], dtype=np.int64)
+    unchanged = rows >= 0
+    unchanged[unchanged] = old_fingerprints[rows[unchanged]] == fingerprints[unchanged]
+    return rows, unchanged
+
+
+def score_pairs(scorer: ExpertiseScorer, poster_texts: List[str], judge_texts: List[str], poster_records: List[Dict],
+                judge_records: List[Dict], rows: np.ndarray, cols: np.ndarray, batch_size: int = 64) -> np.ndarray:
+    """Final float32 scores of the listed (poster row, judge row) pairs, computed as in a full run but only for those pairs."""
+    components = np.zeros((len(rows), len(COMPONENT_NAMES)), dtype=np.float32)
+    if not len(rows): return components[:, 0]
+    poster_rows, poster_of = np.unique(rows, return_inverse=True)
+    judge_rows, judge_of = np.unique(cols, return_inverse=True)
+    needed_posters, needed_judges = [poster_texts[i] for i in poster_rows], [judge_texts[j] for j in judge_rows]
+
+    with metrics.stage('component.semantic_similarity'):
+        try:
+            poster_vectors, judge_vectors = scorer.encode_texts(needed_posters, batch_size), scorer.encode_texts(needed_judges, batch_size)
+            if poster_vectors.shape[1] and poster_vectors.shape[1] == judge_vectors.shape[1]:
+                column = COMPONENT_NAMES.index('semantic_similarity')
+                for start in range(0, len(rows), PAIR_CHUNK):
+                    block = slice(start, start + PAIR_CHUNK)
+                    components[block, column] = np.einsum('kd,kd->k', poster_vectors[poster_of[block]].astype(np.float64),
+                                                          judge_vectors[judge_of[block]].astype(np.float64))
+        except ModelLoadError:
+            raise
+        except Exception as e:
+            print(f"Warning: Semantic similarity calculation failed: {e}")
+
+    with metrics.stage('component.keyword_overlap'):
+        if scorer.tfidf.vocabulary:  # restored from the state; None if that run had no keyword scores
+            try:
+                poster_terms, judge_terms = scorer.tfidf.transform(needed_posters).tocsr(), scorer.tfidf.transform(needed_judges).tocsr()
+                column = COMPONENT_NAMES.index('keyword_overlap')
+                for start in range(0, len(rows), PAIR_CHUNK):
+                    block = slice(start, start + PAIR_CHUNK)
+                    overlap = poster_terms[poster_of[block]].multiply(judge_terms[judge_of[block]]).sum(axis=1)
+                    components[block, column] = np.asarray(overlap).ravel()
+            except Exception as e:
+                print(f"Warning: TF-IDF calculation failed: {e}")
+
+    with metrics.stage('component.field_relevance'):
+        field_table, program_codes, department_codes = scorer.field_similarity_table(
+            [poster_records[i].get('Program', '') for i in poster_rows], [judge_records[j].get('Department', '') for j in judge_rows])
+        components[:, COMPONENT_NAMES.index('field_relevance')] = field_table[program_codes[poster_of], department_codes[judge_of]]
+    with metrics.stage('component.expertise_level'):
+        components[:, COMPONENT_NAMES.index('expertise_level')] = scorer.expertise_vector(needed_judges)[judge_of]
+    metrics.count('pairs_scored', len(rows))
+    weights = np.array([SCORE_WEIGHTS[name] for name in COMPONENT_NAMES])
+    return np.einsum('kc,c->k', components, weights).astype(np.float32)
+
+
+def repair_assignment(scores: np.ndarray, available: np.ndarray, kept: List[Tuple[int, int]], engine: str = 'optimal'):
+    """Fills the slots the kept pairs leave open. Returns (added pairs, moves, report).
+
+    The assignment is solved over only the posters and judges with room left. Then each poster
+    still short of judges may take a full judge j from another poster q that can move to a judge
+    k with room; such a move is recorded as (q, j, k, poster) and replaces pair (q, j).
+    """
+    poster_room = JUDGES_PER_POSTER - np.bincount([p for p, _ in kept], minlength=scores.shape[0])
+    judge_room = MAX_POSTERS_PER_JUDGE - np.bincount([j for _, j in kept], minlength=scores.shape[1])
+    assigned = np.zeros(scores.shape, dtype=bool)
+    for p, j in kept: assigned[p, j] = True
+
+    open_rows, open_cols = np.flatnonzero(poster_room > 0), np.flatnonzero(judge_room > 0)
+    sub_mask = (available & ~assigned)[np.ix_(open_rows, open_cols)]
+    sub_pairs, report = assign(scores[np.ix_(open_rows, open_cols)], sub_mask, engine=engine,
+                               judges_per_poster=poster_room[open_rows], max_posters_per_judge=judge_room[open_cols])
+    added = [(int(open_rows[i]), int(open_cols[j])) for i, j in sub_pairs]
+    for p, j in added:
+        assigned[p, j] = True; poster_room[p] -= 1; judge_room[j] -= 1
+
+    moves = []
+    for p in np.flatnonzero((poster_room > 0) & available.any(axis=1)).tolist():
+        while poster_room[p] > 0:
+            move = _find_move(p, scores, available, assigned, judge_room)
+            if move is None: break
+            q, j, k = move
+            assigned[q, j], assigned[q, k], assigned[p, j] = False, True, True
+            judge_room[k] -= 1; poster_room[p] -= 1
+            moves.append((q, j, k, p))
+    return added, moves, report
+
+
+def _find_move(p: int, scores: np.ndarray, available: np.ndarray, assigned: np.ndarray, judge_room: np.ndarray):
+    """Best (q, j, k): poster p takes full judge j from poster q, and q moves to judge k with room. None if there is none."""
+    for j in sorted(np.flatnonzero(available[p] & ~assigned[p] & (judge_room <= 0)).tolist(), key=lambda j: -scores[p, j]):
+        best = None
+        for q in np.flatnonzero(assigned[:, j]).tolist():
+            targets = np.flatnonzero(available[q] & ~assigned[q] & (judge_room > 0))
+            if not len(targets): continue
+            k = int(targets[np.argmax(scores[q, targets])])
+            if best is None or scores[q, k] - scores[q, j] > best[3]: best = (q, j, k, scores[q, k] - scores[q, j])
+        if best: return best[:3]
+    return None
+
+
+def ordered_pairs(previous: List[Tuple[int, int]], final: set, added: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """The final pairs in output order: saved pairs that stay, in their saved order, with each of a poster's
+    new judges in the place of a judge it lost (so 'Assigned Judge 1/2' keep their columns), then the rest.
+    """
+    new_for = {}
+    for p, j in added:
+        if (p, j) in final: new_for.setdefault(p, []).append(j)
+    pairs = []
+    for p, j in previous:
+        if (p, j) in final: pairs.append((p, j))
+        elif p >= 0 and new_for.get(p): pairs.append((p, new_for[p].pop(0)))
+    pairs += [(p, j) for p, judges in new_for.items() for j in judges]
+    return pairs
+
+
+def assignment_diff(previous_ids: List[Tuple], pairs_ids: List[Tuple], reasons: Dict[Tuple, str], poster_order: List) -> pd.DataFrame:
+    """One row per removed or added (poster, judge) assignment, grouped by poster."""
+    old, new = set(previous_ids), set(pairs_ids)
+    rows = [{'Poster #': p, 'Change': 'removed', 'Judge': j, 'Reason': reasons.get((p, j), '')} for p, j in previous_ids if (p, j) not in new]
+    rows += [{'Poster #': p, 'Change': 'added', 'Judge': j, 'Reason': reasons.get((p, j), '')} for p, j in pairs_ids if (p, j) not in old]
+    position = {pid: k for k, pid in enumerate(dict.fromkeys(poster_order))}
+    rows.sort(key=lambda row: (position.get(row['Poster #'], len(position)), row['Change'] != 'removed'))
+    return pd.DataFrame(rows, columns=DIFF_COLUMNS)
+
+
+def rematch(state_file, posters_file, judges_file, professors_file, output_posters_file, output_judges_file, diff_file=None,
+            assignment_engine='optimal', embedding_cache_dir=None, model_server=None, embedding_batch_size=64, report_file=None,
+            fuzzy_name_cutoff=None):
+    """Updates the assignment saved in state_file for the current posters, judges and professors files.
+
+    Writes the same outputs as matcher.perform_matching, the changes to diff_file (any table_io
+    format) if given, and the new state back to state_file. report_file and fuzzy_name_cutoff work as in perform_matching.
+    """
+    run_instrumented(lambda: _run_rematch(state_file, posters_file, judges_file, professors_file, output_posters_file, output_judges_file,
+                                          diff_file, assignment_engine, embedding_cache_dir, model_server, embedding_batch_size,
+                                          fuzzy_name_cutoff),
+                     report_file, label='re-matching')
+
+
+def _run_rematch(state_file, posters_file, judges_file, professors_file, output_posters_file, output_judges_file, diff_file,
+                 assignment_engine, embedding_cache_dir, model_server, embedding_batch_size, fuzzy_name_cutoff=None):
+    start = time.perf_counter()
+    with metrics.stage('load_state'):
+        state = MatchState.load(state_file)
+    weights = np.array([SCORE_WEIGHTS[name] for name in COMPONENT_NAMES])
+    if not np.array_equal(state.weights, weights):
+        raise ValueError("The score weights changed since the saved run; run a full match instead")
+    print("Loading data files... ", end="", flush=True)
+    with metrics.stage('load_data'):
+        posters = read_table(posters_file)
+        judges = read_table(judges_file)
+        professors = read_table(professors_file)
+    print("Data files loaded successfully!")
+
+    scorer = ExpertiseScorer(cache_dir=embedding_cache_dir, model_server=model_server,
+                             embedding_backend=state.embedding_backend, embedding_dtype=state.embedding_dtype)
+    scorer.restore_tfidf(state.tfidf_terms, state.tfidf_idf)
+    name_index, judge_professor_matches = resolve_judge_profiles(professors, judges, fuzzy_name_cutoff)
+    with metrics.stage('advisor_conflicts'):
+        conflicts = advisor_conflict_mask(name_index, posters, judges)
+    available = availability_mask(posters, judges, conflicts)
+    has_profile = np.array([jid in judge_professor_matches for jid in judges['Judge']])
+    scored = available & has_profile[None, :]
+
+    poster_records, judge_records = posters.to_dict('records'), judges.to_dict('records')
+    poster_ids, judge_ids = posters['Poster #'].tolist(), judges['Judge'].tolist()
+    old_rows, same_rows = match_rows(state.poster_ids, state.poster_fingerprints, np.array(poster_ids, dtype=str), row_fingerprints(poster_records))
+    old_cols, same_cols = match_rows(state.judge_ids, state.judge_fingerprints, np.array(judge_ids, dtype=str),
+                                     judge_fingerprints(judge_records, judge_professor_matches))
+    print(f"Posters: {int(same_rows.sum())} unchanged, {int(((old_rows >= 0) & ~same_rows).sum())} edited, "
+          f"{int((old_rows < 0).sum())} new, {len(state.poster_ids) - int((old_rows >= 0).sum())} withdrawn.")
+    print(f"Judges: {int(same_cols.sum())} unchanged, {int(((old_cols >= 0) & ~same_cols).sum())} edited, "
+          f"{int((old_cols < 0).sum())} new, {len(state.judge_ids) - int((old_cols >= 0).sum())} withdrawn.")
+
+    with metrics.stage('reuse_scores'):
+        poster_texts = [scorer.build_poster_text(poster) for poster in poster_records]
+        judge_texts = [scorer.build_judge_text(judge_professor_matches.get(jid)) for jid in judge_ids]
+        for texts, rows, same, vectors in ((poster_texts, old_rows, same_rows, state.poster_embeddings),
+                                           (judge_texts, old_cols, same_cols, state.judge_embeddings)):
+            if not vectors.shape[1]: continue
+            for i in np.flatnonzero(same).tolist():
+                if texts[i]: scorer.embedded[texts[i]] = vectors[rows[i]]
+        reuse_rows, reuse_cols = np.flatnonzero(same_rows), np.flatnonzero(same_cols)
+        block = np.ix_(reuse_rows, reuse_cols)
+        score_matrix = np.zeros(scored.shape, dtype=np.float32)
+        was_scored = np.zeros(scored.shape, dtype=bool)
+        score_matrix[block] = state.score_matrix()[np.ix_(old_rows[reuse_rows], old_cols[reuse_cols])]
+        was_scored[block] = state.scored[np.ix_(old_rows[reuse_rows], old_cols[reuse_cols])]
+        score_matrix[~scored] = 0.0
+    rows, cols = np.nonzero(scored & ~was_scored)
+    print(f"Scoring {len(rows)} new or changed pairs ({int((scored & was_scored).sum())} scores reused)...", flush=True)
+    score_matrix[rows, cols] = score_pairs(scorer, poster_texts, judge_texts, poster_records, judge_records, rows, cols, embedding_batch_size)
+    metrics.set('pairs_reused', int((scored & was_scored).sum()))
+
+    new_row = np.full(len(state.poster_ids), -1); new_row[old_rows[old_rows >= 0]] = np.flatnonzero(old_rows >= 0)
+    new_col = np.full(len(state.judge_ids), -1); new_col[old_cols[old_cols >= 0]] = np.flatnonzero(old_cols >= 0)
+    previous = [(int(new_row[p]), int(new_col[j])) for p, j in state.pairs.tolist()]
+    previous_pairs = set(previous)
+    kept = [(p, j) for p, j in previous if p >= 0 and j >= 0 and available[p, j]]
+
+    print(f"Repairing the assignment ({assignment_engine}), keeping {len(kept)} of {len(previous)} assignments... ", end="", flush=True)
+    with metrics.stage('assignment'):
+        added, moves, engine_report = repair_assignment(score_matrix.astype(np.float64), available, kept, engine=assignment_engine)
+    final = set(kept) | set(added)
+    for q, j, k, p in moves:
+        final.discard((q, j)); final.update([(q, k), (p, j)])
+    pairs = ordered_pairs(previous, final, added + [(q, k) for q, _, k, _ in moves] + [(p, j) for _, j, _, p in moves])
+    print("Assignments complete.")
+    metrics.set('assignment', engine_report); metrics.set('moves', len(moves))
+
+    old_ids = [(pid, jid) for pid, jid in zip(state.poster_ids[state.pairs[:, 0]].tolist(), state.judge_ids[state.pairs[:, 1]].tolist())] \
+        if len(state.pairs) else []
+    judge_name = {str(jid): jid for jid in judge_ids}
+    poster_name = {str(pid): pid for pid in poster_ids}
+    reasons = {}
+    for (pid, jid), (p, j) in zip(old_ids, previous):
+        if p < 0: reasons[(pid, jid)] = 'poster withdrawn'
+        elif j < 0: reasons[(pid, jid)] = 'judge withdrawn'
+        elif not available[p, j]: reasons[(pid, jid)] = 'no longer available'
+    for q, j, k, p in moves:
+        if (q, j) in previous_pairs:  # a move can also undo a pair the repair itself had just added
+            reasons[(str(poster_ids[q]), str(judge_ids[j]))] = f"moved to free the judge for poster {poster_ids[p]}"
+            reasons[(str(poster_ids[q]), str(judge_ids[k]))] = f"moved from judge {judge_ids[j]}"
+        reasons[(str(poster_ids[p]), str(judge_ids[j]))] = f"taken over from poster {poster_ids[q]}"
+    for p, j in added:
+        reasons.setdefault((str(poster_ids[p]), str(judge_ids[j])), 'new poster' if old_rows[p] < 0 else 'open slot')
+    diff = assignment_diff(old_ids, [(str(poster_ids[p]), str(judge_ids[j])) for p, j in pairs], reasons,
+                           [str(pid) for pid in poster_ids] + state.poster_ids.tolist())
+    diff['Poster #'] = diff['Poster #'].map(lambda pid: poster_name.get(pid, pid))
+    diff['Judge'] = diff['Judge'].map(lambda jid: judge_name.get(jid, jid))
+
+    understaffed = int((np.bincount([p for p, _ in pairs], minlength=len(poster_ids)) < JUDGES_PER_POSTER).sum())
+    print(f"{int((diff['Change'] == 'removed').sum())} assignments removed, {int((diff['Change'] == 'added').sum())} added "
+          f"({len(moves)} moved to free a judge); {understaffed} posters with fewer than {JUDGES_PER_POSTER} judges.")
+    for _, change in diff.iterrows():
+        print(f"  Poster {change['Poster #']}: {'-' if change['Change'] == 'removed' else '+'} judge {change['Judge']}"
+              + (f" ({change['Reason']})" if change['Reason'] else ''))
+    if diff_file:
+        write_table(diff, diff_file)
+        print(f"Assignment changes written to {diff_file}")
+
+    write_match_outputs(posters, judges, pairs, output_posters_file, output_judges_file)
+    with metrics.stage('save_state'):
+        MatchState(poster_ids=np.array(poster_ids, dtype=str), judge_ids=np.array(judge_ids, dtype=str),
+                   poster_fingerprints=row_fingerprints(poster_records), judge_fingerprints=judge_fingerprints(judge_records, judge_professor_matches),
+                   scored=scored, scores=score_matrix[scored], poster_embeddings=scorer.embedded_vectors(poster_texts),
+                   judge_embeddings=scorer.embedded_vectors(judge_texts), tfidf_terms=state.tfidf_terms, tfidf_idf=state.tfidf_idf,
+                   pairs=np.array(pairs, dtype=np.int64).reshape(-1, 2), weights=weights,
+                   embedding_backend=state.embedding_backend, embedding_dtype=state.embedding_dtype).save(state_file)
+    print(f"Re-match finished in {time.perf_counter() - start:.1f} s; state updated in {state_file}.")
@@ -1,51 +1,229 @@
 # scraper.py
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter
+from urllib.parse import urlparse
 import pandas as pd
+import hashlib
+import json
+import os
+import threading
 import time
 import sys
 
-def scrape_professors(url, faculty_type):
-    response = requests.get(url)
+
+FACULTY_LISTINGS = [
+    ("https://ecs.syracuse.edu/faculty-staff?category=full-time-fac&people=", "Full-Time"),
+    ("https://ecs.syracuse.edu/faculty-staff?category=part-time-fac&people=", "Part-Time"),
+]
+PROFILE_CACHE_FILE = 'profile_cache.json'
+INTEREST_HEADINGS = ("Areas of Expertise:", "Research Interests:")
+PUBLICATION_HEADINGS = ("Selected Presentations/Publications:", "Select Publications:", "Selected Publications:")
+PROFESSOR_COLUMNS = ["Professor Name", "Link", "Profile Title", "Areas of Interest / Research Interests", "Description", "Current Research", "Publications"]
+
+
+class HostRateLimiter:
+    """Spaces out requests to the same host by at least min_interval seconds, across threads."""
+
+    def __init__(self, min_interval=0.1):
+        self.min_interval = min_interval
+        self.next_allowed = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_allowed.get(host, now))
+            self.next_allowed[host] = start + self.min_interval
+        if start > now: time.sleep(start - now)
+
+
+def make_session(pool_size=8, retries=3, backoff_factor=0.5):
+    """A keep-alive session whose connection pool fits pool_size workers, retrying transient failures with backoff."""
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=backoff_factor, status_forcelist=[429, 500, 502, 503, 504],
+                  allowed_methods=["GET", "HEAD"])
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch(url, session=None, rate_limiter=None, timeout=30, headers=None):
+    if rate_limiter: rate_limiter.wait(url)
+    return (session or requests).get(url, timeout=timeout, headers=headers)
+
+
+def load_profile_cache(cache_file):
+    """Loads {profile link: {etag, last_modified, content_hash, details}} saved by a previous scrape."""
+    if not cache_file or not os.path.exists(cache_file): return {}
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Ignoring unreadable profile cache {cache_file}: {e}")
+        return {}
+
+
+def save_profile_cache(cache, cache_file):
+    tmp_file = cache_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+    os.replace(tmp_file, cache_file)
+
+
+def scrape_professors(url, faculty_type, session=None, rate_limiter=None, max_workers=1, cache=None, stats=None):
+    """Scrapes one faculty listing. Profile pages are fetched by up to max_workers threads; rows keep listing order.
+
+    With a cache (see load_profile_cache), pages are revalidated with conditional requests and only
+    re-parsed when their content changed; the cache is updated in place and stats counts each outcome.
+    """
+    stats = stats if stats is not None else Counter()
+    try:
+        response = fetch(url, session, rate_limiter)
+    except requests.RequestException as e:
+        print(f"Failed to fetch the webpage: {url} ({e})")
+        stats['listing_failed'] += 1
+        return []
     if response.status_code != 200:
         print(f"Failed to fetch the webpage: {url}")
+        stats['listing_failed'] += 1
         return []
 
     soup = BeautifulSoup(response.text, 'html.parser')
     profiles_container = soup.find(class_="entry-content directory-profiles")
     if not profiles_container:
         print("Could not find professor profiles.")
+        stats['listing_failed'] += 1
         return []
 
-    professor_profiles = profiles_container.find_all(class_="ecs-profile box-clickable")
-    data = []
-    total_profiles = len(professor_profiles)
-    for i, profile in enumerate(professor_profiles):
-        print(f"Processing {faculty_type} faculty: {i+1}/{total_profiles}...", end="\r")
-        sys.stdout.flush()
-
+    entries = []
+    for profile in profiles_container.find_all(class_="ecs-profile box-clickable"):
         name_tag = profile.find(class_="profile-name").find("a")
         title_tag = profile.find(class_="profile-title")
-
         if name_tag:
-            name = name_tag.text.strip()
-            link = name_tag.get("href", "")
-            title = title_tag.text.strip() if title_tag else ""
-            interests, description, current_research, publications = scrape_interests_description_research_publications(link) if link else ("", "", "", "")
-            data.append([name, link, title, interests, description, current_research, publications])
+            entries.append((name_tag.text.strip(), name_tag.get("href", ""), title_tag.text.strip() if title_tag else ""))
+
+    def scrape_entry(entry):
+        name, link, title = entry
+        if not link: return [name, link, title, "", "", "", ""], None, 'no_link'
+        details, cache_entry, status = fetch_profile(link, session, rate_limiter, cached=cache.get(link) if cache is not None else None)
+        return [name, link, title, *details], cache_entry, status
+
+    data = [None] * len(entries)
+    total_profiles = len(entries)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(scrape_entry, entry): i for i, entry in enumerate(entries)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            row, cache_entry, status = future.result()
+            data[futures[future]] = row
+            stats[status] += 1
+            if cache is not None and cache_entry is not None: cache[row[1]] = cache_entry
+            print(f"Processing {faculty_type} faculty: {done}/{total_profiles}...", end="\r")
+            sys.stdout.flush()
 
     print(f"Processed {total_profiles} {faculty_type} faculty profiles.")
     return data
 
-def scrape_interests_description_research_publications(professor_url):
-    response = requests.get(professor_url)
+
+def scrape_interests_description_research_publications(professor_url, session=None, rate_limiter=None):
+    return fetch_profile(professor_url, session, rate_limiter)[0]
+
+
+def fetch_profile(professor_url, session=None, rate_limiter=None, cached=None):
+    """Fetches and parses one profile page, revalidating against a cache entry when one is given.
+
+    Returns (details, cache_entry, status) where status is 'new', 'refetched' (content changed),
+    'unchanged' (same content hash, not re-parsed), 'not_modified' (HTTP 304) or 'failed'.
+    On failure the cached details are kept when there are any.
+    """
+    empty = ("", "", "", "")
+    headers = {}
+    if cached and cached.get('etag'): headers['If-None-Match'] = cached['etag']
+    if cached and cached.get('last_modified'): headers['If-Modified-Since'] = cached['last_modified']
+    try:
+        response = fetch(professor_url, session, rate_limiter, headers=headers or None)
+    except requests.RequestException as e:
+        print(f"\nWarning: Could not fetch {professor_url}: {e}")
+        return (tuple(cached['details']) if cached else empty), cached, 'failed'
+    if response.status_code == 304 and cached:
+        return tuple(cached['details']), cached, 'not_modified'
     if response.status_code != 200:
-        return "", "", "", ""
+        return (tuple(cached['details']) if cached else empty), cached, 'failed'
+
+    cache_entry = {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified'),
+                   'content_hash': hashlib.sha256(response.content).hexdigest()}
+    if cached and cached.get('content_hash') == cache_entry['content_hash']:
+        cache_entry['details'] = cached['details']
+        return tuple(cached['details']), cache_entry, 'unchanged'
+    details = parse_profile_html(response.text)
+    cache_entry['details'] = list(details)
+    return details, cache_entry, 'refetched' if cached else 'new'
+
+
+def parse_profile_html(html, parser='html.parser'):
+    """Extracts (interests, description, current research, publications) from a profile page.
+
+    Single pass over the <p> and <ul> elements in document order, with each paragraph's text and
+    each list's items computed once. A section heading picks up the wp-block-list siblings after
+    it through a per-parent index instead of a find_next_siblings scan. With the default parser
+    the output matches parse_profile_html_legacy, malformed pages included (see
+    bench_profile_parser.py); lxml repairs misnested markup differently, so parser='lxml' can differ.
+    """
+    soup = BeautifulSoup(html, parser)
+    elements = [(el.name, el.parent, el) for el in soup.find_all(["p", "ul"])
+                if el.name == "p" or "wp-block-list" in (el.get("class") or [])]
+
+    lists_by_parent = {}
+    for position, (tag, parent, element) in enumerate(elements):
+        if tag == "ul": lists_by_parent.setdefault(id(parent), []).append((position, element))
+    list_items = {}
+
+    def sibling_list_items(parent, position):
+        items = []
+        for list_position, ul in lists_by_parent.get(id(parent), []):
+            if list_position > position:
+                if id(ul) not in list_items: list_items[id(ul)] = [li.text.strip() for li in ul.find_all("li")]
+                items.extend(list_items[id(ul)])
+        return items
 
-    soup = BeautifulSoup(response.text, 'html.parser')
     interests, description, current_research, publications = [], [], [], []
     interest_section_found, research_section_found, publications_section_found = False, False, False
-    time.sleep(0.1)
+    for position, (tag, parent, paragraph) in enumerate(elements):
+        if tag != "p": continue
+        text = paragraph.text
+        is_heading = paragraph.find("strong") is not None
+        long_paragraph = len(text.split()) > 5
+        if is_heading and any(label in text for label in INTEREST_HEADINGS):
+            interest_section_found = True
+            interests.extend(sibling_list_items(parent, position))
+        elif interest_section_found:
+            if long_paragraph: description.append(text.strip())
+            else: interest_section_found = False
+        if is_heading and "Current Research:" in text:
+            research_section_found = True
+        elif research_section_found:
+            if long_paragraph: current_research.append(text.strip())
+            else: research_section_found = False
+        if is_heading and any(label in text for label in PUBLICATION_HEADINGS):
+            publications_section_found = True
+            publications.extend(sibling_list_items(parent, position))
+        elif publications_section_found:
+            if long_paragraph: publications.append(text.strip())
+            else: break
+
+    return "; ".join(interests), " ".join(description), " ".join(current_research), " ".join(publications)
+
+
+def parse_profile_html_legacy(html):
+    """Original multi-pass extractor, kept as the reference that parse_profile_html must match."""
+    soup = BeautifulSoup(html, 'html.parser')
+    interests, description, current_research, publications = [], [], [], []
+    interest_section_found, research_section_found, publications_section_found = False, False, False
 
     for heading in soup.find_all("p"):
         if heading.find("strong") and ("Areas of Expertise:" in heading.text or "Research Interests:" in heading.text):
@@ -77,16 +255,68 @@ def scrape_interests_description_research_publications(professor_url):
     return "; ".join(interests), " ".join(description), " ".join(current_research), " ".join(publications)
 
 
-def scrape_and_save_professors(professors_file):
-    """Scrapes professor data and saves it to an Excel file."""
-    full_time_url = "https://ecs.syracuse.edu/faculty-staff?category=full-time-fac&people="
-    part_time_url = "https://ecs.syracuse.edu/faculty-staff?category=part-time-fac&people="
-    data = scrape_professors(full_time_url, "Full-Time") + scrape_professors(part_time_url, "Part-Time")
-    df = pd.DataFrame(data, columns=["Professor Name", "Link", "Profile Title", "Areas of Interest / Research Interests", "Description", "Current Research", "Publications"])
+def scrape_and_save_professors(professors_file, listings=None, max_workers=8, min_interval=0.1, retries=3, cache_file=PROFILE_CACHE_FILE):
+    """Scrapes professor data and saves it to an Excel file.
+
+    Profile pages are fetched concurrently over a shared keep-alive session, with at most one
+    request per host every min_interval seconds. listings defaults to FACULTY_LISTINGS and can
+    point at a local server serving saved pages. Validators for every page are written to
+    cache_file so that refresh_professors can update the table incrementally later.
+    """
+    session = make_session(pool_size=max_workers, retries=retries)
+    rate_limiter = HostRateLimiter(min_interval)
+    cache, data = {}, []
+    for url, faculty_type in (listings or FACULTY_LISTINGS):
+        data += scrape_professors(url, faculty_type, session=session, rate_limiter=rate_limiter, max_workers=max_workers, cache=cache)
+    df = pd.DataFrame(data, columns=PROFESSOR_COLUMNS)
     df.to_excel(professors_file, index=False, engine='openpyxl')  # Specify engine
+    if cache_file: save_profile_cache(cache, cache_file)
     print(f"Professor data saved to {professors_file}")
 
 
+def refresh_professors(professors_file, listings=None, max_workers=8, min_interval=0.1, retries=3, cache_file=PROFILE_CACHE_FILE):
+    """Incrementally refreshes an existing professors table and returns a Counter of page outcomes.
+
+    Each profile is requested with If-None-Match / If-Modified-Since from the cache; pages that
+    answer 304 or whose content hash is unchanged are not re-parsed. Profiles that fail to load
+    keep their previous row, and professors no longer listed are dropped. If a listing page
+    cannot be fetched the existing table is left untouched.
+    """
+    cache = load_profile_cache(cache_file)
+    if os.path.exists(professors_file):
+        existing = pd.read_excel(professors_file, engine='openpyxl').fillna("")
+        for row in existing[PROFESSOR_COLUMNS].itertuples(index=False):
+            if row[1] and row[1] not in cache:
+                cache[row[1]] = {'details': [str(v) for v in row[3:]]}  # No validators yet: refetched, but kept on failure
+    else:
+        existing = pd.DataFrame(columns=PROFESSOR_COLUMNS)
+
+    session = make_session(pool_size=max_workers, retries=retries)
+    rate_limiter = HostRateLimiter(min_interval)
+    stats, data = Counter(), []
+    for url, faculty_type in (listings or FACULTY_LISTINGS):
+        data += scrape_professors(url, faculty_type, session=session, rate_limiter=rate_limiter, max_workers=max_workers,
+                                  cache=cache, stats=stats)
+    if stats['listing_failed']:
+        print(f"Could not fetch {stats['listing_failed']} faculty listing(s); keeping the existing {professors_file}.")
+        return stats
+
+    df = pd.DataFrame(data, columns=PROFESSOR_COLUMNS)
+    stats['removed'] = len(set(existing['Link']) - set(df['Link']))
+    if df.astype(str).equals(existing[PROFESSOR_COLUMNS].astype(str)):
+        print(f"No faculty changes, {professors_file} left as it is.")  # Same bytes, so the matching stage stays up to date
+    else:
+        df.to_excel(professors_file, index=False, engine='openpyxl')
+        print(f"Professor data saved to {professors_file}")
+    listed = set(df['Link'])
+    if cache_file: save_profile_cache({link: entry for link, entry in cache.items() if link in listed}, cache_file)
+    print(f"Refresh summary: {stats['not_modified'] + stats['unchanged']} pages skipped "
+          f"({stats['not_modified']} not modified, {stats['unchanged']} unchanged), "
+          f"{stats['refetched'] + stats['new']} refetched ({stats['new']} new), {stats['failed']} failed, "
+          f"{stats['removed']} professors removed.")
+    return stats
+
+
 if __name__ == '__main__':
     # Example usage (you can run this directly to test the scraper):
-    scrape_and_save_professors('professors.xlsx')
\ No newline at end of file
+    scrape_and_save_professors('professors.xlsx')
@@ -0,0 +1,208 @@
+# stage_runner.py
+"""A small build graph for the drivers: each stage runs only when its inputs or parameters changed.
+
+A Stage names the files it reads (inputs, which may include the code it runs), the files it writes
+(outputs) and its parameters. A stage depends on every stage that writes one of its inputs. StageRunner
+runs the stages in dependency order, and stages that do not depend on each other in parallel threads.
+
+Before running a stage, the runner compares the sha256 of each input file and the parameters with the
+values recorded in the manifest (.pipeline_manifest.json) when the stage last succeeded. The stage is
+skipped if nothing changed and its outputs exist. A stage that rewrites an output with identical
+content therefore does not re-run the stages after it. Hashes are cached by file size and mtime, so
+unchanged files are not read again.
+
+keep_outputs stages (e.g. the judges' passwords) are only run when an output is missing or the stage
+is forced; if their inputs changed they keep their outputs and print a warning.
+Parts 2 and 3 import this module from the Part 1 folder.
+"""
+import ast
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+MANIFEST_FILE = '.pipeline_manifest.json'
+MANIFEST_VERSION = 1
+
+
+class Stage:
+    def __init__(self, name: str, run: Callable[[], None], inputs: Sequence[str] = (), outputs: Sequence[str] = (),
+                 params: Optional[Dict] = None, keep_outputs: bool = False):
+        self.name, self.run = name, run
+        self.inputs, self.outputs = list(inputs), list(outputs)
+        self.params = params or {}
+        self.keep_outputs = keep_outputs
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def module_files(*paths: str) -> List[str]:
+    """The given .py files and every module next to them that they import, directly or indirectly.
+
+    Imports inside functions count too. Use it for a stage's code inputs so the list follows the imports.
+    """
+    found, pending = set(), list(paths)
+    while pending:
+        path = pending.pop()
+        if path in found: continue
+        found.add(path)
+        with open(path, encoding='utf-8') as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import): names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level and node.module: names = [node.module]
+            else: continue
+            for name in names:
+                candidate = os.path.join(os.path.dirname(path), name.split('.')[0] + '.py')
+                if os.path.exists(candidate): pending.append(candidate)
+    return sorted(found)
+
+
+class StageRunner:
+    """Runs a list of Stages; see the module docstring. jobs is the number of stages run at once."""
+
+    def __init__(self, stages: List[Stage], manifest_path: str = MANIFEST_FILE, jobs: int = 4):
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names): raise ValueError("Stage names must be unique")
+        self.stages = {stage.name: stage for stage in stages}
+        self.manifest_path = manifest_path
+        self.jobs = max(1, jobs)
+        self.lock = threading.Lock()
+        writer = {path: stage.name for stage in stages for path in stage.outputs}
+        self.depends_on = {stage.name: sorted({writer[path] for path in stage.inputs if path in writer} - {stage.name})
+                           for stage in stages}
+        self._check_acyclic()
+        self.manifest = self._load_manifest()
+
+    def _check_acyclic(self):
+        state = {}
+        def visit(name, path):
+            if state.get(name) == 'done': return
+            if state.get(name) == 'visiting': raise ValueError(f"Stage cycle: {' -> '.join(path + [name])}")
+            state[name] = 'visiting'
+            for dependency in self.depends_on[name]: visit(dependency, path + [name])
+            state[name] = 'done'
+        for name in self.stages: visit(name, [])
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get('version') == MANIFEST_VERSION: return manifest
+        except (OSError, ValueError):
+            pass
+        return {'version': MANIFEST_VERSION, 'stages': {}, 'files': {}}
+
+    def _save_manifest(self):
+        tmp_path = f"{self.manifest_path}.tmp{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def file_hash(self, path: str) -> Optional[str]:
+        """sha256 of a file (None if it is missing), reusing the manifest's hash while size and mtime are unchanged."""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        with self.lock:
+            cached = self.manifest['files'].get(path)
+        if cached and cached[:2] == [st.st_mtime_ns, st.st_size]: return cached[2]
+        sha = file_sha256(path)
+        with self.lock:
+            self.manifest['files'][path] = [st.st_mtime_ns, st.st_size, sha]
+        return sha
+
+    def _fingerprint(self, stage: Stage) -> Dict:
+        return {'inputs': {path: self.file_hash(path) for path in stage.inputs},
+                'params': json.loads(json.dumps(stage.params, sort_keys=True, default=str))}
+
+    def reason_to_run(self, stage: Stage, force: Iterable[str] = ()) -> Optional[str]:
+        """Why the stage has to run, or None if it is up to date."""
+        if stage.name in force or 'all' in force: return 'forced'
+        missing = [path for path in stage.outputs if not os.path.exists(path)]
+        if missing: return f"missing {', '.join(missing)}"
+        if stage.keep_outputs: return None
+        with self.lock:
+            last = self.manifest['stages'].get(stage.name)
+        if last is None: return 'no record of a previous run'
+        current = self._fingerprint(stage)
+        changed = [path for path, sha in current['inputs'].items() if last['inputs'].get(path) != sha]
+        if changed: return f"changed {', '.join(changed)}"
+        if current['params'] != last['params']: return 'parameters changed'
+        return None
+
+    def _stale_kept_outputs(self, stage: Stage) -> List[str]:
+        with self.lock:
+            last = self.manifest['stages'].get(stage.name)
+        if last is None: return []
+        return [path for path, sha in self._fingerprint(stage)['inputs'].items() if last['inputs'].get(path) != sha]
+
+    def _run_stage(self, stage: Stage):
+        start = time.perf_counter()
+        stage.run()
+        record = {**self._fingerprint(stage), 'seconds': round(time.perf_counter() - start, 3),
+                  'finished': time.strftime('%Y-%m-%dT%H:%M:%S')}
+        for path in stage.outputs: self.file_hash(path)
+        with self.lock:
+            self.manifest['stages'][stage.name] = record
+            self._save_manifest()
+
+    def run(self, force: Iterable[str] = (), dry_run: bool = False) -> Dict[str, str]:
+        """Brings every stage up to date. Returns {stage: 'ran' | 'up to date' | 'kept' | 'failed' | 'skipped'}.
+
+        A failed stage's dependents are skipped; stages that do not depend on it still run.
+        With dry_run, only prints what would run (judged against the current files).
+        """
+        force = set(force)
+        unknown = force - set(self.stages) - {'all'}
+        if unknown: raise ValueError(f"Unknown stage(s): {', '.join(sorted(unknown))}. Stages: {', '.join(self.stages)}")
+        status: Dict[str, str] = {}
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            while len(status) < len(self.stages):
+                for name, stage in self.stages.items():
+                    if name in status or name in running.values(): continue
+                    dependencies = [status.get(d) for d in self.depends_on[name]]
+                    if any(s in ('failed', 'skipped') for s in dependencies):
+                        status[name] = 'skipped'
+                        print(f"[{name}] skipped: a stage it depends on failed")
+                        continue
+                    if None in dependencies: continue
+                    reason = self.reason_to_run(stage, force)
+                    if reason is None:
+                        stale = stage.keep_outputs and self._stale_kept_outputs(stage)
+                        status[name] = 'kept' if stale else 'up to date'
+                        if stale:
+                            print(f"Warning: [{name}] kept {', '.join(stage.outputs)} although {', '.join(stale)} changed; "
+                                  f"delete it or pass --force {name} to rebuild it")
+                        else:
+                            print(f"[{name}] up to date")
+                    elif dry_run:
+                        status[name] = 'would run'
+                        print(f"[{name}] would run ({reason})")
+                    else:
+                        print(f"[{name}] running ({reason})")
+                        running[executor.submit(self._run_stage, stage)] = name
+                if not running: continue
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        future.result()
+                        status[name] = 'ran'
+                    except Exception as e:
+                        status[name] = 'failed'
+                        print(f"Error in stage {name}: {e}")
+        with self.lock:
+            self._save_manifest()
+        return status
@@ -0,0 +1,119 @@
+# table_io.py
+"""Table reading and writing for the hand-offs between pipeline stages, chosen by file extension.
+
+    .parquet            Apache Parquet (needs pyarrow)
+    .arrow / .feather   Arrow IPC (needs pyarrow)
+    .npz                numeric tables such as the assignment matrix, one 2-D array (numpy only)
+    .csv, .xlsx         text and Excel; .xlsx is meant for the final human-facing exports
+
+Stages write their hand-offs with handoff_path(), which picks Parquet when pyarrow is installed
+and CSV otherwise, and find the previous stage's output with find_table(), which also accepts the
+XLSX files older runs produced. Parts 2 and 3 import this module from the Part 1 folder.
+"""
+import importlib.util
+import os
+from typing import Dict, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+XLSX = '.xlsx'
+COLUMNAR_EXTENSIONS = ('.parquet', '.arrow', '.feather')
+TABLE_EXTENSIONS = COLUMNAR_EXTENSIONS + ('.npz', '.csv', XLSX)
+READ_PREFERENCE = ('.npz', '.parquet', '.arrow', '.feather', '.csv', XLSX)  # fastest first
+
+
+def columnar_available() -> bool:
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def _extension(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in TABLE_EXTENSIONS:
+        raise ValueError(f"Unsupported table format '{extension}' for {path}. Use one of: {', '.join(TABLE_EXTENSIONS)}")
+    return extension
+
+
+def handoff_path(stem: str, numeric: bool = False) -> str:
+    """Path for a hand-off table: .npz for numeric tables, else Parquet if pyarrow is installed, else CSV."""
+    if numeric: return stem + '.npz'
+    return stem + ('.parquet' if columnar_available() else '.csv')
+
+
+def find_table(stem: str, extensions: Sequence[str] = READ_PREFERENCE) -> Optional[str]:
+    """The first existing stem + extension, in the given order of preference, or None.
+
+    Parquet and Arrow files are passed over when pyarrow is not installed.
+    """
+    readable = columnar_available()
+    for extension in extensions:
+        if extension in COLUMNAR_EXTENSIONS and not readable: continue
+        if os.path.exists(stem + extension): return stem + extension
+    return None
+
+
+def _apply_dtypes(df: pd.DataFrame, dtype: Dict) -> pd.DataFrame:
+    """Casts like read_excel's dtype argument: integral floats become '3' rather than '3.0', missing values stay NaN."""
+    for column, target in dtype.items():
+        if column not in df.columns: continue
+        values = df[column]
+        if target is str:
+            df[column] = values.map(lambda v: v if pd.isna(v) else str(int(v)) if isinstance(v, float) and v.is_integer() else str(v))
+        else:
+            df[column] = values.astype(target)
+    return df
+
+
+def read_table(path: str, dtype: Optional[Dict] = None) -> pd.DataFrame:
+    extension = _extension(path)
+    if extension == XLSX:
+        return pd.read_excel(path, dtype=dtype, engine='openpyxl')
+    if extension == '.csv':
+        return pd.read_csv(path, dtype=dtype)
+    if extension == '.npz':
+        with np.load(path, allow_pickle=False) as data:
+            values = data['values']
+            if np.issubdtype(values.dtype, np.integer): values = values.astype(np.int64)  # stored in the smallest integer type
+            df = pd.DataFrame(values, columns=[str(c) for c in data['columns']])
+    elif extension == '.parquet':
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_feather(path)
+    return _apply_dtypes(df, dtype) if dtype else df
+
+
+def _npz_values(df: pd.DataFrame) -> np.ndarray:
+    values = df.to_numpy()
+    if not np.issubdtype(values.dtype, np.number) and values.dtype != bool:
+        raise ValueError("Only all-numeric tables can be written as .npz")
+    if np.issubdtype(values.dtype, np.integer) and values.size:
+        values = values.astype(np.result_type(np.min_scalar_type(values.min()), np.min_scalar_type(values.max())))
+    return values
+
+
+def _arrow_compatible(df: pd.DataFrame) -> pd.DataFrame:
+    """Arrow columns have one type: object columns that mix types (e.g. 'Hour available' holding 1, 2 and 'both') are written as text."""
+    mixed = [column for column in df.columns if df[column].dtype == object
+             and len({type(v) for v in df[column] if not pd.isna(v)}) > 1]
+    if not mixed: return df
+    return df.assign(**{column: df[column].map(lambda v: v if pd.isna(v) else str(v)) for column in mixed})
+
+
+def write_table(df: pd.DataFrame, path: str):
+    """Writes df without its index. Every format except .xlsx is written to a temporary file and renamed into place."""
+    extension = _extension(path)
+    if extension == XLSX:
+        df.to_excel(path, index=False, engine='openpyxl')
+        return
+    tmp_path = f"{path}.tmp{os.getpid()}{extension}"
+    try:
+        if extension == '.csv':
+            df.to_csv(tmp_path, index=False)
+        elif extension == '.npz':
+            np.savez_compressed(tmp_path, values=_npz_values(df), columns=np.array([str(c) for c in df.columns]))
+        elif extension == '.parquet':
+            _arrow_compatible(df).to_parquet(tmp_path, index=False)
+        else:
+            _arrow_compatible(df).reset_index(drop=True).to_feather(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
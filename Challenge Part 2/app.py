@@ -1,39 +1,68 @@
-from flask import Flask, render_template, request, redirect, url_for, session
-import pandas as pd
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, abort
+import hmac
 import os
+import secrets
+import sys
+import threading
+from score_store import open_score_store
+from app_cache import JudgingCache
+
+# The ranking code lives in Part 3
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Challenge Part 3'))
+from leaderboard import LeaderboardAggregator
+from rank_poster_score import RANKING_MODES
 
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
 
 PASSWORD_FILE = 'judge_passwords.csv'
-JUDGES_DATA_FILE = 'judge_poster_assignment_matrix.csv'
+JUDGES_DATA_FILE = 'judge_assignments.csv'  # long form written by prep.py
 RESHAPED_DATA_FILE = 'reshaped_judges_data.csv'
+SCORES_DB_FILE = 'scores.db'
 
-def load_passwords():
-    """Loads judge passwords from CSV."""
-    try:
-        df = pd.read_csv(PASSWORD_FILE)
-        return {str(row['Judge #']): str(row['Password']) for _, row in df.iterrows()}
-    except FileNotFoundError:
-        return {}
+_score_store = None
+_score_store_lock = threading.Lock()
 
-def load_judges_data():
-    """Loads judges data from CSV."""
-    try:
-        return pd.read_csv(JUDGES_DATA_FILE)
-    except FileNotFoundError:
-        return None
+def get_score_store():
+    """Returns the score store (see score_store.SCORE_BACKEND), opening it on first use."""
+    global _score_store
+    with _score_store_lock:
+        if _score_store is None:
+            _score_store = open_score_store(reshaped_csv=RESHAPED_DATA_FILE, db_path=SCORES_DB_FILE)
+        return _score_store
 
-def load_reshaped_data():
-    """Loads reshaped judges data from CSV."""
-    try:
-        return pd.read_csv(RESHAPED_DATA_FILE)
-    except FileNotFoundError:
-        return None
+# Passwords, assignments and scores indexed in memory; set APP_CACHE=0 to re-read the files on every request
+judging_cache = JudgingCache(PASSWORD_FILE, JUDGES_DATA_FILE, get_score_store, enabled=os.environ.get('APP_CACHE', '1') != '0')
 
-def save_reshaped_data(df):
-    """Saves the reshaped data back to the CSV."""
-    df.to_csv(RESHAPED_DATA_FILE, index=False)
+LEADERBOARD_TOKEN_FILE = 'leaderboard_token.txt'
+
+def load_leaderboard_token():
+    """LEADERBOARD_TOKEN if set, else the token in leaderboard_token.txt, created (readable only by this user) on first use."""
+    token = os.environ.get('LEADERBOARD_TOKEN')
+    if token: return token
+    try:
+        fd = os.open(LEADERBOARD_TOKEN_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(secrets.token_urlsafe(16))
+    except FileExistsError:
+        pass
+    with open(LEADERBOARD_TOKEN_FILE) as f:
+        return f.read().strip()
+
+# /leaderboard requires ?token=<LEADERBOARD_TOKEN> so judges cannot see it
+LEADERBOARD_TOKEN = load_leaderboard_token()
+
+_leaderboard = None
+_leaderboard_lock = threading.Lock()
+
+def get_leaderboard():
+    """Live per-poster aggregates, loaded from the score store once and then updated on every submission."""
+    global _leaderboard
+    with _leaderboard_lock:
+        if _leaderboard is None:
+            scores = get_score_store().load_dataframe()
+            _leaderboard = LeaderboardAggregator(scores if scores is not None and not scores.empty else None)
+        return _leaderboard
 
 @app.route('/')
 def index():
@@ -44,8 +73,7 @@ def login():
     if request.method == 'POST':
         judge_id = request.form['judge_id']
         password = request.form['password']
-        passwords = load_passwords()
-        if judge_id in passwords and passwords[judge_id] == password:
+        if judging_cache.check_password(judge_id, password):
             session['judge_id'] = judge_id
             return redirect(url_for('dashboard'))
         else:
@@ -56,17 +84,15 @@ def login():
 def dashboard():
     if 'judge_id' in session:
         judge_id = session['judge_id']
-        judges_df = load_judges_data()
-        reshaped_df = load_reshaped_data()
+        assignments = judging_cache.assignments()
 
-        if judges_df is not None and reshaped_df is not None:
-            judge_id_str = str(judge_id)  # Ensure it's a string
-            if judge_id_str not in judges_df.columns:
+        if assignments is not None:
+            assigned_posters = assignments.get(str(judge_id))
+            if assigned_posters is None:
                 return "Judge ID not found in judges data.", 404
 
-            assigned_posters = judges_df[judges_df[judge_id_str] == 1]['Poster #'].tolist()
-
             if request.method == 'POST':
+                updates = {}
                 for poster in assigned_posters:
                     poster_str = str(poster)
                     innovation_key = f'innovation_{poster_str}'
@@ -80,31 +106,22 @@ def dashboard():
 
                         if not (0 <= innovation <= 10 and 0 <= clarity <= 10 and 0 <= presentation <= 10):
                             raise ValueError("Scores must be between 0 and 10")
-                        
-                        total = innovation + clarity + presentation
                     except (KeyError, ValueError) as e:
                         return f"Invalid score input for poster {poster}: {e}", 400
+                    updates[poster] = (innovation, clarity, presentation)
 
-                    row_index = reshaped_df[
-                        (reshaped_df['Poster Number'] == poster) & (reshaped_df['Judge #'] == int(judge_id))
-                    ].index
-                    if not row_index.empty:
-                        reshaped_df.loc[row_index[0], 'Innovation'] = innovation
-                        reshaped_df.loc[row_index[0], 'Clarity'] = clarity
-                        reshaped_df.loc[row_index[0], 'Presentation'] = presentation
-                        reshaped_df.loc[row_index[0], 'Total'] = total
-                    else:
-                        return f"Data not found for Judge {judge_id} and Poster {poster}.", 404
-
-                save_reshaped_data(reshaped_df)
-                reshaped_df = load_reshaped_data()
+                missing = get_score_store().update_scores(judge_id, updates)
+                if missing:
+                    return f"Data not found for Judge {judge_id} and Poster {missing[0]}.", 404
+                judging_cache.record_scores(judge_id, updates)
+                leaderboard = get_leaderboard()
+                for poster, (innovation, clarity, presentation) in updates.items():
+                    leaderboard.record(judge_id, poster, innovation, clarity, presentation)
 
+            scores = judging_cache.scores_for(judge_id, assigned_posters)
             poster_data = []
             for poster in assigned_posters:
-                score_row = reshaped_df[
-                    (reshaped_df['Poster Number'] == poster) & (reshaped_df['Judge #'] == int(judge_id))
-                ]
-                score_row = score_row.iloc[0] if not score_row.empty else None
+                score_row = scores.get(poster)
 
                 if score_row is not None:
                     poster_data.append({
@@ -134,9 +151,26 @@ def logout():
     session.pop('judge_id', None)
     return redirect(url_for('login'))
 
+@app.route('/leaderboard')
+def leaderboard():
+    if not LEADERBOARD_TOKEN or not hmac.compare_digest(request.args.get('token', ''), LEADERBOARD_TOKEN):
+        abort(403)
+    mode = request.args.get('mode', 'raw')
+    if mode not in RANKING_MODES:
+        return f"Unknown ranking mode '{mode}'. Choose from: {', '.join(RANKING_MODES)}", 400
+    n_boot = min(max(request.args.get('bootstrap', 0, type=int), 0), 1000)
+    ranking = get_leaderboard().ranking(mode, n_boot)
+    rows = ranking.astype(object).where(ranking.notna(), None).to_dict('records')  # posters nobody has scored have no Score yet
+    if request.args.get('format') == 'json':
+        return jsonify(rows)
+    return render_template('leaderboard.html', rows=rows, mode=mode)
+
 def home():
     return render_template('login.html')
 
 
 if __name__ == '__main__':
+    judging_cache.warm()
+    if not os.environ.get('WERKZEUG_RUN_MAIN'):  # once, not again in the debug reloader's child process
+        print(f"Leaderboard: http://127.0.0.1:6969/leaderboard?token={LEADERBOARD_TOKEN}")
     app.run(debug=True, port=6969)
@@ -0,0 +1,122 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+
+def file_signature(paths):
+    """(mtime, size) of each file, None for a missing one; any change means the cached copy is stale."""
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class JudgingCache:
+    """In-process indexes for the dashboard, rebuilt only when their source file changes.
+
+    - passwords: {judge id (str): password}
+    - assignments: {judge id (str): [poster numbers]}, None if the assignments CSV is missing
+    - scores: {(judge, poster): {'Innovation', 'Clarity', 'Presentation', 'Total'}}
+
+    A request only stats the source files and looks up its own judge, so it costs
+    O(posters per judge) instead of re-reading the CSVs. Submissions from this process are
+    written through with record_scores(); reload() drops everything after an outside edit
+    that did not change the files' mtime or size. With enabled=False every lookup rebuilds
+    its index from disk (the behaviour before the cache, kept for comparison).
+    """
+
+    def __init__(self, password_file, assignment_file, store_getter, enabled=True):
+        self.password_file = password_file
+        self.assignment_file = assignment_file
+        self.store_getter = store_getter
+        self.enabled = enabled
+        self.lock = threading.RLock()
+        self.entries = {}  # name -> (file signature, index)
+
+    def _get(self, name, paths, build):
+        with self.lock:
+            signature = file_signature(paths)
+            entry = self.entries.get(name)
+            if self.enabled and entry is not None and entry[0] == signature:
+                return entry[1]
+            index = build()
+            self.entries[name] = (signature, index)
+            return index
+
+    def reload(self):
+        with self.lock:
+            self.entries.clear()
+
+    def warm(self):
+        """Builds every index up front so the first judges do not pay for it."""
+        self.passwords(); self.assignments(); self.scores()
+
+    def passwords(self):
+        return self._get('passwords', [self.password_file], self._build_passwords)
+
+    def assignments(self):
+        return self._get('assignments', [self.assignment_file], self._build_assignments)
+
+    def scores(self):
+        store = self.store_getter()
+        return self._get('scores', store.source_files(), lambda: self._build_scores(store))
+
+    def check_password(self, judge_id, password):
+        passwords = self.passwords()
+        return judge_id in passwords and passwords[judge_id] == password
+
+    def posters_for(self, judge_id):
+        """Posters assigned to a judge, or None if the judge is not in the assignments."""
+        assignments = self.assignments()
+        return None if assignments is None else assignments.get(str(judge_id))
+
+    def scores_for(self, judge_id, posters):
+        index, judge = self.scores(), int(judge_id)
+        return {poster: index[(judge, poster)] for poster in posters if (judge, poster) in index}
+
+    def record_scores(self, judge_id, updates):
+        """Writes a successful {poster: (innovation, clarity, presentation)} submission into the score index."""
+        store = self.store_getter()
+        with self.lock:
+            entry = self.entries.get('scores')
+            if entry is None: return
+            index, judge = entry[1], int(judge_id)
+            for poster, (innovation, clarity, presentation) in updates.items():
+                index[(judge, int(poster))] = {'Innovation': innovation, 'Clarity': clarity, 'Presentation': presentation,
+                                               'Total': innovation + clarity + presentation}
+            # Our own write changed the files; re-stamp so it does not force a full rebuild
+            self.entries['scores'] = (file_signature(store.source_files()), index)
+
+    def _build_passwords(self):
+        try:
+            df = pd.read_csv(self.password_file)
+        except FileNotFoundError:
+            return {}
+        return dict(zip(df['Judge #'].astype(str), df['Password'].astype(str)))
+
+    def _build_assignments(self):
+        try:
+            df = pd.read_csv(self.assignment_file)
+        except FileNotFoundError:
+            return None
+        # Long form from prep.py: a row per (Poster #, Judge #), and an empty Poster # for a judge with none
+        judges = df['Judge #'].astype(int).to_numpy()
+        assigned = df['Poster #'].notna().to_numpy()
+        order = np.argsort(judges[assigned], kind='stable')
+        ids, starts = np.unique(judges[assigned][order], return_index=True)
+        per_judge = np.split(df['Poster #'].to_numpy()[assigned][order].astype(int), starts[1:])
+        index = {str(judge): [] for judge in np.unique(judges)}
+        index.update((str(judge), chunk.tolist()) for judge, chunk in zip(ids, per_judge))
+        return index
+
+    def _build_scores(self, store):
+        df = store.load_dataframe()
+        if df is None: return {}
+        return {(int(j), int(p)): {'Innovation': i, 'Clarity': c, 'Presentation': pr, 'Total': t}
+                for j, p, i, c, pr, t in zip(df['Judge #'], df['Poster Number'], df['Innovation'],
+                                              df['Clarity'], df['Presentation'], df['Total'])}
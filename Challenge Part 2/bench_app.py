@@ -0,0 +1,109 @@
+# bench_app.py
+"""Local load test for the judging app: p50/p99 latency of login and dashboard requests.
+
+Runs the app on a local port against a generated event (posters x judges, 2 judges per poster)
+in a temporary directory, once with the in-process cache disabled (every request re-reads the
+files, as before) and once with it enabled.
+
+Usage:
+    python bench_app.py --posters 2000 --judges 300 --clients 8 --requests 50
+"""
+import argparse
+import http.cookiejar
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from prep import assignment_table
+
+
+def write_event(directory, n_posters, n_judges, seed=0):
+    rng = np.random.default_rng(seed)
+    matrix = np.zeros((n_posters, n_judges), dtype=int)
+    for i in range(n_posters):
+        matrix[i, rng.choice(n_judges, size=2, replace=False)] = 1
+    posters, judges = np.nonzero(matrix)
+    assignment_table(pd.DataFrame({'Poster Number': posters + 1, 'Judge #': judges + 1}), np.arange(1, n_judges + 1)).to_csv(
+        os.path.join(directory, 'judge_assignments.csv'), index=False)
+    pd.DataFrame({'Poster Number': posters + 1, 'Judge #': judges + 1, 'Clarity': 0, 'Innovation': 0,
+                  'Presentation': 0, 'Total': 0}).to_csv(os.path.join(directory, 'reshaped_judges_data.csv'), index=False)
+    pd.DataFrame({'Judge #': range(1, n_judges + 1), 'Password': [f"pw{j}" for j in range(1, n_judges + 1)]}).to_csv(
+        os.path.join(directory, 'judge_passwords.csv'), index=False)
+    return {j + 1: (posters[judges == j] + 1).tolist() for j in range(n_judges)}
+
+
+def judge_session(base_url, judge, posters, n_requests, post_every):
+    """One judge: log in, then load the dashboard repeatedly and submit every post_every-th time."""
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+    timings = {'login': [], 'dashboard GET': [], 'dashboard POST': []}
+
+    def timed(kind, url, data=None):
+        start = time.perf_counter()
+        with opener.open(url, data=urllib.parse.urlencode(data).encode() if data else None) as response:
+            response.read()
+        timings[kind].append(time.perf_counter() - start)
+
+    timed('login', f"{base_url}/login", {'judge_id': str(judge), 'password': f"pw{judge}"})
+    for k in range(n_requests):
+        if post_every and k % post_every == post_every - 1:
+            form = {}
+            for poster in posters:
+                form.update({f'innovation_{poster}': k % 5, f'clarity_{poster}': 2, f'presentation_{poster}': 1})
+            timed('dashboard POST', f"{base_url}/dashboard", form)
+        else:
+            timed('dashboard GET', f"{base_url}/dashboard")
+    return timings
+
+
+def run_load(base_url, assignments, clients, n_requests, post_every):
+    judges = [j for j, posters in assignments.items() if posters][:clients]
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        results = list(executor.map(lambda j: judge_session(base_url, j, assignments[j], n_requests, post_every), judges))
+    return {kind: [t for r in results for t in r[kind]] for kind in results[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the judging app with and without the in-process cache.")
+    parser.add_argument('--posters', type=int, default=2000)
+    parser.add_argument('--judges', type=int, default=300)
+    parser.add_argument('--clients', type=int, default=8, help="Concurrent judges")
+    parser.add_argument('--requests', type=int, default=50, help="Dashboard requests per judge")
+    parser.add_argument('--post-every', type=int, default=5, help="Every n-th dashboard request is a submission (0 = never)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_app_')
+    assignments = write_event(workdir, args.posters, args.judges)
+    here = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(workdir)  # app.py resolves its data files relative to the working directory
+    sys.path.insert(0, here)
+    from werkzeug.serving import make_server
+    import app as judging_app
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)  # no per-request access log
+    server = make_server('127.0.0.1', 0, judging_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    print(f"{args.posters} posters, {args.judges} judges, {args.clients} concurrent judges x {args.requests} requests ({workdir})")
+
+    for label, enabled in [("before (APP_CACHE=0)", False), ("after (cache)", True)]:
+        judging_app.judging_cache.enabled = enabled
+        judging_app.judging_cache.reload()
+        if enabled: judging_app.judging_cache.warm()
+        timings = run_load(base_url, assignments, args.clients, args.requests, args.post_every)
+        print(label)
+        for kind, values in timings.items():
+            if not values: continue
+            ms = np.array(values) * 1000
+            print(f"  {kind:<16}{len(ms):6d} req  p50 {np.percentile(ms, 50):8.2f} ms  p99 {np.percentile(ms, 99):8.2f} ms")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,20 @@
+import argparse
 import os
 import subprocess
 import signal
-import pandas as pd
+import threading
 import time
+import part1_path  # noqa: F401  (Challenge Part 1 on sys.path for table_io and stage_runner)
+from score_store import open_score_store
+from prep import ASSIGNMENTS_CSV_FILE, ASSIGNMENTS_STEM, MATRIX_STEM, find_matrix_file, load_assignments, write_prepared_tables
+from stage_runner import Stage, StageRunner
+from table_io import XLSX, handoff_path
 
 def check_file_exists(filepath):
     """Checks if a file exists."""
     return os.path.exists(filepath)
 
-def run_script(script_path):
-    """Runs a Python script."""
-    subprocess.run(['python', script_path])
-
-def run_flask_app(script_path):
+def run_flask_app(script_path, xlsx=True):
     """Runs the Flask app and handles graceful shutdown."""
     process = subprocess.Popen(['python', script_path])
 
@@ -21,15 +23,8 @@ def run_flask_app(script_path):
             time.sleep(1)  # Check periodically, without busy-waiting
     except KeyboardInterrupt:
         print("\nCtrl+C detected.  Shutting down gracefully...")
-        # Convert reshaped_judges_data.csv to xlsx
-        try:
-            df = pd.read_csv("reshaped_judges_data.csv")
-            df.to_excel("output_for_part3.xlsx", index=False)
-            print("Converted reshaped_judges_data.csv to reshaped_judges_data.xlsx")
-        except FileNotFoundError:
-            print("reshaped_judges_data.csv not found, could not convert to .xlsx")
-        except Exception as e:
-            print(f"Error during conversion: {e}")
+        # Export the submitted scores from the score store (see score_store.SCORE_BACKEND) for Part 3
+        export_scores(xlsx=xlsx)
             
         # Terminate the Flask app process.  Send SIGINT (like Ctrl+C)
         process.send_signal(signal.SIGINT)
@@ -44,46 +39,73 @@ def run_flask_app(script_path):
         print("Driver script exiting.")
         
 
+def export_scores(output_stem="output_for_part3", xlsx=True):
+    """Writes the current scores for Part 3 (Parquet, or CSV without pyarrow) and, unless xlsx is False,
+    an Excel copy for people. Safe while the app is running: the store is only read.
+    """
+    try:
+        store = open_score_store()
+        for path in [handoff_path(output_stem)] + ([output_stem + XLSX] if xlsx else []):
+            store.export(path)
+            print(f"Exported judge scores to {path}")
+    except FileNotFoundError:
+        print("reshaped_judges_data.csv not found, could not export the scores")
+    except Exception as e:
+        print(f"Error during export: {e}")
+
 def main():
     """Main function to orchestrate the script execution."""
+    parser = argparse.ArgumentParser(description="Prepare the judging data and run the judging app.")
+    parser.add_argument('--export', action='store_true',
+                        help="Only export the current scores for Part 3 (the app can keep running)")
+    parser.add_argument('--no-xlsx', action='store_true', help="Export the scores without the output_for_part3.xlsx copy")
+    parser.add_argument('--force', nargs='*', metavar='STAGE',
+                        help="Rebuild these files from the assignments: app_assignments, score_sheet (with SCORE_BACKEND=csv this discards the scores), "
+                             "passwords (judges need the new ones); with no names, all three")
+    parser.add_argument('--jobs', type=int, default=3, help="Files prepared at the same time (default: 3)")
+    parser.add_argument('--dry-run', action='store_true', help="Only print which files would be prepared, without starting the app")
+    args = parser.parse_args()
+    if args.force == []: args.force = ['all']
+    if args.export:
+        export_scores(xlsx=not args.no_xlsx)
+        return
 
-    excel_file = "judge_poster_assignment_matrix.xlsx"
+    matrix_file = find_matrix_file()
     passwords_file = "judge_passwords.csv"
     reshaped_data_file = "reshaped_judges_data.csv"
-    judges_data_csv = 'judge_poster_assignment_matrix.csv'
+    judges_data_csv = ASSIGNMENTS_CSV_FILE
 
-    if not check_file_exists(excel_file):
-        print(f"Error: {excel_file} not found. Please make sure it exists.")
+    if matrix_file is None:
+        print(f"Error: Neither {ASSIGNMENTS_STEM} (from Part 1) nor {MATRIX_STEM}.xlsx was found. Please make sure one exists.")
         return
 
-    if not check_file_exists(passwords_file):
-        print("Generating passwords...")
-        run_script("pass_gen.py")
-
-    if not check_file_exists(reshaped_data_file):
-        print("Reshaping data...")
-        run_script("data_reshaper.py")
+    # The app's files are only written when missing (or forced): the score sheet seeds the score store and
+    # judges already have their passwords. If the assignments changed since, the runner warns instead.
+    # The stages that run share one read of the assignments.
+    assignments, read_lock = [], threading.Lock()
 
+    def prepare(name, path):
+        with read_lock:
+            if not assignments: assignments.append(load_assignments(matrix_file))
+        write_prepared_tables({name: path}, matrix_file, assignments[0])
 
-    #check for judge_poster_assignment_matrix.csv
-    if not check_file_exists(judges_data_csv):
-        try:
-            print("generating judge_poster_assignment_matrix.csv")
-            df = pd.read_excel(excel_file)
-            df.to_csv(judges_data_csv, index=False)
-        except FileNotFoundError:
-            print("Could not find the excel file from where the .csv has to be generated")
-            return
-        except Exception as e:
-            print("An Exception occured while creating csv of judge_poster_assignment_matrix.xlsx : ", e)
-            return
-
+    stages = [Stage(name, lambda name=name, path=path: prepare(name, path), inputs=[matrix_file], outputs=[path], keep_outputs=True)
+              for name, path in (('app_assignments', judges_data_csv), ('score_sheet', reshaped_data_file), ('passwords', passwords_file))]
+    try:
+        status = StageRunner(stages, jobs=args.jobs).run(args.force or (), dry_run=args.dry_run)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    if args.dry_run: return
+    if 'failed' in status.values():
+        print(f"Could not prepare the judging data from {matrix_file}.")
+        return
 
     if (check_file_exists(passwords_file) and
         check_file_exists(reshaped_data_file) and
         check_file_exists(judges_data_csv)):
         print("Starting Flask app...")
-        run_flask_app("app.py")
+        run_flask_app("app.py", xlsx=not args.no_xlsx)
     else:
         print("Required files are missing.  Could not start the app.")
 
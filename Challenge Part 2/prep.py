@@ -0,0 +1,99 @@
+import os
+import random
+import numpy as np
+import pandas as pd
+import part1_path  # noqa: F401  (Challenge Part 1 on sys.path for table_io and stage_runner)
+from score_store import SCORE_COLUMNS, SCORED_COLUMN, write_score_table
+from table_io import find_table, read_table
+
+ASSIGNMENTS_STEM = "judge_poster_assignments"  # Part 1's long-form hand-off, one row per assigned (poster, judge)
+MATRIX_STEM = "judge_poster_assignment_matrix"
+MATRIX_FILE = MATRIX_STEM + ".xlsx"
+ASSIGNMENTS_CSV_FILE = "judge_assignments.csv"
+RESHAPED_DATA_FILE = "reshaped_judges_data.csv"
+PASSWORD_FILE = "judge_passwords.csv"
+LONG_FORM_COLUMNS = ["Poster #", "Judge #"]
+
+
+def find_matrix_file(stem=MATRIX_STEM):
+    """The assignments from Part 1, or None: its long-form hand-off if present, else the dense matrix
+    (.npz hand-off of older runs before the Excel copy).
+    """
+    return (find_table(ASSIGNMENTS_STEM, ('.parquet', '.arrow', '.feather', '.csv'))
+            or find_table(stem, ('.npz', '.parquet', '.arrow', '.feather', '.xlsx')))
+
+
+def load_assignments(path=MATRIX_FILE):
+    """(pairs, judges) from either assignment format, without building a dense matrix from the long form.
+
+    pairs has one row per assigned 'Poster Number' / 'Judge #', poster-major; judges holds every judge,
+    including those with no poster. The long form lists those with an empty 'Poster #'; the dense
+    matrix has a column per judge with the poster number in its first column.
+    """
+    table = read_table(path)
+    if list(table.columns) == LONG_FORM_COLUMNS:
+        assigned = table.dropna()
+        pairs = pd.DataFrame({"Poster Number": assigned["Poster #"].to_numpy().astype(int),
+                              "Judge #": assigned["Judge #"].to_numpy().astype(float).astype(int)})
+        return pairs, np.unique(table["Judge #"].dropna().to_numpy().astype(float).astype(int))
+    rows, cols = np.nonzero(table.iloc[:, 1:].to_numpy() == 1)
+    judges = table.columns[1:].astype(int).to_numpy()
+    pairs = pd.DataFrame({"Poster Number": table.iloc[:, 0].to_numpy()[rows].astype(int), "Judge #": judges[cols]})
+    return pairs, judges
+
+
+def assignment_table(pairs, judges):
+    """The long form the app reads (app_cache.JudgingCache): the pairs, then each judge without a poster once."""
+    idle = np.setdiff1d(judges, pairs["Judge #"].to_numpy())
+    return pd.DataFrame({"Poster #": pd.array(pairs["Poster Number"].tolist() + [None] * len(idle), dtype="Int64"),
+                         "Judge #": np.concatenate([pairs["Judge #"].to_numpy(), idle])})
+
+
+def reshape_assignments(pairs):
+    """Long score sheet with one zero-scored row per assigned (poster, judge), in the pairs' order, none of them scored yet."""
+    reshaped = pairs[["Poster Number", "Judge #"]].reset_index(drop=True)
+    for column in SCORE_COLUMNS[2:]:
+        reshaped[column] = 0
+    reshaped[SCORED_COLUMN] = False
+    return reshaped
+
+
+def generate_passwords(judges):
+    """A random 4-digit password for every judge."""
+    return pd.DataFrame({"Judge #": judges, "Password": [random.randint(1000, 9999) for _ in judges]})
+
+
+# The files the app needs, by the driver's stage names: (builder from (pairs, judges), message)
+PREPARED_TABLES = {
+    "app_assignments": (assignment_table, "Assignments for the app have been saved to {}"),
+    "score_sheet": (lambda pairs, judges: reshape_assignments(pairs), "Reshaped data has been saved to {}"),
+    "passwords": (lambda pairs, judges: generate_passwords(judges), "Judge passwords have been saved to {}"),
+}
+
+
+def write_prepared_tables(targets, matrix_file=MATRIX_FILE, assignments=None):
+    """Writes {table name: path} (names as in PREPARED_TABLES) from one read of the assignments.
+
+    assignments is load_assignments(matrix_file) if the caller has already read it.
+    """
+    pairs, judges = assignments if assignments is not None else load_assignments(matrix_file)
+    for name, path in targets.items():
+        build, message = PREPARED_TABLES[name]
+        write_score_table(build(pairs, judges), path)
+        print(message.format(path))
+
+
+def prepare_judging_data(matrix_file=MATRIX_FILE, assignments_csv=ASSIGNMENTS_CSV_FILE, reshaped_file=RESHAPED_DATA_FILE,
+                         password_file=PASSWORD_FILE, overwrite=False):
+    """Writes every file the app needs from one read of the assignments (long form or dense matrix).
+
+    Only missing files are written unless overwrite is set; the password table is never
+    regenerated once it exists, since judges have already been given those passwords.
+    Returns the list of files written.
+    """
+    targets = {name: path for name, path in (("app_assignments", assignments_csv), ("score_sheet", reshaped_file))
+               if overwrite or not os.path.exists(path)}
+    if not os.path.exists(password_file): targets["passwords"] = password_file
+    if not targets: return []
+    write_prepared_tables(targets, matrix_file)
+    return list(targets.values())
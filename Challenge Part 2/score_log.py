@@ -0,0 +1,210 @@
+import contextlib
+import json
+import os
+import threading
+import time
+import pandas as pd
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, a single writing process
+    fcntl = None
+from score_store import SCORE_COLUMNS, SCORED_COLUMN, read_score_table, scored_flags, write_score_table
+
+SCORE_LOG_FILE = 'scores.log'
+SCORE_SNAPSHOT_FILE = 'scores_snapshot.csv'
+COMPACT_EVERY = 500  # submissions between snapshots
+
+
+def _fsync_replace(df, path):
+    """Writes a CSV next to path, fsyncs it and renames it over path, so readers see the old or new file, never half of one."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', newline='') as f:
+        df.to_csv(f, index=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class EventLogScoreStore:
+    """Judge scores as an append-only log of submissions on top of a CSV snapshot.
+
+    Each submission is one JSON line (judge, timestamp and every poster's innovation, clarity and
+    presentation) appended and fsync'd before the request returns, so a write costs O(posters
+    submitted) and a crash can lose at most the line being written. A torn last line is ignored on
+    replay, which keeps a submission all-or-nothing. The table is the snapshot with the log
+    replayed over it; every COMPACT_EVERY submissions it is written as a new snapshot and the
+    log is emptied. Replaying is idempotent, so a crash between those two steps is harmless.
+    A row is scored (SCORED_COLUMN) once a submission for it is in the log; the snapshot keeps the flag.
+
+    Several processes (e.g. the workers of a multi-process server, or an export while the app runs)
+    can share the store: writers hold an exclusive flock on scores.log.lock and readers a shared one,
+    and each first replays whatever the others appended since it last looked (or reloads everything
+    after another process compacted). Without fcntl (Windows) only one process may write.
+    """
+
+    def __init__(self, log_path=SCORE_LOG_FILE, snapshot_path=SCORE_SNAPSHOT_FILE, compact_every=COMPACT_EVERY):
+        self.log_path = log_path
+        self.snapshot_path = snapshot_path
+        self.lock_path = log_path + '.lock'
+        self.compact_every = compact_every
+        self.lock = threading.Lock()
+        self.rows = {}  # judge -> {poster: [clarity, innovation, presentation, total, scored]}
+        self.pending = 0  # submissions in the log since the last snapshot
+        self.valid_log_bytes = 0  # end of the last complete line read; anything after it is unread or a torn write
+        self.snapshot_version = None
+        with self._locked(exclusive=False):
+            self._reload()
+
+    @contextlib.contextmanager
+    def _locked(self, exclusive=True):
+        """The thread lock plus, where fcntl exists, a flock shared with the other processes using the store."""
+        with self.lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _snapshot_identity(self):
+        try:
+            st = os.stat(self.snapshot_path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size  # a compaction renames a new file into place
+
+    def _reload(self):
+        """Snapshot plus log replay; starts over if a writer without the flock compacted while we were reading."""
+        while True:
+            version = self._snapshot_identity()
+            self.rows, self.pending, self.valid_log_bytes = {}, 0, 0
+            self._read_snapshot()
+            self._read_log()
+            self.snapshot_version = version
+            if self._snapshot_identity() == version: return
+
+    def _catch_up(self):
+        """Applies what other processes wrote since this one last read the files."""
+        if self._snapshot_identity() != self.snapshot_version:
+            self._reload()
+        elif os.path.exists(self.log_path) and os.path.getsize(self.log_path) > self.valid_log_bytes:
+            self._read_log()
+
+    def _read_snapshot(self):
+        if not os.path.exists(self.snapshot_path): return
+        snapshot = read_score_table(self.snapshot_path)
+        for r, scored in zip(snapshot.to_dict('records'), scored_flags(snapshot)):
+            self.rows.setdefault(int(r['Judge #']), {})[int(r['Poster Number'])] = [
+                int(r['Clarity']), int(r['Innovation']), int(r['Presentation']), int(r['Total']), scored]
+
+    def _read_log(self):
+        """Replays the log from valid_log_bytes on."""
+        if not os.path.exists(self.log_path): return
+        with open(self.log_path, 'rb') as f:
+            f.seek(self.valid_log_bytes)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    print(f"Warning: ignoring incomplete last record in {self.log_path}")
+                    break
+                self.valid_log_bytes += len(line)
+                self.pending += 1
+                try:
+                    event = json.loads(line)
+                    self._apply(event['judge'], event['scores'])
+                except (ValueError, KeyError, TypeError) as e:
+                    print(f"Warning: skipping unreadable record in {self.log_path}: {e}")
+
+    def _apply(self, judge, scores):
+        judge_rows = self.rows.setdefault(int(judge), {})
+        for poster, innovation, clarity, presentation in scores:
+            judge_rows[int(poster)] = [clarity, innovation, presentation, innovation + clarity + presentation, True]
+
+    def _append(self, event):
+        """Appends under the exclusive lock, after _catch_up has read every complete line."""
+        line = (json.dumps(event, separators=(',', ':')) + '\n').encode()
+        with open(self.log_path, 'ab') as f:
+            if f.tell() != self.valid_log_bytes:
+                f.truncate(self.valid_log_bytes)  # drop a torn record left by a crash before appending after it
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self.valid_log_bytes += len(line)
+        self.pending += 1
+
+    def _compact(self):
+        _fsync_replace(self._table(), self.snapshot_path)
+        with open(self.log_path, 'wb') as f:
+            os.fsync(f.fileno())
+        self.valid_log_bytes = 0
+        self.pending = 0
+        self.snapshot_version = self._snapshot_identity()
+
+    def _table(self):
+        records = [(poster, judge, *values) for judge, judge_rows in self.rows.items() for poster, values in judge_rows.items()]
+        df = pd.DataFrame(records, columns=SCORE_COLUMNS + [SCORED_COLUMN])
+        return df.sort_values(['Poster Number', 'Judge #'], kind='stable').reset_index(drop=True)
+
+    def is_empty(self):
+        with self._locked(exclusive=False):
+            self._catch_up()
+            return not any(self.rows.values())
+
+    def source_files(self):
+        return [self.snapshot_path, self.log_path]
+
+    def save_dataframe(self, df):
+        """Upserts every row of a reshaped score table and writes it straight into a new snapshot."""
+        with self._locked():
+            self._catch_up()
+            for r, scored in zip(df[SCORE_COLUMNS].to_dict('records'), scored_flags(df)):
+                self.rows.setdefault(int(r['Judge #']), {})[int(r['Poster Number'])] = [
+                    int(r['Clarity']), int(r['Innovation']), int(r['Presentation']), int(r['Total']), scored]
+            self._compact()
+
+    def add_missing(self, df):
+        """Adds the rows of a reshaped score table whose (judge, poster) has no row yet; existing scores are kept.
+        Returns the number of rows added (written as a new snapshot if any)."""
+        with self._locked():
+            self._catch_up()
+            added = 0
+            for r in df[SCORE_COLUMNS].to_dict('records'):
+                judge_rows = self.rows.setdefault(int(r['Judge #']), {})
+                if int(r['Poster Number']) in judge_rows: continue
+                judge_rows[int(r['Poster Number'])] = [int(r['Clarity']), int(r['Innovation']), int(r['Presentation']), int(r['Total']), False]
+                added += 1
+            if added: self._compact()
+            return added
+
+    def load_dataframe(self):
+        with self._locked(exclusive=False):
+            self._catch_up()
+            return self._table()
+
+    def scores_for_judge(self, judge_id):
+        with self._locked(exclusive=False):
+            self._catch_up()
+            return {poster: {'Innovation': i, 'Clarity': c, 'Presentation': p, 'Total': t}
+                    for poster, (c, i, p, t, _) in self.rows.get(int(judge_id), {}).items()}
+
+    def update_scores(self, judge_id, updates):
+        """Appends one {poster: (innovation, clarity, presentation)} submission; nothing is written if a poster is not the judge's."""
+        judge = int(judge_id)
+        with self._locked():
+            self._catch_up()
+            judge_rows = self.rows.get(judge, {})
+            missing = [poster for poster in updates if int(poster) not in judge_rows]
+            if missing: return missing
+            scores = [[int(poster), int(i), int(c), int(p)] for poster, (i, c, p) in updates.items()]
+            self._append({'judge': judge, 'ts': round(time.time(), 3), 'scores': scores})
+            self._apply(judge, scores)
+            if self.pending >= self.compact_every: self._compact()
+        return []
+
+    def import_file(self, path):
+        self.save_dataframe(read_score_table(path))
+
+    def export(self, path):
+        write_score_table(self.load_dataframe(), path)
@@ -0,0 +1,221 @@
+import os
+import sqlite3
+import threading
+import time
+import pandas as pd
+
+import part1_path  # noqa: F401  (Challenge Part 1 on sys.path for table_io and stage_runner)
+from table_io import read_table, write_table
+
+SCORE_COLUMNS = ["Poster Number", "Judge #", "Clarity", "Innovation", "Presentation", "Total"]
+# True once the judge has submitted the row; the score sheet starts every pair at zero with False.
+# A table without the column (an older export or a hand-made sheet) counts as scored throughout.
+SCORED_COLUMN = "Scored"
+RESHAPED_DATA_FILE = 'reshaped_judges_data.csv'
+SCORES_DB_FILE = 'scores.db'
+SCORE_BACKEND = os.environ.get('SCORE_BACKEND', 'log')  # 'log', 'sqlite' or 'csv'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    judge INTEGER NOT NULL,
+    poster INTEGER NOT NULL,
+    clarity INTEGER NOT NULL DEFAULT 0,
+    innovation INTEGER NOT NULL DEFAULT 0,
+    presentation INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL,
+    PRIMARY KEY (judge, poster)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scores_by_poster ON scores (poster);
+"""
+
+
+def read_score_table(path):
+    """Reads a reshaped score sheet (any table_io format: .csv, .parquet, .xlsx, ...) with the standard columns,
+    plus SCORED_COLUMN if the file has it."""
+    df = read_table(path)
+    return df[SCORE_COLUMNS + [SCORED_COLUMN]] if SCORED_COLUMN in df.columns else df[SCORE_COLUMNS]
+
+
+def scored_flags(df):
+    """SCORED_COLUMN of a score table as bools; every row counts as scored in a table without it."""
+    return df[SCORED_COLUMN].astype(bool).tolist() if SCORED_COLUMN in df.columns else [True] * len(df)
+
+
+def write_score_table(df, path):
+    """Writes a table in the format given by path's extension; everything but .xlsx is replaced atomically."""
+    write_table(df, path)
+
+
+class SQLiteScoreStore:
+    """Judge scores in an SQLite database in WAL mode, one row per (judge, poster).
+
+    Submissions are single-row updates by primary key and readers never block the writer, so
+    many judges can submit at once without rewriting a file. Each thread gets its own connection.
+    updated_at stays NULL until a row is submitted, which is what SCORED_COLUMN is read from.
+    """
+
+    def __init__(self, db_path=SCORES_DB_FILE):
+        self.db_path = db_path
+        self.local = threading.local()
+        conn = self._connection()
+        with conn:
+            conn.executescript(SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+        return conn
+
+    def is_empty(self):
+        return self._connection().execute('SELECT 1 FROM scores LIMIT 1').fetchone() is None
+
+    def source_files(self):
+        """Files whose modification time changes when the scores do (committed WAL frames land in -wal first)."""
+        return [self.db_path, self.db_path + '-wal']
+
+    def save_dataframe(self, df):
+        """Upserts every row of a reshaped score table in one transaction; rows marked unscored keep updated_at NULL."""
+        now = time.time()
+        rows = [(int(r['Judge #']), int(r['Poster Number']), int(r['Clarity']), int(r['Innovation']),
+                 int(r['Presentation']), int(r['Total']), now if scored else None)
+                for r, scored in zip(df[SCORE_COLUMNS].to_dict('records'), scored_flags(df))]
+        conn = self._connection()
+        with conn:
+            conn.executemany('INSERT INTO scores (judge, poster, clarity, innovation, presentation, total, updated_at) '
+                             'VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (judge, poster) DO UPDATE SET '
+                             'clarity = excluded.clarity, innovation = excluded.innovation, '
+                             'presentation = excluded.presentation, total = excluded.total, updated_at = excluded.updated_at', rows)
+
+    def add_missing(self, df):
+        """Inserts the rows of a reshaped score table whose (judge, poster) has no row yet; existing scores are kept.
+        Returns the number of rows added."""
+        rows = [(int(r['Judge #']), int(r['Poster Number']), int(r['Clarity']), int(r['Innovation']),
+                 int(r['Presentation']), int(r['Total'])) for r in df[SCORE_COLUMNS].to_dict('records')]
+        conn = self._connection()
+        with conn:
+            before = conn.total_changes
+            conn.executemany('INSERT INTO scores (judge, poster, clarity, innovation, presentation, total) '
+                             'VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (judge, poster) DO NOTHING', rows)
+            return conn.total_changes - before
+
+    def load_dataframe(self):
+        rows = self._connection().execute('SELECT poster, judge, clarity, innovation, presentation, total, '
+                                          'updated_at IS NOT NULL FROM scores ORDER BY poster, judge').fetchall()
+        df = pd.DataFrame(rows, columns=SCORE_COLUMNS + [SCORED_COLUMN])
+        df[SCORED_COLUMN] = df[SCORED_COLUMN].astype(bool)
+        return df
+
+    def scores_for_judge(self, judge_id):
+        """{poster: {'Innovation', 'Clarity', 'Presentation', 'Total'}} for one judge, via the primary key."""
+        rows = self._connection().execute('SELECT poster, innovation, clarity, presentation, total FROM scores '
+                                          'WHERE judge = ?', (int(judge_id),)).fetchall()
+        return {poster: {'Innovation': i, 'Clarity': c, 'Presentation': p, 'Total': t} for poster, i, c, p, t in rows}
+
+    def update_scores(self, judge_id, updates):
+        """Applies {poster: (innovation, clarity, presentation)} atomically.
+
+        Returns the posters with no existing row for this judge; nothing is written if there are any.
+        """
+        conn = self._connection()
+        now = time.time()
+        with conn:
+            missing = []
+            for poster, (innovation, clarity, presentation) in updates.items():
+                cursor = conn.execute('UPDATE scores SET innovation = ?, clarity = ?, presentation = ?, total = ?, updated_at = ? '
+                                      'WHERE judge = ? AND poster = ?',
+                                      (innovation, clarity, presentation, innovation + clarity + presentation, now, int(judge_id), int(poster)))
+                if cursor.rowcount == 0: missing.append(poster)
+            if missing:
+                conn.rollback()
+        return missing
+
+    def import_file(self, path):
+        self.save_dataframe(read_score_table(path))
+
+    def export(self, path):
+        write_score_table(self.load_dataframe(), path)
+
+
+class CSVScoreStore:
+    """The original storage: the whole reshaped_judges_data.csv is read and rewritten on every save.
+
+    A submission sets the row's SCORED_COLUMN (prep.py writes it as False).
+    """
+
+    def __init__(self, csv_path=RESHAPED_DATA_FILE):
+        self.csv_path = csv_path
+        self.lock = threading.Lock()
+
+    def is_empty(self):
+        return not os.path.exists(self.csv_path)
+
+    def source_files(self):
+        return [self.csv_path]
+
+    def load_dataframe(self):
+        try:
+            return pd.read_csv(self.csv_path)
+        except FileNotFoundError:
+            return None
+
+    def save_dataframe(self, df):
+        write_score_table(df, self.csv_path)
+
+    def add_missing(self, df):
+        """Nothing to add: the reshaped CSV is this store itself."""
+        return 0
+
+    def scores_for_judge(self, judge_id):
+        df = self.load_dataframe()
+        if df is None: return {}
+        rows = df[df['Judge #'] == int(judge_id)]
+        return {r['Poster Number']: {k: r[k] for k in ('Innovation', 'Clarity', 'Presentation', 'Total')}
+                for r in rows.to_dict('records')}
+
+    def update_scores(self, judge_id, updates):
+        with self.lock:
+            df = self.load_dataframe()
+            if df is None: return list(updates)
+            missing = []
+            for poster, (innovation, clarity, presentation) in updates.items():
+                row_index = df[(df['Poster Number'] == poster) & (df['Judge #'] == int(judge_id))].index
+                if row_index.empty:
+                    missing.append(poster); continue
+                if SCORED_COLUMN not in df.columns: df[SCORED_COLUMN] = True  # a sheet from before the column: keep counting it
+                df.loc[row_index[0], ['Innovation', 'Clarity', 'Presentation', 'Total', SCORED_COLUMN]] = [
+                    innovation, clarity, presentation, innovation + clarity + presentation, True]
+            if not missing: self.save_dataframe(df)
+            return missing
+
+    def import_file(self, path):
+        self.save_dataframe(read_score_table(path))
+
+    def export(self, path):
+        df = self.load_dataframe()
+        if df is None: raise FileNotFoundError(self.csv_path)
+        write_score_table(df, path)
+
+
+def open_score_store(backend=None, reshaped_csv=RESHAPED_DATA_FILE, db_path=SCORES_DB_FILE):
+    """Opens the configured backend. A log or SQLite store gets a zero row for every (judge, poster) of the
+    reshaped CSV it does not have yet, so pairs added by a re-match can be scored; existing scores are kept.
+    """
+    backend = backend or SCORE_BACKEND
+    if backend == 'csv':
+        return CSVScoreStore(reshaped_csv)
+    if backend == 'log':
+        from score_log import EventLogScoreStore
+        store = EventLogScoreStore()
+    elif backend == 'sqlite':
+        store = SQLiteScoreStore(db_path)
+    else:
+        raise ValueError(f"Unknown score backend '{backend}' (expected 'log', 'sqlite' or 'csv')")
+    if os.path.exists(reshaped_csv):
+        added = store.add_missing(read_score_table(reshaped_csv))
+        if added: print(f"Added {added} judge/poster pairs from {reshaped_csv} to the score store")
+    return store
@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.linalg import lsqr, splu
+from scipy.stats import rankdata
+from rank_poster_score import RANK_CRITERIA, RANKING_MODES, SCORED_COLUMN, poster_statistics, dense_rank
+
+SCORE_DECIMALS = 9  # adjusted scores are compared after rounding, so float noise cannot split a tie
+OFFSET_DAMP = 1e-6  # tiny ridge so judges in a disconnected group still get a unique solution
+
+
+def scored_rows(df):
+    """The rows a judge has actually submitted, as recorded in the Scored column of the Part 2 export.
+
+    A genuine 0/0/0 score is kept. A table without the column (e.g. a hand-made sheet) is taken as fully scored.
+    """
+    return df[df[SCORED_COLUMN].astype(bool).to_numpy()] if SCORED_COLUMN in df.columns else df
+
+
+def _fit_rows(df, mode):
+    """zscore and offset are fitted on scored rows only, so unscored zeros do not pull judges' means and offsets
+    down; raw keeps every row, like the original ranking."""
+    return df if mode == 'raw' else scored_rows(df)
+
+
+def _table_codes(df):
+    posters, poster_codes = np.unique(df['Poster Number'].to_numpy(), return_inverse=True)
+    judges, judge_codes = np.unique(df['Judge #'].to_numpy(), return_inverse=True)
+    return posters, poster_codes, judges, judge_codes
+
+
+def _grouped_mean(values, groups, n_groups):
+    """Mean of each row of values (B x N) per group, where groups (B x N) holds codes in [0, n_groups)."""
+    batch = values.shape[0]
+    flat = (np.arange(batch)[:, None] * n_groups + groups).ravel()
+    sums = np.bincount(flat, weights=values.ravel(), minlength=batch * n_groups).reshape(batch, n_groups)
+    counts = np.bincount(flat, minlength=batch * n_groups).reshape(batch, n_groups)
+    return sums / np.maximum(counts, 1), counts
+
+
+def raw_scores(totals, poster_codes, judge_codes, n_posters, n_judges):
+    """Sum of each poster's Totals (the original ranking). All arrays are batched B x N."""
+    means, counts = _grouped_mean(totals, poster_codes, n_posters)
+    return means * counts
+
+
+def zscore_scores(totals, poster_codes, judge_codes, n_posters, n_judges):
+    """Mean over a poster's judges of each judge's Total in standard deviations from that judge's own mean.
+
+    A judge who gave every poster the same Total contributes 0.
+    """
+    judge_mean, _ = _grouped_mean(totals, judge_codes, n_judges)
+    judge_sq, _ = _grouped_mean(totals ** 2, judge_codes, n_judges)
+    judge_std = np.sqrt(np.maximum(judge_sq - judge_mean ** 2, 0))
+    rows = np.arange(totals.shape[0])[:, None]
+    centered = totals - judge_mean[rows, judge_codes]
+    std = judge_std[rows, judge_codes]
+    z = np.divide(centered, std, out=np.zeros_like(centered), where=std > 1e-12)
+    return _grouped_mean(z, poster_codes, n_posters)[0]
+
+
+def offset_design(poster_codes, judge_codes, n_posters, n_judges):
+    """Sparse design for Total = poster quality + judge offset, plus one row forcing the offsets to sum to zero."""
+    n_scores = len(poster_codes)
+    score_rows = np.arange(n_scores)
+    design = sparse.csr_matrix(
+        (np.ones(2 * n_scores), (np.concatenate([score_rows, score_rows]), np.concatenate([poster_codes, n_posters + judge_codes]))),
+        shape=(n_scores, n_posters + n_judges))
+    constraint = sparse.csr_matrix((np.ones(n_judges), (np.zeros(n_judges, dtype=int), n_posters + np.arange(n_judges))),
+                                   shape=(1, n_posters + n_judges))
+    return sparse.vstack([design, constraint]).tocsr()
+
+
+def offset_scores(totals, poster_codes, judge_codes, n_posters, n_judges):
+    """Poster quality from the additive judge-offset model, one sparse least-squares solve (lsqr)."""
+    design = offset_design(poster_codes, judge_codes, n_posters, n_judges)
+    solution = lsqr(design, np.append(totals, 0.0), damp=OFFSET_DAMP, atol=1e-12, btol=1e-12)[0]
+    return solution[:n_posters], solution[n_posters:]
+
+
+MODE_SCORERS = {'raw': raw_scores, 'zscore': zscore_scores}
+
+
+def adjusted_scores(df, mode='raw'):
+    """(poster numbers, score per poster) for a (poster, judge) score table under a ranking mode.
+
+    In zscore and offset mode, posters without any scored row are left out.
+    """
+    if mode not in RANKING_MODES:
+        raise ValueError(f"Unknown ranking mode '{mode}'. Choose from: {', '.join(RANKING_MODES)}")
+    df = _fit_rows(df, mode)
+    if df.empty: return np.zeros(0, dtype=df['Poster Number'].dtype), np.zeros(0)
+    posters, poster_codes, judges, judge_codes = _table_codes(df)
+    totals = df['Total'].to_numpy(dtype=float)
+    if mode == 'offset':
+        return posters, offset_scores(totals, poster_codes, judge_codes, len(posters), len(judges))[0]
+    return posters, MODE_SCORERS[mode](totals[None, :], poster_codes[None, :], judge_codes[None, :], len(posters), len(judges))[0]
+
+
+def bootstrap_scores(df, mode='raw', n_boot=200, seed=0):
+    """B x posters matrix of bootstrap replicate scores, drawn in one batch.
+
+    raw and zscore resample each poster's score rows with replacement (judge included, so the
+    z-normalization is redone on every replicate). offset keeps the design fixed and resamples
+    the model residuals; the normal equations are factorized once and solved for all
+    replicates together. Like adjusted_scores, zscore and offset use the scored rows only.
+    """
+    rng = np.random.default_rng(seed)
+    df = _fit_rows(df, mode)
+    posters, poster_codes, judges, judge_codes = _table_codes(df)
+    totals = df['Total'].to_numpy(dtype=float)
+    n_posters, n_judges = len(posters), len(judges)
+
+    if mode == 'offset':
+        design = offset_design(poster_codes, judge_codes, n_posters, n_judges)
+        quality, offsets = offset_scores(totals, poster_codes, judge_codes, n_posters, n_judges)
+        fitted = quality[poster_codes] + offsets[judge_codes]
+        residuals = totals - fitted
+        replicates = fitted[:, None] + residuals[rng.integers(0, len(totals), size=(len(totals), n_boot))]
+        normal = (design.T @ design + OFFSET_DAMP ** 2 * sparse.identity(design.shape[1])).tocsc()
+        rhs = design.T @ np.vstack([replicates, np.zeros((1, n_boot))])
+        return splu(normal).solve(rhs)[:n_posters].T
+
+    # Within-poster resampling: row k of poster p is replaced by a random row of poster p
+    order = np.argsort(poster_codes, kind='stable')
+    counts = np.bincount(poster_codes, minlength=n_posters)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    sorted_posters = poster_codes[order]
+    picks = starts[sorted_posters] + (rng.random((n_boot, len(order))) * counts[sorted_posters]).astype(int)
+    rows = order[picks]
+    return MODE_SCORERS[mode](totals[rows], np.broadcast_to(sorted_posters, rows.shape), judge_codes[rows], n_posters, n_judges)
+
+
+def bootstrap_rank_intervals(df, mode='raw', n_boot=200, confidence=0.95, seed=0):
+    """Poster Number, Rank Low, Rank High: percentile interval of each poster's rank over bootstrap replicates.
+
+    Ranks within a replicate are competition ranks on the score alone (1 = best, ties share the higher rank).
+    """
+    posters = np.unique(_fit_rows(df, mode)['Poster Number'].to_numpy())
+    replicate_ranks = rankdata(-np.round(bootstrap_scores(df, mode, n_boot, seed), SCORE_DECIMALS), method='min', axis=1)
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(replicate_ranks, [tail, 100 - tail], axis=0)
+    return pd.DataFrame({'Poster Number': posters, 'Rank Low': np.floor(low).astype(int), 'Rank High': np.ceil(high).astype(int)})
+
+
+def rank_with_mode(df, mode='raw', n_boot=0, confidence=0.95, seed=0):
+    """Dense ranking on (Score, Innovation, Clarity, Presentation), where Score is the mode's adjusted poster score.
+
+    In 'raw' mode Score is the summed Total and the ranks equal compute_rankings. With n_boot > 0
+    the bootstrap rank interval is added as 'Rank Low' and 'Rank High'. Posters that no judge has scored yet
+    have no Score in zscore and offset mode and share the last rank. The Innovation, Clarity and Presentation
+    tie-breaks come from the same rows as the Score; posters without a scored row keep their sheet values.
+    """
+    posters, scores = adjusted_scores(df, mode)
+    fitted = _fit_rows(df, mode)
+    stats = poster_statistics(pd.concat([fitted, df[~df['Poster Number'].isin(fitted['Poster Number'])]]))
+    stats.insert(1, 'Score', pd.Series(np.round(scores, SCORE_DECIMALS), index=posters).reindex(stats['Poster Number']).to_numpy())
+    ranked = dense_rank(stats, ['Score'] + RANK_CRITERIA[1:])
+    if n_boot > 0 and len(posters):
+        ranked = ranked.merge(bootstrap_rank_intervals(df, mode, n_boot, confidence, seed), on='Poster Number', how='left')
+        ranked[['Rank Low', 'Rank High']] = ranked[['Rank Low', 'Rank High']].astype('Int64')  # missing for unscored posters
+    return ranked
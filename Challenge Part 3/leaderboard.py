@@ -0,0 +1,112 @@
+import threading
+import numpy as np
+import pandas as pd
+from rank_poster_score import SCORED_COLUMN, dense_rank
+
+SCORE_CRITERIA = ['Innovation', 'Clarity', 'Presentation']
+
+
+class LeaderboardAggregator:
+    """Running per-poster sums for a live leaderboard, updated in O(1) per submitted score.
+
+    Holds each (judge, poster) score row plus per-poster sums of Total, Innovation, Clarity and
+    Presentation and the number of judge rows, which give the same statistics as
+    rank_poster_score.poster_statistics on the full table. A resubmitted score is applied as
+    the difference from the judge's previous one. The ranking is cached and only recomputed
+    after a score has changed.
+    """
+
+    def __init__(self, scores=None):
+        self.lock = threading.Lock()
+        self.poster_index = {}  # poster number -> row in the arrays
+        self.posters = []
+        self.sums = np.zeros((0, 4))  # Total, Innovation, Clarity, Presentation
+        self.counts = np.zeros(0, dtype=int)
+        self.rows = {}  # (judge, poster) -> np.array([total, innovation, clarity, presentation])
+        self.unscored = set()  # (judge, poster) rows loaded from the store that no judge has submitted yet
+        self.version = 0
+        self.cached_rankings = {}  # (mode, n_boot) -> (version, ranking)
+        if scores is not None: self.load(scores)
+
+    def load(self, scores):
+        """Rebuilds from a (poster, judge) score table with the Part 2 export columns (Scored marks submitted rows)."""
+        with self.lock:
+            posters, codes = np.unique(scores['Poster Number'].to_numpy().astype(int), return_inverse=True)
+            values = scores[['Total'] + SCORE_CRITERIA].to_numpy(dtype=float)
+            self.posters = posters.tolist()
+            self.poster_index = {poster: k for k, poster in enumerate(self.posters)}
+            self.sums = np.zeros((len(posters), 4))
+            np.add.at(self.sums, codes, values)
+            self.counts = np.bincount(codes, minlength=len(posters))
+            self.rows = {(int(j), int(p)): v for j, p, v in zip(scores['Judge #'], scores['Poster Number'], values)}
+            self.unscored = (set() if SCORED_COLUMN not in scores.columns else
+                             {(int(j), int(p)) for j, p, s in zip(scores['Judge #'], scores['Poster Number'], scores[SCORED_COLUMN]) if not s})
+            self.version += 1
+
+    def _poster_row(self, poster):
+        k = self.poster_index.get(poster)
+        if k is None:
+            k = self.poster_index[poster] = len(self.posters)
+            self.posters.append(poster)
+            self.sums = np.vstack([self.sums, np.zeros((1, 4))])
+            self.counts = np.append(self.counts, 0)
+        return k
+
+    def record(self, judge, poster, innovation, clarity, presentation):
+        """Applies one judge's (possibly revised) score for a poster."""
+        judge, poster = int(judge), int(poster)
+        new = np.array([innovation + clarity + presentation, innovation, clarity, presentation], dtype=float)
+        with self.lock:
+            k = self._poster_row(poster)
+            old = self.rows.get((judge, poster))
+            if (judge, poster) in self.unscored:
+                self.unscored.discard((judge, poster))
+                self.version += 1  # the row now counts in the corrected rankings even if its values are unchanged
+            if old is None:
+                self.counts[k] += 1
+                self.sums[k] += new
+            elif np.array_equal(old, new):
+                return
+            else:
+                self.sums[k] += new - old
+            self.rows[(judge, poster)] = new
+            self.version += 1
+
+    def poster_statistics(self):
+        with self.lock:
+            return self._statistics()
+
+    def _statistics(self):
+        means = self.sums[:, 1:] / np.maximum(self.counts, 1)[:, None]
+        stats = pd.DataFrame(means, columns=SCORE_CRITERIA)
+        stats.insert(0, 'Total', self.sums[:, 0])
+        stats.insert(0, 'Poster Number', self.posters)
+        return stats[self.counts > 0].sort_values('Poster Number').reset_index(drop=True)
+
+    def score_table(self):
+        """The current (poster, judge) rows in the Part 2 export layout."""
+        with self.lock:
+            return self._score_table()
+
+    def _score_table(self):
+        records = [(poster, judge, clarity, innovation, presentation, total, (judge, poster) not in self.unscored)
+                   for (judge, poster), (total, innovation, clarity, presentation) in self.rows.items()]
+        return pd.DataFrame(records, columns=['Poster Number', 'Judge #', 'Clarity', 'Innovation', 'Presentation', 'Total', SCORED_COLUMN])
+
+    def ranking(self, mode='raw', n_boot=0):
+        """Ranked posters (Poster Number, Total, Innovation, Clarity, Presentation, Rank), cached until a score changes.
+
+        mode and n_boot select a judge-bias corrected ranking with bootstrap intervals (judge_bias.rank_with_mode),
+        which is computed from the full score table.
+        """
+        with self.lock:
+            cached = self.cached_rankings.get((mode, n_boot))
+            if cached is not None and cached[0] == self.version: return cached[1]
+            if mode == 'raw' and n_boot == 0:
+                ranked = dense_rank(self._statistics())
+            else:
+                from judge_bias import rank_with_mode
+                ranked = rank_with_mode(self._score_table(), mode, n_boot)
+            ranked = ranked.sort_values(['Rank', 'Poster Number']).reset_index(drop=True)
+            self.cached_rankings[(mode, n_boot)] = (self.version, ranked)
+            return ranked
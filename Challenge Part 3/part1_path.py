@@ -0,0 +1,15 @@
+# part1_path.py
+"""Puts the Challenge Part 1 folder on sys.path for the modules shared with the matcher (table_io, stage_runner).
+
+Every module that imports table_io or stage_runner imports this first. The folder is appended, so this
+folder's own modules take precedence.
+"""
+import os
+import sys
+
+PART1_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Challenge Part 1'))
+
+if not os.path.isdir(PART1_DIR):
+    raise ImportError(f"{PART1_DIR} not found: table_io.py and stage_runner.py are shared from the Challenge Part 1 folder")
+if PART1_DIR not in sys.path:
+    sys.path.append(PART1_DIR)
@@ -1,60 +1,93 @@
-import pandas as pd
-
-def rank_posters(input_file, output_file):
-    # Read the Excel file
-    df = pd.read_excel(input_file)
-    
-    # First calculate total score for each poster (sum of both judges)
-    poster_stats = df.groupby('Poster Number').agg({
+import sys
+
+import part1_path  # noqa: F401  (Challenge Part 1 on sys.path for table_io and stage_runner)
+from table_io import find_table, read_table, write_table
+
+# Ranking criteria in priority order, all descending
+RANK_CRITERIA = ['Total', 'Innovation', 'Clarity', 'Presentation']
+# raw: summed totals; zscore and offset correct for harsh or lenient judges (judge_bias.py)
+RANKING_MODES = ('raw', 'zscore', 'offset')
+# Part 2 exports whether each row was submitted by its judge; without the column every row counts as scored
+SCORED_COLUMN = 'Scored'
+
+def poster_statistics(df):
+    """Per-poster Total (sum of both judges) and mean Innovation, Clarity and Presentation."""
+    return df.groupby('Poster Number').agg({
         'Total': 'sum',
         'Innovation': 'mean',
         'Clarity': 'mean',
         'Presentation': 'mean'
     }).reset_index()
-    
-    # Sort posters based on criteria in descending order
-    sorted_posters = poster_stats.sort_values(
-        by=['Total', 'Innovation', 'Clarity', 'Presentation'],
-        ascending=[False, False, False, False]
-    )
-    
-    # Create continuous (dense) ranking starting from 1
-    dense_rank = 1
-    prev_values = None
-    ranks = []
-    
-    # Custom ranking logic: if the current poster's scores differ from the previous one,
-    # increment the dense_rank by 1. Otherwise, keep the same rank.
-    for _, row in sorted_posters.iterrows():
-        current_values = (row['Total'], row['Innovation'], row['Clarity'], row['Presentation'])
-        
-        if prev_values is not None and current_values != prev_values:
-            dense_rank += 1
-        
-        ranks.append(dense_rank)
-        prev_values = current_values
-    
-    sorted_posters['Rank'] = ranks
-    
+
+def dense_rank(poster_stats, criteria=RANK_CRITERIA):
+    """Sorts posters by the criteria (descending) and adds a dense 'Rank' over the full criteria tuple.
+
+    A poster starts a new rank when any criterion differs from the poster before it, so
+    identical tuples share a rank and the next one is only one higher. Missing values sort last
+    and count as equal to each other.
+    """
+    sorted_posters = poster_stats.sort_values(by=criteria, ascending=[False] * len(criteria))
+    values = sorted_posters[criteria]
+    previous = values.shift()
+    changed = (values.ne(previous) & ~(values.isna() & previous.isna())).any(axis=1)
+    sorted_posters['Rank'] = changed.cumsum().astype(int)
+    return sorted_posters
+
+def compute_rankings(df):
+    """Ranked per-poster statistics for a (poster, judge) score table."""
+    return dense_rank(poster_statistics(df))
+
+def rank_posters(input_file, output_file, mode='raw', n_boot=0):
+    """Ranks the posters in input_file and writes every score row with its poster's rank to output_file.
+
+    mode 'zscore' or 'offset' corrects for harsh or lenient judges and n_boot > 0 adds bootstrap
+    rank intervals (see judge_bias.py); the defaults give the original ranking.
+    """
+    # Read the scores (Parquet or CSV hand-off from Part 2, or Excel)
+    df = read_table(input_file)
+
+    if mode == 'raw' and n_boot == 0:
+        sorted_posters = compute_rankings(df)
+        extra_columns = []
+    else:
+        from judge_bias import rank_with_mode
+        sorted_posters = rank_with_mode(df, mode, n_boot)
+        extra_columns = [c for c in ('Score', 'Rank Low', 'Rank High') if c in sorted_posters.columns]
+
     # Create a dictionary to map poster numbers to ranks
     rank_mapping = dict(zip(sorted_posters['Poster Number'], sorted_posters['Rank']))
-    
+
     # Add rank column to original DataFrame
     df['Rank'] = df['Poster Number'].map(rank_mapping)
-    
-    # Save to new Excel file
-    df.to_excel(output_file, index=False)
-    
+    for column in extra_columns:
+        df[column] = df['Poster Number'].map(dict(zip(sorted_posters['Poster Number'], sorted_posters[column])))
+
+    # Save to new Excel file (or any table_io format, by extension)
+    write_table(df, output_file)
+
     # Print rankings for verification
     print("\nRanking Summary:")
-    summary = sorted_posters.sort_values('Rank')[['Poster Number', 'Total', 'Innovation', 'Clarity', 'Presentation', 'Rank']]
+    summary = sorted_posters.sort_values('Rank')[['Poster Number', 'Total', 'Innovation', 'Clarity', 'Presentation', 'Rank'] + extra_columns]
     print(summary.to_string(index=False))
-    
+
     return df
 
-# Example usage:
-input_file = "output_for_part3.xlsx"  # Replace with your input file path
-output_file = "poster_rankings.xlsx"  # Replace with desired output file path
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Rank posters from the judges' scores.")
+    parser.add_argument('--input', default=find_table("output_for_part3") or "output_for_part3.xlsx",
+                        help="Scores exported by Part 2 (default: output_for_part3 with the fastest format found)")
+    parser.add_argument('--output', default="poster_rankings.xlsx")
+    parser.add_argument('--mode', choices=RANKING_MODES, default='raw',
+                        help="raw: summed totals; zscore: per-judge standardized totals; offset: additive judge-offset model")
+    parser.add_argument('--bootstrap', type=int, default=0, help="Bootstrap replicates for rank intervals (0 = off)")
+    parser.add_argument('--force', action='store_true', help="Rank even if the scores and options are unchanged since the last run")
+    args = parser.parse_args()
 
-# Run the ranking
-result = rank_posters(input_file, output_file)
+    # Run the ranking, unless the same scores were already ranked the same way (see stage_runner.py)
+    from stage_runner import Stage, StageRunner
+    rank = Stage('rank', lambda: rank_posters(args.input, args.output, args.mode, args.bootstrap),
+                 inputs=[args.input, 'rank_poster_score.py', 'judge_bias.py'], outputs=[args.output],
+                 params={'mode': args.mode, 'bootstrap': args.bootstrap})
+    status = StageRunner([rank]).run(['rank'] if args.force else ())
+    if status['rank'] == 'failed': sys.exit(1)
@@ -0,0 +1,99 @@
+# bench_table_io.py
+"""Save and load times of the hand-off tables in every table_io format.
+
+The tables come from a synthetic event (synthetic_event.py) of each size:
+
+    posters   processed posters (abstracts plus the assigned judges), written by perform_matching
+    judges    processed judges
+    matrix    dense poster x judge assignment matrix, the Excel export (Part 2 reads the sparse long form)
+    scores    judge scores, exported by Part 2 and read by Part 3
+
+Each (table, format) pair is written and read --repeat times and the best times are reported with the
+file size. Excel is skipped for tables over --xlsx-max-cells cells, where openpyxl takes minutes.
+Parquet and Arrow need pyarrow; without it they are reported as skipped.
+
+Usage:
+    python bench_table_io.py --sizes 1000 10000
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import pandas as pd
+from synthetic_event import generate_event
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Challenge Part 1'))
+from table_io import columnar_available, read_table, write_table
+
+TABLES = {'posters': 'assigned_posters.xlsx', 'judges': 'assigned_judges.xlsx',
+          'matrix': 'judge_poster_assignment_matrix.xlsx', 'scores': 'output_for_part3.xlsx'}
+FORMATS = ['.xlsx', '.csv', '.parquet', '.feather', '.npz']
+
+
+def best_time(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def skip_reason(df, extension, xlsx_max_cells):
+    if extension in ('.parquet', '.feather') and not columnar_available(): return 'pyarrow not installed'
+    if extension == '.npz' and not all(pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes): return 'not all-numeric'
+    if extension == '.xlsx' and df.size > xlsx_max_cells: return f'over {xlsx_max_cells} cells'
+    return None
+
+
+def bench_table(df, extension, directory, repeat, xlsx_max_cells):
+    reason = skip_reason(df, extension, xlsx_max_cells)
+    if reason: return {'status': 'skipped', 'reason': reason}
+    path = os.path.join(directory, 'table' + extension)
+    save = best_time(lambda: write_table(df, path), repeat)
+    load = best_time(lambda: read_table(path), repeat)
+    size = os.path.getsize(path)
+    os.remove(path)
+    return {'status': 'ok', 'save_seconds': round(save, 4), 'load_seconds': round(load, 4), 'bytes': size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time saving and loading the pipeline's hand-off tables in every format.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000], help="Poster counts (default: 1000 10000)")
+    parser.add_argument('--tables', nargs='+', choices=list(TABLES), default=list(TABLES))
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=FORMATS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--xlsx-max-cells', type=int, default=2_000_000)
+    parser.add_argument('--results', help="Results file (default: results/table_io-<timestamp>.json next to this script)")
+    args = parser.parse_args()
+
+    results = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+               'platform': platform.platform(), 'pyarrow': columnar_available(), 'runs': []}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            event = generate_event(size)
+            for table in args.tables:
+                df = event[TABLES[table]]
+                print(f"{size:>7} posters  {table:<8} {df.shape[0]:>6} x {df.shape[1]:<6}")
+                for extension in args.formats:
+                    run = bench_table(df, extension, directory, args.repeat, args.xlsx_max_cells)
+                    results['runs'].append({'posters': size, 'table': table, 'format': extension, **run})
+                    if run['status'] == 'ok':
+                        print(f"    {extension:<9} save {run['save_seconds']:9.4f} s   load {run['load_seconds']:9.4f} s"
+                              f"   {run['bytes'] / 1e6:9.2f} MB")
+                    else:
+                        print(f"    {extension:<9} skipped ({run['reason']})")
+
+    results_path = args.results or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results',
+                                                'table_io-' + time.strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(results_path)), exist_ok=True)
+    with open(results_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {results_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+# run_benchmarks.py
+"""End-to-end benchmark of the three parts on synthetic events.
+
+For every size a synthetic event is generated (synthetic_event.py) and each stage runs in its own
+Python process, so its peak RSS is its own. Each stage reads the generated files, not the previous
+stage's output, so stages can be run and compared on their own:
+
+    perform_matching            Part 1 matcher.perform_matching (embeddings, scoring, assignment)
+    create_poster_judge_matrix  Part 1 matrix_creator (sparse long-form hand-off, as driver.py writes it)
+    part2_prep                  Part 2 prep.prepare_judging_data (app assignments, score sheet, passwords)
+    rank_posters                Part 3 rank_poster_score.rank_posters
+
+Results (wall time inside the stage, wall time of the whole process, peak RSS) are written as JSON.
+With --compare, stages that got slower than the given results file by more than --tolerance
+are reported and the exit status is 1.
+
+Usage:
+    python run_benchmarks.py --sizes 100 1000 10000
+    python run_benchmarks.py --sizes 1000 --stages part2_prep rank_posters --compare results/baseline.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from synthetic_event import write_event
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PART_DIRS = {name: os.path.join(REPO_ROOT, f"Challenge Part {k}") for k, name in enumerate(['part1', 'part2', 'part3'], 1)}
+STAGES = ['perform_matching', 'create_poster_judge_matrix', 'part2_prep', 'rank_posters']
+RESULT_PREFIX = 'BENCH_RESULT '
+
+
+def _stage_perform_matching(args):
+    sys.path.insert(0, PART_DIRS['part1'])
+    from matcher import perform_matching
+    perform_matching('abstracts.xlsx', 'judges.xlsx', 'professors.xlsx', 'processed_posters.xlsx', 'processed_judges.xlsx',
+                     embedding_cache_dir=None, assignment_engine=args.engine)
+
+
+def _stage_create_poster_judge_matrix(args):
+    sys.path.insert(0, PART_DIRS['part1'])
+    from matrix_creator import create_poster_judge_matrix
+    from table_io import handoff_path
+    create_poster_judge_matrix('assigned_posters.xlsx', 'assigned_judges.xlsx', long_output_path=handoff_path('assignments_from_matrix'))
+
+
+def _stage_part2_prep(args):
+    sys.path.insert(0, PART_DIRS['part2'])
+    from prep import prepare_judging_data
+    if os.path.exists('judge_passwords.csv'): os.remove('judge_passwords.csv')  # passwords are only written when missing
+    prepare_judging_data('judge_poster_assignment_matrix.xlsx', overwrite=True)
+
+
+def _stage_rank_posters(args):
+    sys.path.insert(0, PART_DIRS['part3'])
+    from rank_poster_score import rank_posters
+    rank_posters('output_for_part3.xlsx', 'poster_rankings.xlsx')
+
+
+STAGE_FUNCTIONS = {name: globals()[f"_stage_{name}"] for name in STAGES}
+
+
+def run_stage_in_this_process(args):
+    """Child side: runs one stage in the event directory and prints its timing as the last line."""
+    os.chdir(args.event)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()) if not args.verbose else contextlib.nullcontext():
+        STAGE_FUNCTIONS[args.run_stage](args)
+    seconds = time.perf_counter() - start
+    print(RESULT_PREFIX + json.dumps({'stage_seconds': round(seconds, 4), 'peak_rss_mb': round(peak_rss_mb(), 1)}))
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB.
+
+    On Linux this is VmHWM: ru_maxrss survives fork/exec and would report the parent's peak instead.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'): return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 * 1024) if sys.platform == 'darwin' else max_rss / 1024  # bytes on macOS, KiB elsewhere
+
+
+def run_stage(stage, event_dir, args):
+    command = [sys.executable, os.path.abspath(__file__), '--run-stage', stage, '--event', event_dir,
+               '--engine', args.engine] + (['--verbose'] if args.verbose else [])
+    start = time.perf_counter()
+    completed = subprocess.run(command, capture_output=True, text=True)
+    result = {'process_seconds': round(time.perf_counter() - start, 4)}
+    lines = [line for line in completed.stdout.splitlines() if line.startswith(RESULT_PREFIX)]
+    if completed.returncode == 0 and lines:
+        result.update(json.loads(lines[-1][len(RESULT_PREFIX):]), status='ok')
+    else:
+        result.update(status='failed', error=(completed.stderr or completed.stdout).strip().splitlines()[-1:])
+    if args.verbose: print(completed.stdout, completed.stderr)
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def compare(results, baseline_path, tolerance):
+    """Stages (same size) slower than the baseline by more than tolerance, as printable lines."""
+    with open(baseline_path) as f:
+        baseline = {(r['posters'], r['stage']): r for r in json.load(f)['runs'] if r.get('status') == 'ok'}
+    regressions = []
+    for run in results['runs']:
+        before = baseline.get((run['posters'], run['stage']))
+        if run.get('status') != 'ok' or before is None: continue
+        ratio = run['stage_seconds'] / max(before['stage_seconds'], 1e-9)
+        if ratio > 1 + tolerance:
+            regressions.append(f"{run['stage']} @ {run['posters']} posters: {before['stage_seconds']:.3f}s -> "
+                               f"{run['stage_seconds']:.3f}s ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every stage of the three parts on synthetic events.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000], help="Poster counts (default: 100 1000)")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--engine', default='optimal', help="Assignment engine for perform_matching")
+    parser.add_argument('--events-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'events'),
+                        help="Where generated events are kept (reused across runs)")
+    parser.add_argument('--results', help="Results file (default: results/<timestamp>.json next to this script)")
+    parser.add_argument('--compare', help="Earlier results file to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown before a regression is reported")
+    parser.add_argument('--verbose', action='store_true', help="Show the stages' own output")
+    parser.add_argument('--run-stage', choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument('--event', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        run_stage_in_this_process(args)
+        return
+
+    results = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'git_commit': git_commit(), 'python': platform.python_version(),
+               'platform': platform.platform(), 'cpu_count': os.cpu_count(), 'engine': args.engine, 'runs': []}
+    for size in args.sizes:
+        event_dir = os.path.join(args.events_dir, str(size))
+        if not os.path.exists(os.path.join(event_dir, 'output_for_part3.xlsx')):
+            print(f"Generating a {size}-poster event in {event_dir}...")
+            write_event(event_dir, size)
+        for stage in args.stages:
+            result = run_stage(stage, event_dir, args)
+            results['runs'].append({'posters': size, 'stage': stage, **result})
+            if result['status'] == 'ok':
+                print(f"{size:>7} posters  {stage:<28}{result['stage_seconds']:9.3f} s  {result['peak_rss_mb']:8.1f} MB peak RSS")
+            else:
+                print(f"{size:>7} posters  {stage:<28}   failed: {' '.join(result['error'])}")
+
+    results_path = args.results or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results',
+                                                time.strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(results_path)), exist_ok=True)
+    with open(results_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {results_path}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for line in regressions: print(f"Regression: {line}")
+        if regressions: sys.exit(1)
+        print(f"No stage is more than {args.tolerance:.0%} slower than {args.compare}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+# synthetic_event.py
+"""Generates a synthetic poster event at any size, with every file the three parts read.
+
+Part 1: abstracts.xlsx, judges.xlsx, professors.xlsx (shaped like the scraper's output, so no
+        network access is needed), plus assigned_posters.xlsx / assigned_judges.xlsx shaped like
+        perform_matching's output for benchmarking create_poster_judge_matrix on its own
+Part 2: judge_poster_assignment_matrix.xlsx
+Part 3: output_for_part3.xlsx, judge scores with a per-judge harshness offset
+
+Usage:
+    python synthetic_event.py --posters 1000 --out events/1000
+"""
+import argparse
+import math
+import os
+import numpy as np
+import pandas as pd
+
+TOPICS = {
+    'Computer/Information Science': "machine learning neural networks software testing compilers databases distributed systems "
+                                    "security privacy cloud computing graph algorithms natural language processing vision",
+    'Electrical/Computer Engineering': "signal processing wireless communication power electronics embedded systems circuits "
+                                       "control theory antennas sensors radar information theory hardware",
+    'Mechanical/Aerospace Engineering': "fluid dynamics heat transfer combustion robotics structures vibration turbulence "
+                                        "propulsion materials manufacturing aerodynamics",
+    'Civil/Environmental Engineering': "water resources transportation structural health monitoring geotechnics sustainability "
+                                       "air quality hydrology concrete infrastructure",
+    'Biomedical/Chemical Engineering': "tissue engineering biomaterials drug delivery medical imaging biosensors polymers "
+                                       "catalysis reaction engineering membranes",
+}
+DEPARTMENTS = {'Computer/Information Science': 'EECS', 'Electrical/Computer Engineering': 'EECS',
+               'Mechanical/Aerospace Engineering': 'MAE', 'Civil/Environmental Engineering': 'CEE',
+               'Biomedical/Chemical Engineering': 'BMCE'}
+FILLER = ("we propose a novel approach to the problem and evaluate it on real data the results show significant improvement "
+          "over existing methods and we discuss limitations and future work").split()
+FIRST_NAMES = "Alex Jordan Priya Wei Maria Ahmed Elena Kofi Sofia Hiroshi Laura Omar Chen Fatima Lucas Anika Diego Mei Ivan Grace".split()
+LAST_NAMES = "Smith Patel Garcia Kim Nguyen Okafor Rossi Tanaka Kowalski Haddad Silva Ivanova Murphy Chen Mehta Larsen Costa Abe".split()
+TITLES = ["Professor", "Associate Professor", "Assistant Professor", "Research Professor", "Professor of Practice"]
+
+
+def _text(rng, program, n_words):
+    topic = TOPICS[program].split()
+    return ' '.join(rng.choice(topic) if rng.random() < 0.4 else rng.choice(FILLER) for _ in range(n_words))
+
+
+def _letters(k):
+    """0 -> '', 1 -> 'a', 2 -> 'b', ... 27 -> 'aa': a letters-only suffix, since name matching drops digits."""
+    suffix = ''
+    while k > 0:
+        k, r = divmod(k - 1, 26)
+        suffix = chr(ord('a') + r) + suffix
+    return suffix
+
+
+def _names(rng, n):
+    """n "First Last" pairs with distinct last names."""
+    firsts = rng.choice(FIRST_NAMES, n)
+    lasts = [f"{LAST_NAMES[k % len(LAST_NAMES)]}{_letters(k // len(LAST_NAMES))}" for k in range(n)]
+    return list(firsts), lasts
+
+
+def generate_event(n_posters, n_judges=None, seed=0):
+    """Returns {file name: DataFrame} for an event with n_posters posters."""
+    rng = np.random.default_rng(seed)
+    n_judges = n_judges or max(4, math.ceil(n_posters * 2 / 5))  # about 5 posters per judge (cap is 6)
+    n_professors = n_judges + n_judges // 2
+    programs = list(TOPICS)
+
+    prof_first, prof_last = _names(rng, n_professors)
+    prof_programs = rng.choice(programs, n_professors)
+    professors = pd.DataFrame({
+        'Professor Name': [f"{f} {l}" for f, l in zip(prof_first, prof_last)],
+        'Link': [f"https://example.edu/faculty/{k}" for k in range(n_professors)],
+        'Profile Title': rng.choice(TITLES, n_professors),
+        'Areas of Interest / Research Interests': ['; '.join(rng.choice(TOPICS[p].split(), 4)) for p in prof_programs],
+        'Description': [_text(rng, p, 60) for p in prof_programs],
+        'Current Research': [_text(rng, p, 30) for p in prof_programs],
+        'Publications': ['\n'.join(_text(rng, p, 12) for _ in range(rng.integers(0, 8))) for p in prof_programs],
+    })
+
+    judge_rows = rng.permutation(n_professors)[:n_judges]  # judges are drawn from the directory
+    judges = pd.DataFrame({
+        'Judge': np.arange(1, n_judges + 1),
+        'Judge FirstName': [prof_first[k] for k in judge_rows],
+        'Judge LastName': [prof_last[k] for k in judge_rows],
+        'Department': [DEPARTMENTS[prof_programs[k]] for k in judge_rows],
+        'Hour available': rng.choice(np.array([1, 2, 'both'], dtype=object), n_judges, p=[0.3, 0.3, 0.4]),
+    })
+
+    poster_programs = rng.choice(programs, n_posters)
+    advisors = rng.integers(0, n_professors, n_posters)
+    abstracts = pd.DataFrame({
+        'Poster #': np.arange(1, n_posters + 1),
+        'Title': [_text(rng, p, 8).title() for p in poster_programs],
+        'Abstract': [_text(rng, p, 110) for p in poster_programs],
+        'Advisor FirstName': [prof_first[k] for k in advisors],
+        'Advisor LastName': [prof_last[k] for k in advisors],
+        'Program': poster_programs,
+    })
+
+    # A random assignment (2 judges per poster) stands in for the matcher's output downstream
+    first = rng.integers(0, n_judges, n_posters)
+    pairs = np.stack([first, (first + rng.integers(1, n_judges, n_posters)) % n_judges], axis=1)
+    assigned_posters = abstracts.assign(**{'Assigned Judge 1 ID': pairs[:, 0] + 1, 'Assigned Judge 2 ID': pairs[:, 1] + 1})
+    assigned_judges = judges.rename(columns={'Judge': 'Judge No. #'})
+    matrix = np.zeros((n_posters, n_judges), dtype=int)
+    matrix[np.repeat(np.arange(n_posters), 2), pairs.ravel()] = 1
+    assignment_matrix = pd.DataFrame(matrix, columns=[str(j) for j in range(1, n_judges + 1)])
+    assignment_matrix.insert(0, 'Poster #', np.arange(1, n_posters + 1))
+
+    quality = rng.normal(0, 1, n_posters)
+    harshness = rng.normal(0, 0.7, n_judges)
+    score_posters, score_judges = np.repeat(np.arange(n_posters), 2), pairs.ravel()
+    level = quality[score_posters] - harshness[score_judges] + rng.normal(0, 0.5, len(score_posters))
+    innovation = np.clip(np.round(2 + level), 0, 4).astype(int)
+    clarity = np.clip(np.round(1.5 + 0.75 * level), 0, 3).astype(int)
+    presentation = np.clip(np.round(1.5 + 0.75 * level + rng.normal(0, 0.5, len(level))), 0, 3).astype(int)
+    scores = pd.DataFrame({'Poster Number': score_posters + 1, 'Judge #': score_judges + 1, 'Clarity': clarity,
+                           'Innovation': innovation, 'Presentation': presentation,
+                           'Total': innovation + clarity + presentation})
+
+    return {'abstracts.xlsx': abstracts, 'judges.xlsx': judges, 'professors.xlsx': professors,
+            'assigned_posters.xlsx': assigned_posters, 'assigned_judges.xlsx': assigned_judges,
+            'judge_poster_assignment_matrix.xlsx': assignment_matrix, 'output_for_part3.xlsx': scores}
+
+
+def write_event(directory, n_posters, n_judges=None, seed=0):
+    os.makedirs(directory, exist_ok=True)
+    for name, df in generate_event(n_posters, n_judges, seed).items():
+        df.to_excel(os.path.join(directory, name), index=False)
+    return directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic poster event.")
+    parser.add_argument('--posters', type=int, default=100)
+    parser.add_argument('--judges', type=int, help="Default: about 2 judges for every 5 posters")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', required=True, help="Output directory")
+    args = parser.parse_args()
+    write_event(args.out, args.posters, args.judges, args.seed)
+    print(f"Wrote a {args.posters}-poster event to {args.out}")
+
+
+if __name__ == '__main__':
+    main()